@@ -98,11 +98,14 @@ class ActionController(object):
         if not filters:
             filters = None
 
-        actions = self.rpc_client.action_list(req.context,
-                                              filters=filters,
-                                              **params)
+        actions = util.list_pages(self.rpc_client.action_list, req.context,
+                                  filters=filters, **params)
 
-        return {'actions': actions}
+        result = {'actions': actions}
+        links = util.get_next_links(req, actions)
+        if links:
+            result['actions_links'] = links
+        return result
 
     @util.policy_enforce
     def create(self, req, body):
@@ -115,11 +115,13 @@ class ClusterController(object):
         if not filters:
             filters = None
 
-        clusters = self.rpc_client.cluster_list(req.context,
-                                                filters=filters,
-                                                tenant_safe=True,
-                                                **params)
-        return {'clusters': clusters}
+        clusters = util.list_pages(self.rpc_client.cluster_list, req.context,
+                                   filters=filters, tenant_safe=True, **params)
+        result = {'clusters': clusters}
+        links = util.get_next_links(req, clusters)
+        if links:
+            result['clusters_links'] = links
+        return result
 
     @util.policy_enforce
     def create(self, req, body):
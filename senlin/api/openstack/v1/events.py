@@ -53,6 +53,8 @@ class EventController(object):
             'sort_keys': 'multi',
             'global_tenant': 'single',
             'show_deleted': 'single',
+            'start_time': 'single',
+            'end_time': 'single',
         }
         params = util.get_allowed_params(req.params, param_whitelist)
         filters = util.get_allowed_params(req.params, filter_whitelist)
@@ -71,14 +73,22 @@ class EventController(object):
         if key in params:
             params[key] = utils.parse_int_param(key, params[key])
 
+        # Times are validated here and sent to the engine as strings
+        for key in (consts.PARAM_START_TIME, consts.PARAM_END_TIME):
+            if key in params:
+                utils.parse_time_param(key, params[key])
+
         if not filters:
             filters = None
 
-        events = self.rpc_client.event_list(req.context,
-                                            filters=filters,
-                                            **params)
+        events = util.list_pages(self.rpc_client.event_list, req.context,
+                                 filters=filters, **params)
 
-        return {'events': events}
+        result = {'events': events}
+        links = util.get_next_links(req, events)
+        if links:
+            result['events_links'] = links
+        return result
 
     @util.policy_enforce
     def get(self, req, event_id):
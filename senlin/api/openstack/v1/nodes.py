@@ -120,10 +120,14 @@ class NodeController(object):
         if not filters:
             filters = None
 
-        nodes = self.rpc_client.node_list(req.context, filters=filters,
-                                          **params)
-
-        return {'nodes': nodes}
+        nodes = util.list_pages(self.rpc_client.node_list, req.context,
+                                filters=filters, **params)
+
+        result = {'nodes': nodes}
+        links = util.get_next_links(req, nodes)
+        if links:
+            result['nodes_links'] = links
+        return result
 
     @util.policy_enforce
     def create(self, req, body):
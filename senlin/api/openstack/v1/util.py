@@ -13,7 +13,9 @@
 
 import functools
 
+from oslo_config import cfg
 import six
+from six.moves import urllib
 from webob import exc
 
 
@@ -75,3 +77,68 @@ def get_allowed_params(params, whitelist):
             allowed_params[key] = value
 
     return allowed_params
+
+
+def get_next_links(req, items):
+    """Build the link to the next page of a list response.
+
+    The link repeats the request with the ID of the last item returned as
+    the ``marker``. The DB layer resumes from the sort key values of that
+    item, so following the links costs the same at any depth.
+
+    :param req: the webob request of the listing.
+    :param items: a list of dicts, each of which has an ``id``.
+
+    :returns: a list containing a 'next' link, or an empty list if the
+              request has no valid ``limit`` or this is the last page.
+    """
+    try:
+        limit = int(req.params.get('limit'))
+    except (TypeError, ValueError):
+        return []
+
+    if limit <= 0 or len(items) < limit:
+        return []
+
+    params = [(k, v) for k, v in req.params.items() if k != 'marker']
+    params.append(('marker', items[-1]['id']))
+    href = '%s?%s' % (req.path_url, urllib.parse.urlencode(params))
+    return [{'rel': 'next', 'href': href}]
+
+
+def list_pages(list_func, context, **kwargs):
+    """List objects from the engine one page at a time.
+
+    If the request has a ``limit``, a single call is made and its result
+    is returned. Otherwise the first page is fetched right away, so that
+    errors are still reported with a proper status code. If more pages
+    follow, a generator is returned that fetches them while the response
+    is being sent, which keeps the memory used by the API and the engine
+    bounded by the page size.
+
+    :param list_func: an RPC client method, e.g. ``cluster_list``.
+    :param context: the request context.
+    :param kwargs: the parameters of the listing.
+
+    :returns: a list of dicts, or a generator of dicts.
+    """
+    if kwargs.get('limit') is not None:
+        return list_func(context, **kwargs)
+
+    page_size = cfg.CONF.senlin_api.list_page_size
+    kwargs['limit'] = page_size
+    items = list_func(context, **kwargs)
+    if len(items) < page_size:
+        return items
+
+    return _more_pages(list_func, context, items, kwargs)
+
+
+def _more_pages(list_func, context, items, kwargs):
+    while True:
+        for item in items:
+            yield item
+        if len(items) < kwargs['limit']:
+            return
+        kwargs['marker'] = items[-1]['id']
+        items = list_func(context, **kwargs)
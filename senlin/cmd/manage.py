@@ -25,6 +25,8 @@ from senlin.db import utils
 from senlin import version
 
 CONF = cfg.CONF
+CONF.import_opt('event_archive_retention_days', 'senlin.common.config')
+CONF.import_opt('event_retention_days', 'senlin.common.config')
 
 
 def do_db_version():
@@ -40,9 +42,28 @@ def do_db_sync():
 
 
 def purge_deleted():
-    """Remove database records that have been previously soft deleted."""
+    """Remove database records that have been previously soft deleted.
+
+    Events older than event_retention_days, or beyond the limit of
+    max_events_per_cluster, are removed as well, and so are archived events
+    older than event_archive_retention_days.
+    """
 
     utils.purge_deleted(CONF.command.age, CONF.command.granularity)
+    utils.purge_events(CONF.event_retention_days,
+                       archive_age=CONF.event_archive_retention_days)
+
+
+def archive_events():
+    """Move old events from the event table into the archive table."""
+
+    utils.archive_events(CONF.command.age, CONF.command.granularity)
+
+
+def compact_actions():
+    """Move completed actions from the action table into action history."""
+
+    utils.compact_actions(CONF.command.age, CONF.command.granularity)
 
 
 def add_command_parsers(subparsers):
@@ -63,6 +84,25 @@ def add_command_parsers(subparsers):
         choices=['days', 'hours', 'minutes', 'seconds'],
         help=_('Granularity to use for age argument, defaults to days.'))
 
+    parser = subparsers.add_parser('archive_events')
+    parser.set_defaults(func=archive_events)
+    parser.add_argument('age', nargs='?', default='7',
+                        help=_('Age of the events to be archived.'))
+    parser.add_argument(
+        '-g', '--granularity', default='days',
+        choices=['days', 'hours', 'minutes', 'seconds'],
+        help=_('Granularity to use for age argument, defaults to days.'))
+
+    parser = subparsers.add_parser('compact_actions')
+    parser.set_defaults(func=compact_actions)
+    parser.add_argument('age', nargs='?', default='1',
+                        help=_('Time since the actions to be moved have '
+                               'completed.'))
+    parser.add_argument(
+        '-g', '--granularity', default='days',
+        choices=['days', 'hours', 'minutes', 'seconds'],
+        help=_('Granularity to use for age argument, defaults to days.'))
+
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
                                 help='Show available commands.',
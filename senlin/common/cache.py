@@ -0,0 +1,201 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+from eventlet import event
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+
+class VersionedCache(object):
+    '''A size bounded in-memory cache of versioned objects.
+
+    Each entry is stored along with a version, e.g. the revision of the
+    object in the database. A lookup only hits when the caller asks
+    for the same version, so an object changed by another engine is never
+    returned. When the cache is full, the least recently used entry is
+    evicted.
+    '''
+
+    def __init__(self, size=None):
+        '''Initialize the cache.
+
+        :param size: Maximum number of entries kept. The `object_cache_size`
+                     option is used if not specified. A size of 0 disables
+                     the cache.
+        '''
+        self._size = size
+        # key -> [version, value, tick of last use]
+        self._entries = {}
+        self._tick = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        if self._size is None:
+            return cfg.CONF.object_cache_size
+        return self._size
+
+    def get(self, key, version):
+        '''Get the cached value of the given key and version.
+
+        :returns: The cached value, or None if there is no entry for the key
+                  or the entry is of a different version.
+        '''
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._tick += 1
+        entry[2] = self._tick
+        return entry[1]
+
+    def put(self, key, version, value):
+        '''Add or replace the entry of the given key.'''
+        size = self.size
+        if size <= 0:
+            return
+
+        if key not in self._entries:
+            while len(self._entries) >= size:
+                # OrderedDict is not available on py26. Finding the least
+                # recently used entry by a scan is cheap enough for the
+                # cache sizes we use.
+                lru = min(self._entries,
+                          key=lambda k: self._entries[k][2])
+                del self._entries[lru]
+
+        self._tick += 1
+        self._entries[key] = [version, value, self._tick]
+
+    def invalidate(self, key):
+        '''Remove the entry of the given key, if any.'''
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class ExpiringCache(object):
+    '''An in-memory cache of values which expire, e.g. credentials.
+
+    When an entry is missing or about to expire, the first reader loads the
+    value while the other readers of the same key wait for its result
+    instead of loading the value again. So concurrent actions needing the
+    same value cause a single request to the service providing it.
+    '''
+
+    # Entries are refreshed this long before they expire
+    REFRESH_MARGIN = datetime.timedelta(seconds=30)
+
+    def __init__(self, size, ttl=None):
+        '''Initialize the cache.
+
+        :param size: Maximum number of entries kept.
+        :param ttl: Maximum number of seconds an entry is kept. The
+                    `credential_cache_ttl` option is used if not specified.
+                    A TTL of 0 disables the cache, but concurrent loads of
+                    a key are still shared.
+        '''
+        self.size = size
+        self._ttl = ttl
+        # key -> [value, expiry time]
+        self._entries = {}
+        # key -> event sent when the value being loaded is ready
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        if self._ttl is None:
+            return cfg.CONF.credential_cache_ttl
+        return self._ttl
+
+    def get(self, key, load):
+        '''Get the value of the given key, loading it if needed.
+
+        :param load: A function called without arguments to load the value.
+                     It returns a tuple of the value and the time the value
+                     expires at, as a naive datetime in UTC, or None if the
+                     value doesn't expire by itself.
+        :returns: The value.
+        '''
+        now = timeutils.utcnow()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] - self.REFRESH_MARGIN > now:
+            self.hits += 1
+            return entry[0]
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            self.hits += 1
+            return loading.wait()
+
+        self.misses += 1
+        loading = event.Event()
+        self._loading[key] = loading
+        try:
+            value, expires_at = load()
+        except Exception as ex:
+            # The readers waiting get the same error
+            loading.send_exception(ex)
+            raise
+        else:
+            loading.send(value)
+        finally:
+            del self._loading[key]
+
+        self._put(key, value, expires_at)
+        return value
+
+    def _put(self, key, value, expires_at):
+        ttl = self.ttl
+        if ttl <= 0 or self.size <= 0:
+            return
+
+        expiry = timeutils.utcnow() + datetime.timedelta(seconds=ttl)
+        if expires_at is not None:
+            expiry = min(expiry, expires_at)
+
+        if key not in self._entries:
+            while len(self._entries) >= self.size:
+                # The entry expiring first is the least useful one
+                oldest = min(self._entries,
+                             key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+        self._entries[key] = [value, expiry]
+
+    def invalidate(self, key):
+        '''Remove the entry of the given key, if any.'''
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
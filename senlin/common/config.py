@@ -81,6 +81,53 @@ engine_opts = [
                help=_('Maximum events per cluster. Older events will be '
                       'deleted when this is reached.  Set to 0 for unlimited '
                       'events per cluster.')),
+    cfg.IntOpt('event_batch_size',
+               default=50,
+               help=_('Number of events buffered by an engine before they '
+                      'are written into the database together.')),
+    cfg.FloatOpt('event_flush_interval',
+                 default=0.5,
+                 help=_('Maximum seconds an event is buffered before it is '
+                        'written into the database.')),
+    cfg.IntOpt('event_queue_size',
+               default=5000,
+               help=_('Maximum number of events buffered by an engine. When '
+                      'the buffer is full, the code generating an event '
+                      'waits for the buffer to be written out.')),
+    cfg.IntOpt('event_retention_days',
+               default=30,
+               help=_('Number of days events are kept in the event '
+                      'table. Older events are deleted by the periodic '
+                      'purge of an engine and by "senlin-manage '
+                      'purge_deleted". Set to 0 to keep events regardless '
+                      'of their age.')),
+    cfg.IntOpt('event_archive_retention_days',
+               default=0,
+               help=_('Number of days archived events are kept. Older '
+                      'archived events are deleted the same way as the '
+                      'events in the event table. Set to 0 to keep the '
+                      'archive regardless of its age.')),
+    cfg.IntOpt('event_purge_batch_size',
+               default=200,
+               help=_('Maximum number of rows removed by each DELETE '
+                      'statement when purging the database.')),
+    cfg.IntOpt('deleted_retention_days',
+               default=90,
+               help=_('Number of days soft-deleted clusters, nodes and '
+                      'actions are kept in the database before the periodic '
+                      'purge of an engine removes them. Set to 0 to disable '
+                      'the removal.')),
+    cfg.IntOpt('action_retention_hours',
+               default=24,
+               help=_('Number of hours completed actions are kept in the '
+                      'action table. Older ones are moved into the action '
+                      'history, which keeps only their summary, by the '
+                      'periodic purge of an engine. Set to 0 to disable '
+                      'the move.')),
+    cfg.IntOpt('purge_interval',
+               default=3600,
+               help=_('Seconds between database purges done by an engine. '
+                      'Set to 0 to disable the periodic purge.')),
     cfg.IntOpt('default_action_timeout',
                default=3600,
                help=_('Timeout in seconds for actions.')),
@@ -94,10 +141,69 @@ engine_opts = [
                default=240,
                help=_('Error wait time in seconds for cluster action (ie. '
                       'create or update).')),
+    cfg.IntOpt('max_actions_per_engine',
+               default=32,
+               help=_('Maximum number of actions an engine runs at the same '
+                      'time, applied separately to actions requested by '
+                      'users and to actions derived from them. Other READY '
+                      'actions are left in the database for engines with '
+                      'spare capacity.')),
+    cfg.IntOpt('action_claim_interval',
+               default=10,
+               help=_('Seconds between scans of the database for READY '
+                      'actions, in addition to the scans triggered by '
+                      'new action notifications.')),
+    cfg.FloatOpt('notify_coalesce_window',
+                 default=0.05,
+                 help=_('Seconds during which new action notifications are '
+                        'collected and sent to the dispatchers as a single '
+                        'message.')),
+    cfg.IntOpt('heartbeat_interval',
+               default=10,
+               help=_('Seconds between heartbeats recorded by an engine in '
+                      'the database. An engine missing three heartbeats is '
+                      'considered dead, its running actions are failed and '
+                      'its locks released.')),
+    cfg.FloatOpt('stack_poll_interval',
+                 default=1.0,
+                 help=_('Seconds between the polls of the Heat stacks being '
+                        'operated by an engine, right after a stack is '
+                        'added or changed.')),
+    cfg.FloatOpt('stack_poll_max_interval',
+                 default=30.0,
+                 help=_('Maximum seconds between the polls of the Heat '
+                        'stacks being operated by an engine. The interval '
+                        'doubles up to this value while no stack changes.')),
+    cfg.IntOpt('health_check_concurrency',
+               default=100,
+               help=_('Maximum number of nodes whose health is checked at '
+                      'the same time by an engine.')),
+    cfg.IntOpt('health_check_timeout',
+               default=30,
+               help=_('Seconds after which the health check of a node, or '
+                      'of a batch of nodes, is abandoned. Nodes whose '
+                      'check is abandoned keep their status.')),
     cfg.IntOpt('engine_life_check_timeout',
                default=2,
                help=_('RPC timeout for the engine liveness check that is used'
-                      ' for cluster locking.'))]
+                      ' for cluster locking.')),
+    cfg.IntOpt('object_cache_size',
+               default=128,
+               help=_('Maximum number of profiles, and of policies, kept in '
+                      'memory by an engine for reuse across actions. Set to '
+                      '0 to disable the cache.')),
+    cfg.IntOpt('credential_cache_ttl',
+               default=300,
+               help=_('Maximum seconds trusts looked up from Keystone are '
+                      'kept in memory for reuse. Concurrent lookups of the '
+                      'same trust are always shared. Set to 0 to disable '
+                      'the cache.')),
+    cfg.IntOpt('connection_pool_size',
+               default=64,
+               help=_('Maximum number of connections to OpenStack services '
+                      'kept by a process, one for each set of credentials, '
+                      'so that their tokens and HTTP connections are '
+                      'reused. Set to 0 to disable the reuse.'))]
 
 rpc_opts = [
     cfg.StrOpt('host',
@@ -24,8 +24,10 @@ RPC_ATTRS = (
 
 RPC_PARAMS = (
     PARAM_SHOW_DELETED, PARAM_SHOW_NESTED, PARAM_LIMIT, PARAM_GLOBAL_TENANT,
+    PARAM_START_TIME, PARAM_END_TIME,
 ) = (
     'show_deleted', 'show_nested', 'limit', 'global_tenant',
+    'start_time', 'end_time',
 )
 
 ACTION_NAMES = (
@@ -14,14 +14,20 @@
 SDK Client
 '''
 
+import hashlib
+
+from oslo_config import cfg
 from oslo_serialization import jsonutils
 
 from openstack import connection
 from openstack import exceptions
 from openstack import user_preference
 from requests import exceptions as reqexc
+from senlin.common import cache
 from senlin.common.i18n import _
 
+cfg.CONF.import_opt('connection_pool_size', 'senlin.common.config')
+
 USER_AGENT = 'senlin'
 
 exc = exceptions
@@ -170,7 +176,26 @@ def ignore_not_found(ex):
         raise parsed
 
 
+# Connections shared by the clients of this process, see create_connection()
+_pool = None
+
+
+def _connection_pool():
+    global _pool
+    if _pool is None:
+        _pool = cache.VersionedCache(cfg.CONF.connection_pool_size)
+    return _pool
+
+
 def create_connection(context):
+    '''Get a connection using the credentials in the given context.
+
+    Connections are shared by the clients using the same credentials, so
+    that the token obtained and the HTTP connections kept alive by one are
+    reused by the others. A connection authenticated with a password gets
+    a new token by itself when the current one is about to expire, while a
+    new token or password in the context replaces the shared connection.
+    '''
     kwargs = {
         'auth_url': context.auth_url,
         'domain_id': context.domain_id,
@@ -184,6 +209,17 @@ def create_connection(context):
         #  'verify': OS_CACERT, TLS certificate to verify remote server
     }
 
+    key = (context.auth_url, context.domain_id, context.project_id,
+           context.project_domain_id, context.user_domain_id,
+           context.user_id, context.region_name)
+    # Only a digest of the secrets is kept along with the connection
+    secret = u'%s\0%s' % (context.password, context.auth_token)
+    version = hashlib.sha256(secret.encode('utf-8')).hexdigest()
+    pool = _connection_pool()
+    conn = pool.get(key, version)
+    if conn is not None:
+        return conn
+
     pref = user_preference.UserPreference()
     if context.region_name:
         pref.set_region(pref.ALL, context.region_name)
@@ -193,4 +229,6 @@ def create_connection(context):
                                      **kwargs)
     except exceptions.HttpException as ex:
         raise ex
+
+    pool.put(key, version, conn)
     return conn
@@ -16,24 +16,67 @@ Utility methods for serializing responses
 
 import datetime
 import json
+import types
 
 from oslo_log import log as logging
+import six
 
 LOG = logging.getLogger(__name__)
 
+# Number of list items sent in one chunk of a streamed response
+STREAM_BATCH_SIZE = 100
+
+
+def _sanitizer(obj):
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    return obj
+
 
 class JSONResponseSerializer(object):
 
     def to_json(self, data):
-        def sanitizer(obj):
-            if isinstance(obj, datetime.datetime):
-                return obj.isoformat()
-            return obj
-
-        response = json.dumps(data, default=sanitizer)
+        response = json.dumps(data, default=_sanitizer)
         LOG.debug("JSON response : %s" % response)
         return response
 
+    def to_json_stream(self, data):
+        '''Serialize a dict whose values may be generators, in chunks.
+
+        Each generator is written as a JSON array whose items are sent as
+        they are produced, so the whole list is never held in memory.
+        '''
+        sep = '{'
+        for key, value in six.iteritems(data):
+            yield (sep + json.dumps(key) + ': ').encode('utf-8')
+            sep = ', '
+            if not isinstance(value, types.GeneratorType):
+                yield json.dumps(value, default=_sanitizer).encode('utf-8')
+                continue
+
+            started = False
+            batch = []
+            for item in value:
+                batch.append(json.dumps(item, default=_sanitizer))
+                if len(batch) == STREAM_BATCH_SIZE:
+                    yield self._array_chunk(batch, started)
+                    started = True
+                    batch = []
+            if batch or not started:
+                yield self._array_chunk(batch, started)
+            yield ']'.encode('utf-8')
+
+        yield '}'.encode('utf-8')
+
+    @staticmethod
+    def _array_chunk(items, started):
+        prefix = ', ' if started else '['
+        return (prefix + ', '.join(items)).encode('utf-8')
+
     def default(self, response, result):
         response.content_type = 'application/json'
-        response.body = self.to_json(result)
+        if isinstance(result, dict) and any(
+                isinstance(v, types.GeneratorType) for v in result.values()):
+            response.app_iter = self.to_json_stream(result)
+        else:
+            response.body = self.to_json(result)
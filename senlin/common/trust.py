@@ -11,13 +11,22 @@
 # under the License.
 
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
+from senlin.common import cache
 from senlin.common import sdk
 from senlin.common import wsgi
 from senlin.openstack.identity.v3 import trust
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of trusts, and of trust lists, kept in memory
+TRUST_CACHE_SIZE = 1024
+
+# Trusts seldom change, so they are cached instead of being looked up from
+# Keystone on every request. The trust lists are cached along with them.
+_cache = cache.ExpiringCache(TRUST_CACHE_SIZE)
+
 
 class SenlinTrust(object):
     '''Stores information about the trust of requester.
@@ -53,50 +62,72 @@ class SenlinTrust(object):
         return cls(**values)
 
 
-def get_trust(context, trust_id):
-    '''Get trust detail information.'''
-    conn = sdk.create_connection(context)
-    session = conn.session
+def _expiry(expires_at):
+    '''Convert the expiry time of a trust into a naive datetime in UTC.'''
+    if expires_at is None:
+        return None
+    try:
+        return timeutils.normalize_time(timeutils.parse_isotime(expires_at))
+    except ValueError:
+        return None
 
-    params = {
-        'id': trust_id
-    }
-    obj = trust.Trust.new(**params)
-    result = obj.get(session)
 
-    return result
+def get_trust(context, trust_id):
+    '''Get trust detail information.'''
 
+    def load():
+        conn = sdk.create_connection(context)
+        session = conn.session
 
-def list_trust(context, trustee_user_id=None, trustor_user_id=None):
-    conn = sdk.create_connection(context)
-    session = conn.session
-
-    trusts = []
-    params = {}
-    if trustee_user_id is not None:
-        params['trustee_user_id'] = trustee_user_id
-
-    if trustor_user_id is not None:
-        params['trustor_user_id'] = trustor_user_id
-
-    result = trust.Trust.list(session, **params)
-    for obj in result:
-        trust_item = {
-            'id': obj.id,
-            'project_id': obj.project_id,
-            'expires_at': obj.expires_at,
-            'impersonation': obj.impersonation,
-            'trustee_user_id': obj.trustee_user_id,
-            'trustor_user_id': obj.trustor_user_id
+        params = {
+            'id': trust_id
         }
+        obj = trust.Trust.new(**params)
+        result = obj.get(session)
+        return result, _expiry(result.expires_at)
 
-        # Get roles information of trust
-        trust_detail = get_trust(context, obj.id)
-        trust_item['roles'] = trust_detail.roles
+    return _cache.get(('trust', context.user_id, trust_id), load)
 
-        trusts.append(trust_item)
 
-    return trusts
+def list_trust(context, trustee_user_id=None, trustor_user_id=None):
+
+    def load():
+        conn = sdk.create_connection(context)
+        session = conn.session
+
+        trusts = []
+        params = {}
+        if trustee_user_id is not None:
+            params['trustee_user_id'] = trustee_user_id
+
+        if trustor_user_id is not None:
+            params['trustor_user_id'] = trustor_user_id
+
+        result = trust.Trust.list(session, **params)
+        for obj in result:
+            trust_item = {
+                'id': obj.id,
+                'project_id': obj.project_id,
+                'expires_at': obj.expires_at,
+                'impersonation': obj.impersonation,
+                'trustee_user_id': obj.trustee_user_id,
+                'trustor_user_id': obj.trustor_user_id
+            }
+
+            # Get roles information of trust
+            trust_detail = get_trust(context, obj.id)
+            trust_item['roles'] = trust_detail.roles
+
+            trusts.append(trust_item)
+
+        # The list changes when one of the trusts expires
+        expiries = [e for e in (_expiry(t['expires_at']) for t in trusts)
+                    if e is not None]
+        return trusts, min(expiries) if expiries else None
+
+    key = ('list', context.user_id, trustee_user_id, trustor_user_id)
+    # Callers get their own copy of the list
+    return [dict(t) for t in _cache.get(key, load)]
 
 
 class TrustMiddleware(wsgi.Middleware):
@@ -24,6 +24,7 @@ import uuid
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import strutils
+from oslo_utils import timeutils
 
 from senlin.common import exception
 from senlin.common.i18n import _
@@ -99,6 +100,17 @@ def parse_bool_param(name, value):
     return strutils.bool_from_string(value, strict=True)
 
 
+def parse_time_param(name, value):
+    """Parse an ISO 8601 time into a naive datetime in UTC."""
+    if value is None:
+        return None
+
+    try:
+        return timeutils.normalize_time(timeutils.parse_isotime(value))
+    except (TypeError, ValueError):
+        raise exception.InvalidParameter(name=name, value=value)
+
+
 def url_fetch(url, allowed_schemes=('http', 'https')):
     '''Get the data at the specified URL.
 
@@ -142,3 +154,33 @@ def url_fetch(url, allowed_schemes=('http', 'https')):
 
     except exceptions.RequestException as ex:
         raise URLFetchError(_('Failed to retrieve data: %s') % ex)
+
+
+class RuntimeData(dict):
+    """A dict of runtime data which is loaded on first access.
+
+    Values not set explicitly are computed by the loader registered for the
+    key when it is first read, and kept until they are invalidated.
+    """
+
+    def __init__(self, loaders=None):
+        super(RuntimeData, self).__init__()
+        self.loaders = loaders or {}
+
+    def __missing__(self, key):
+        if key not in self.loaders:
+            raise KeyError(key)
+        value = self.loaders[key]()
+        self[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def invalidate(self, *keys):
+        """Drop the given values, or all of them, so they are reloaded."""
+        for key in keys or list(self.keys()):
+            self.pop(key, None)
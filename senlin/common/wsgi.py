@@ -76,6 +76,10 @@ api_opts = [
     cfg.IntOpt('workers', default=0,
                help=_("Number of workers for Senlin service."),
                deprecated_group='DEFAULT'),
+    cfg.IntOpt('list_page_size', default=500,
+               help=_("Number of objects fetched from the engine at a time "
+                      "when a listing is requested without a limit. The "
+                      "response is streamed as the pages arrive.")),
 ]
 api_group = cfg.OptGroup('senlin_api')
 cfg.CONF.register_group(api_group)
@@ -94,6 +94,10 @@ def node_create(context, values):
     return IMPL.node_create(context, values)
 
 
+def node_create_many(context, values_list):
+    return IMPL.node_create_many(context, values_list)
+
+
 def node_get(context, node_id, show_deleted=False):
     return IMPL.node_get(context, node_id, show_deleted=show_deleted)
 
@@ -117,6 +121,11 @@ def node_get_all(context, cluster_id=None, show_deleted=False,
                              filters=filters, tenant_safe=tenant_safe)
 
 
+def node_get_ids_by_clusters(context, cluster_ids, tenant_safe=True):
+    return IMPL.node_get_ids_by_clusters(context, cluster_ids,
+                                         tenant_safe=tenant_safe)
+
+
 def node_get_all_by_cluster(context, cluster_id):
     return IMPL.node_get_all_by_cluster(context, cluster_id)
 
@@ -134,6 +143,11 @@ def node_update(context, node_id, values):
     return IMPL.node_update(context, node_id, values)
 
 
+def node_update_all(context, node_ids, values, expected_status=None):
+    return IMPL.node_update_all(context, node_ids, values,
+                                expected_status=expected_status)
+
+
 def node_migrate(context, node_id, to_cluster, timestamp):
     return IMPL.node_migrate(context, node_id, to_cluster, timestamp)
 
@@ -151,6 +165,10 @@ def cluster_lock_release(cluster_id, action_id, scope):
     return IMPL.cluster_lock_release(cluster_id, action_id, scope)
 
 
+def cluster_lock_handoff(cluster_id):
+    return IMPL.cluster_lock_handoff(cluster_id)
+
+
 def cluster_lock_steal(node_id, action_id):
     return IMPL.cluster_lock_steal(node_id, action_id)
 
@@ -167,6 +185,27 @@ def node_lock_steal(node_id, action_id):
     return IMPL.node_lock_steal(node_id, action_id)
 
 
+# Engines
+def engine_heartbeat(context, engine_id, host, timestamp):
+    return IMPL.engine_heartbeat(context, engine_id, host, timestamp)
+
+
+def engine_get(context, engine_id):
+    return IMPL.engine_get(context, engine_id)
+
+
+def engine_get_all(context):
+    return IMPL.engine_get_all(context)
+
+
+def engine_delete(context, engine_id, timestamp):
+    return IMPL.engine_delete(context, engine_id, timestamp)
+
+
+def engine_gc(context, engine_id, expiry, timestamp):
+    return IMPL.engine_gc(context, engine_id, expiry, timestamp)
+
+
 # Policies
 def policy_create(context, values):
     return IMPL.policy_create(context, values)
@@ -176,6 +215,10 @@ def policy_get(context, policy_id, show_deleted=False):
     return IMPL.policy_get(context, policy_id, show_deleted=show_deleted)
 
 
+def policy_get_version(context, policy_id):
+    return IMPL.policy_get_version(context, policy_id)
+
+
 def policy_get_by_name(context, name, show_deleted=False):
     return IMPL.policy_get_by_name(context, name, show_deleted=show_deleted)
 
@@ -211,6 +254,10 @@ def cluster_policy_get_all(context, cluster_id, filters=None,
                                        sort_keys=sort_keys, sort_dir=sort_dir)
 
 
+def cluster_policy_get_by_type(context, policy_type):
+    return IMPL.cluster_policy_get_by_type(context, policy_type)
+
+
 def cluster_policy_attach(context, cluster_id, policy_id, values):
     return IMPL.cluster_policy_attach(context, cluster_id, policy_id, values)
 
@@ -232,6 +279,14 @@ def profile_get(context, profile_id, show_deleted=False):
     return IMPL.profile_get(context, profile_id, show_deleted=show_deleted)
 
 
+def profile_get_version(context, profile_id):
+    return IMPL.profile_get_version(context, profile_id)
+
+
+def profile_get_names(context, profile_ids):
+    return IMPL.profile_get_names(context, profile_ids)
+
+
 def profile_get_by_name(context, name, show_deleted=False):
     return IMPL.profile_get_by_name(context, name, show_deleted=show_deleted)
 
@@ -260,6 +315,18 @@ def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
+def event_create_many(context, values_list):
+    return IMPL.event_create_many(context, values_list)
+
+
+def event_archive(context, age, granularity='days'):
+    return IMPL.event_archive(context, age, granularity=granularity)
+
+
+def event_archive_horizon(context):
+    return IMPL.event_archive_horizon(context)
+
+
 def event_get(context, event_id):
     return IMPL.event_get(context, event_id)
 
@@ -270,12 +337,13 @@ def event_get_by_short_id(context, short_id):
 
 def event_get_all(context, limit=None, marker=None, sort_keys=None,
                   sort_dir=None, filters=None, tenant_safe=True,
-                  show_deleted=False):
+                  show_deleted=False, start_time=None, end_time=None):
 
     return IMPL.event_get_all(context, limit=limit, marker=marker,
                               sort_keys=sort_keys, sort_dir=sort_dir,
                               filters=filters, tenant_safe=tenant_safe,
-                              show_deleted=show_deleted)
+                              show_deleted=show_deleted,
+                              start_time=start_time, end_time=end_time)
 
 
 def event_count_by_cluster(context, cluster_id):
@@ -291,15 +359,32 @@ def event_get_all_by_cluster(context, cluster_id, limit=None, marker=None,
                                          filters=filters)
 
 
+def event_prune(context, cluster_id=None):
+    return IMPL.event_prune(context, cluster_id=cluster_id)
+
+
+def event_purge(context, age, granularity='days', archived=False):
+    return IMPL.event_purge(context, age, granularity=granularity,
+                            archived=archived)
+
+
 # Actions
 def action_create(context, values):
     return IMPL.action_create(context, values)
 
 
+def action_create_many(context, values_list, dependent=None):
+    return IMPL.action_create_many(context, values_list, dependent=dependent)
+
+
 def action_get(context, action_id):
     return IMPL.action_get(context, action_id)
 
 
+def action_get_status(context, action_ids):
+    return IMPL.action_get_status(context, action_ids)
+
+
 def action_get_by_name(context, name):
     return IMPL.action_get_by_name(context, name)
 
@@ -352,6 +437,15 @@ def action_acquire(context, action_id, owner, timestamp):
     return IMPL.action_acquire(context, action_id, owner, timestamp)
 
 
+def action_acquire_1st_ready(context, owner, timestamp, derived=False):
+    return IMPL.action_acquire_1st_ready(context, owner, timestamp,
+                                         derived=derived)
+
+
+def action_count_ready(context):
+    return IMPL.action_count_ready(context)
+
+
 def action_abandon(context, action_id):
     return IMPL.action_abandon(context, action_id)
 
@@ -366,15 +460,27 @@ def action_signal(context, action_id, value):
     return IMPL.action_signal(context, action_id, value)
 
 
-def action_signal_query(context, action_id):
+def action_get_control(context, action_id):
     '''Query signal status for the sepcified action.'''
-    return IMPL.action_signal_query(context, action_id)
+    return IMPL.action_get_control(context, action_id)
+
+
+def action_compact(context, age, granularity='days'):
+    return IMPL.action_compact(context, age, granularity=granularity)
+
+
+def action_history_get_all(context, target=None):
+    return IMPL.action_history_get_all(context, target=target)
 
 
 def action_delete(context, action_id, force=False):
     return IMPL.action_delete(context, action_id, force)
 
 
+def purge_deleted(age, granularity='days', context=None):
+    return IMPL.purge_deleted(age, granularity=granularity, context=context)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -14,17 +14,22 @@
 Implementation of SQLAlchemy backend.
 '''
 
+import datetime
 import six
 import sys
+import time
+import uuid
 
 from oslo_config import cfg
+from oslo_db import exception as db_exception
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils
 from oslo_log import log as logging
 from oslo_utils import timeutils
 
-from sqlalchemy import exc
+from sqlalchemy import orm
 from sqlalchemy.orm import session as orm_session
+from sqlalchemy import sql
 
 from senlin.common import consts
 from senlin.common import exception
@@ -38,6 +43,7 @@ LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 CONF.import_opt('max_events_per_cluster', 'senlin.common.config')
+CONF.import_opt('event_purge_batch_size', 'senlin.common.config')
 
 # Action status definitions:
 #  ACTION_INIT:      Not ready to be executed because fields are being
@@ -56,6 +62,19 @@ ACTION_STATUSES = (
     'SUCCEEDED', 'FAILED', 'CANCELLED',
 )
 
+# Cause of the actions derived from other actions, i.e. CAUSE_DERIVED in
+# senlin.engine.actions.base.
+ACTION_CAUSE_DERIVED = 'Derived Action'
+
+# Number of READY actions fetched as candidates each time an engine tries
+# to claim one, and the number of times it tries before giving up.
+ACTION_CLAIM_CANDIDATES = 10
+ACTION_CLAIM_ATTEMPTS = 3
+
+# Number of times a lock operation is tried when the lock row keeps being
+# created or removed by others in between.
+LOCK_ATTEMPTS = 3
+
 _facade = None
 
 
@@ -94,7 +113,8 @@ def _get_sort_keys(sort_keys, mapping):
 
 
 def _paginate_query(context, query, model, limit=None, marker=None,
-                    sort_keys=None, sort_dir=None, default_sort_keys=None):
+                    sort_keys=None, sort_dir=None, default_sort_keys=None,
+                    marker_models=None):
     if not sort_keys:
         sort_keys = default_sort_keys or []
         if not sort_dir:
@@ -106,7 +126,14 @@ def _paginate_query(context, query, model, limit=None, marker=None,
 
     model_marker = None
     if marker:
-        model_marker = model_query(context, model).get(marker)
+        # Pages are fetched by seeking past the sort key values of the
+        # marker, which are all we need from the marker row.
+        for m in marker_models or [model]:
+            columns = [getattr(m, k) for k in sort_keys if hasattr(m, k)]
+            model_marker = model_query(context, *columns).\
+                filter(m.id == marker).first()
+            if model_marker is not None:
+                break
     try:
         query = utils.paginate_query(query, model, limit, sort_keys,
                                      model_marker, sort_dir)
@@ -130,12 +157,30 @@ def soft_delete_aware_query(context, *args, **kwargs):
     return query
 
 
+def _get_version(context, model, obj_id):
+    '''Get the version of an object without loading the whole row.
+
+    :returns: The revision of the object, which is increased by every
+              update. None is returned if the object is not found or has
+              been deleted.
+    '''
+    row = model_query(context, model.revision).\
+        filter(model.id == obj_id).\
+        filter(model.deleted_time.is_(None)).first()
+    if row is None:
+        return None
+    return row.revision
+
+
 def query_by_short_id(context, model, short_id, show_deleted=False):
     q = soft_delete_aware_query(context, model, show_deleted=show_deleted)
     q = q.filter(model.id.like('%s%%' % short_id))
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
+    # Fetching at most two rows is enough to tell whether the match is
+    # unique, and it avoids running the query three times.
+    results = q.limit(2).all()
+    if len(results) == 1:
+        return results[0]
+    elif len(results) == 0:
         return None
     else:
         raise exception.MultipleChoices(arg=short_id)
@@ -149,9 +194,10 @@ def query_by_name(context, model, name, tenant_safe=False,
     if tenant_safe:
         q = q.filter_by(project=context.tenant_id)
 
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
+    results = q.limit(2).all()
+    if len(results) == 1:
+        return results[0]
+    elif len(results) == 0:
         return None
     else:
         raise exception.MultipleChoices(arg=name)
@@ -194,19 +240,21 @@ def cluster_get_by_short_id(context, short_id):
 
 
 def cluster_get_next_index(context, cluster_id):
-    query = model_query(context, models.Cluster)
-    session = query.session
+    session = _session(context)
     session.begin()
-    cluster = query.get(cluster_id)
-
-    if cluster is None:
+    updated = session.query(models.Cluster).\
+        filter_by(id=cluster_id).\
+        update({'next_index': models.Cluster.next_index + 1},
+               synchronize_session=False)
+    if not updated:
         session.rollback()
         return None
 
-    index = cluster.next_index
-    cluster.next_index += 1
-    cluster.save(session)
+    # The row stays locked by the UPDATE until the commit
+    index = session.query(models.Cluster.next_index).\
+        filter(models.Cluster.id == cluster_id).scalar() - 1
     session.commit()
+    session.expire_all()
     return index
 
 
@@ -325,6 +373,48 @@ def node_create(context, values):
     return node
 
 
+def node_create_many(context, values_list):
+    '''Create a batch of nodes in a single transaction.
+
+    The size and next_index of the owning clusters are bumped once for all
+    the nodes created, instead of once for each node.
+
+    :param values_list: a list of dicts, each for a node to be created.
+    :returns: a list of the node objects created.
+    '''
+    session = _session(context)
+    session.begin()
+    nodes = []
+    counts = {}
+    for values in values_list:
+        values = dict(values)
+        values.setdefault('id', str(uuid.uuid4()))
+        if 'status_reason' in values:
+            values['status_reason'] = values['status_reason'][:255]
+        node = models.Node()
+        node.update(values)
+        nodes.append(node)
+
+        cluster_id = values.get('cluster_id', None)
+        if cluster_id is not None:
+            counts[cluster_id] = counts.get(cluster_id, 0) + 1
+
+    for cluster_id, count in counts.items():
+        cluster = session.query(models.Cluster).get(cluster_id)
+        if cluster is None:
+            session.rollback()
+            msg = _('Cluster with id "%s" not found') % cluster_id
+            raise exception.NotFound(msg)
+        cluster.size += count
+        cluster.next_index += count
+
+    # With primary keys already assigned, the nodes are flushed using
+    # executemany() rather than one INSERT statement per node.
+    session.add_all(nodes)
+    session.commit()
+    return nodes
+
+
 def node_get(context, node_id, show_deleted=False):
     node = model_query(context, models.Node).get(node_id)
     if not node:
@@ -386,6 +476,26 @@ def node_get_all(context, cluster_id=None, show_deleted=False,
                            default_sort_keys=['init_time']).all()
 
 
+def node_get_ids_by_clusters(context, cluster_ids, tenant_safe=True):
+    '''Get the IDs of the nodes in some clusters without loading the rows.
+
+    :param cluster_ids: a list of cluster IDs.
+    :returns: A dict mapping each cluster ID to a list of node IDs, in the
+              order of node creation.
+    '''
+    query = model_query(context, models.Node.id, models.Node.cluster_id).\
+        filter(models.Node.cluster_id.in_(cluster_ids)).\
+        filter(models.Node.deleted_time.is_(None))
+    if tenant_safe:
+        query = query.filter(models.Node.project == context.tenant_id)
+
+    result = dict((cluster_id, []) for cluster_id in cluster_ids)
+    query = query.order_by(models.Node.init_time, models.Node.id)
+    for row in query:
+        result[row.cluster_id].append(row.id)
+    return result
+
+
 def node_get_all_by_cluster(context, cluster_id):
     query = model_query(context, models.Node).filter_by(cluster_id=cluster_id)
     nodes = query.all()
@@ -434,6 +544,46 @@ def node_update(context, node_id, values):
     session.commit()
 
 
+def node_update_all(context, node_ids, values, expected_status=None):
+    '''Update a number of nodes with the same property values at once.
+
+    :param node_ids: IDs of the nodes to be updated.
+    :param values: A dictionary of values to be updated on the nodes.
+    :param expected_status: If specified, only the nodes in this status are
+                            updated, so that nodes changed by others in the
+                            meantime are left alone.
+    :returns: Number of nodes updated.
+    '''
+    if not node_ids:
+        return 0
+
+    session = _session(context)
+    session.begin()
+
+    query = session.query(models.Node).\
+        filter(models.Node.id.in_(node_ids)).\
+        filter(models.Node.deleted_time.is_(None))
+    if expected_status is not None:
+        query = query.filter_by(status=expected_status)
+
+    cluster_ids = [r[0] for r in query.with_entities(
+        models.Node.cluster_id).distinct() if r[0] is not None]
+    count = query.update(values, synchronize_session=False)
+
+    # Same as node_update(), but with one update for all the clusters
+    if count and cluster_ids and values.get('status') == 'ERROR':
+        cluster_values = {'status': 'WARNING'}
+        if 'status_reason' in values:
+            reason = _('%(count)s nodes: %(reason)s') % {
+                'count': count, 'reason': values['status_reason']}
+            cluster_values['status_reason'] = reason
+        session.query(models.Cluster).\
+            filter(models.Cluster.id.in_(cluster_ids)).\
+            update(cluster_values, synchronize_session=False)
+    session.commit()
+    return count
+
+
 def node_migrate(context, node_id, to_cluster, timestamp):
     session = _session(context)
     session.begin()
@@ -473,9 +623,67 @@ def node_delete(context, node_id, force=False):
 
 
 # Locks
+def _cluster_lock_holders(session, cluster_id):
+    query = session.query(models.ClusterLockHolder.action_id).\
+        filter_by(cluster_id=cluster_id)
+    return [row.action_id for row in query]
+
+
+def _lock_insert(session, rows):
+    '''Insert the rows of a new lock in a transaction of their own.
+
+    :param rows: a list of (model, values) tuples, the lock row first.
+    :return: False if the lock row exists already, True otherwise.
+    '''
+    session.begin()
+    try:
+        for model, values in rows:
+            session.execute(model.__table__.insert(), values)
+        session.commit()
+    except db_exception.DBDuplicateEntry:
+        session.rollback()
+        return False
+    return True
+
+
+def _cluster_lock_take(session, cluster_id, action_id, scope):
+    holder = {'cluster_id': cluster_id, 'action_id': action_id}
+    for attempt in range(LOCK_ATTEMPTS):
+        if scope == 1:
+            session.begin()
+            shared = session.query(models.ClusterLock).\
+                filter_by(cluster_id=cluster_id).\
+                filter(models.ClusterLock.semaphore > 0).\
+                update({'semaphore': models.ClusterLock.semaphore + 1},
+                       synchronize_session=False)
+            if shared:
+                session.execute(models.ClusterLockHolder.__table__.insert(),
+                                holder)
+            session.commit()
+            if shared:
+                return
+
+        lock = {'cluster_id': cluster_id, 'semaphore': scope}
+        if _lock_insert(session, [(models.ClusterLock, lock),
+                                  (models.ClusterLockHolder, holder)]):
+            return
+
+        if scope == -1:
+            return
+
+
 def cluster_lock_acquire(cluster_id, action_id, scope):
     '''Acquire lock on a cluster.
 
+    The lock row is created by a conditional INSERT and shared by a
+    conditional UPDATE of its semaphore, so concurrent acquirers are
+    serialized by the database.
+
+    Actions failing to get the lock are put into a FIFO wait queue. An
+    action never takes the lock ahead of a cluster-level action queued
+    before it, so a stream of node-level actions cannot starve a
+    cluster-level one.
+
     :param cluster_id: ID of the cluster.
     :param action_id: ID of the action that attempts to lock the cluster.
     :param scope: +1 means a node-level operation lock; -1 indicates
@@ -483,27 +691,40 @@ def cluster_lock_acquire(cluster_id, action_id, scope):
     :return: A list of action IDs that currently works on the cluster.
     '''
     session = get_session()
-    session.begin()
-    lock = session.query(models.ClusterLock).get(cluster_id)
-    if lock is not None:
-        if scope == 1 and lock.semaphore > 0:
-            if action_id not in lock.action_ids:
-                lock.action_ids.append(six.text_type(action_id))
-                lock.semaphore += 1
-                lock.save(session)
-    else:
-        lock = models.ClusterLock(cluster_id=cluster_id,
-                                  action_ids=[six.text_type(action_id)],
-                                  semaphore=scope)
-        session.add(lock)
+    holders = _cluster_lock_holders(session, cluster_id)
+    if action_id in holders:
+        return holders
 
-    session.commit()
-    return lock.action_ids
+    waiters = session.query(models.ClusterLockWaiter).\
+        filter_by(cluster_id=cluster_id)
+    queued = waiters.filter_by(action_id=action_id).first()
+    ahead = waiters
+    if queued is not None:
+        ahead = ahead.filter(models.ClusterLockWaiter.id < queued.id)
+    if scope == 1:
+        ahead = ahead.filter_by(scope=-1)
+
+    if ahead.first() is None:
+        _cluster_lock_take(session, cluster_id, action_id, scope)
+        holders = _cluster_lock_holders(session, cluster_id)
+        if action_id in holders:
+            if queued is not None:
+                waiters.filter_by(id=queued.id).\
+                    delete(synchronize_session=False)
+            return holders
+
+    if queued is None:
+        session.execute(models.ClusterLockWaiter.__table__.insert(),
+                        {'cluster_id': cluster_id, 'action_id': action_id,
+                         'scope': scope})
+    return holders
 
 
 def cluster_lock_release(cluster_id, action_id, scope):
     '''Release lock on a cluster.
 
+    The action is removed from the wait queue as well, if it is there.
+
     :param cluster_id: ID of the cluster.
     :param action_id: ID of the action that attempts to release the cluster.
     :param scope: +1 means a node-level operation lock; -1 indicates
@@ -512,86 +733,275 @@ def cluster_lock_release(cluster_id, action_id, scope):
     '''
     session = get_session()
     session.begin()
-    lock = session.query(models.ClusterLock).get(cluster_id)
-    if lock is None:
-        session.commit()
-        return False
-
-    success = False
-    if scope == -1 or lock.semaphore == 1:
-        if six.text_type(action_id) in lock.action_ids:
-            session.delete(lock)
-            success = True
-    elif action_id in lock.action_ids:
-        if lock.semaphore == 1:
-            session.delete(lock)
-        else:
-            lock.action_ids.remove(six.text_type(action_id))
-            lock.semaphore -= 1
-            lock.save(session)
-        success = True
+    session.query(models.ClusterLockWaiter).\
+        filter_by(cluster_id=cluster_id, action_id=action_id).\
+        delete(synchronize_session=False)
+    released = session.query(models.ClusterLockHolder).\
+        filter_by(cluster_id=cluster_id, action_id=action_id).\
+        delete(synchronize_session=False)
+    if released:
+        # The last holder removes the lock row, the others only decrease
+        # the semaphore.
+        query = session.query(models.ClusterLock).\
+            filter_by(cluster_id=cluster_id)
+        shared = query.filter(models.ClusterLock.semaphore > 1).\
+            update({'semaphore': models.ClusterLock.semaphore - 1},
+                   synchronize_session=False)
+        if not shared:
+            query.delete(synchronize_session=False)
 
     session.commit()
-    return success
+    return released == 1
 
 
-def cluster_lock_steal(cluster_id, action_id):
+def cluster_lock_handoff(cluster_id):
+    '''Give a free cluster lock to the actions first in its wait queue.
+
+    The first waiter gets the lock. If it is a node-level action, all the
+    node-level actions queued before the next cluster-level one share
+    the lock with it.
+
+    :param cluster_id: ID of the cluster.
+    :return: A list of IDs of the actions that got the lock.
+    '''
     session = get_session()
+    waiters = session.query(models.ClusterLockWaiter).\
+        filter_by(cluster_id=cluster_id).\
+        order_by(models.ClusterLockWaiter.id).all()
+    if not waiters:
+        return []
+
+    granted = waiters[:1]
+    if granted[0].scope == 1:
+        for waiter in waiters[1:]:
+            if waiter.scope != 1:
+                break
+            granted.append(waiter)
+
+    semaphore = -1 if granted[0].scope == -1 else len(granted)
     session.begin()
-    lock = session.query(models.ClusterLock).get(cluster_id)
-    if lock is not None:
-        lock.action_ids = [action_id]
-        lock.semaphore = -1
-        lock.save(session)
-    else:
-        lock = models.ClusterLock(cluster_id=cluster_id,
-                                  action_ids=[action_id],
-                                  semaphore=-1)
-        session.add(lock)
+    try:
+        session.execute(models.ClusterLock.__table__.insert(),
+                        {'cluster_id': cluster_id, 'semaphore': semaphore})
+        session.execute(models.ClusterLockHolder.__table__.insert(),
+                        [{'cluster_id': cluster_id,
+                          'action_id': w.action_id} for w in granted])
+        session.query(models.ClusterLockWaiter).\
+            filter(models.ClusterLockWaiter.id.in_([w.id for w in granted])).\
+            delete(synchronize_session=False)
+        session.commit()
+    except db_exception.DBDuplicateEntry:
+        # The lock is not free
+        session.rollback()
+        return []
+
+    return [w.action_id for w in granted]
+
 
+def cluster_lock_steal(cluster_id, action_id):
+    session = get_session()
+    session.begin()
+    session.query(models.ClusterLockWaiter).\
+        filter_by(cluster_id=cluster_id, action_id=action_id).\
+        delete(synchronize_session=False)
+    session.query(models.ClusterLockHolder).\
+        filter_by(cluster_id=cluster_id).\
+        delete(synchronize_session=False)
+    locked = session.query(models.ClusterLock).\
+        filter_by(cluster_id=cluster_id).\
+        update({'semaphore': -1}, synchronize_session=False)
+    if not locked:
+        session.execute(models.ClusterLock.__table__.insert(),
+                        {'cluster_id': cluster_id, 'semaphore': -1})
+    session.execute(models.ClusterLockHolder.__table__.insert(),
+                    {'cluster_id': cluster_id, 'action_id': action_id})
     session.commit()
-    return lock.action_ids
+    return _cluster_lock_holders(session, cluster_id)
 
 
 def node_lock_acquire(node_id, action_id):
+    '''Acquire lock on a node with a conditional INSERT.
+
+    :return: ID of the action that owns the lock, or None if the lock kept
+             being released while trying.
+    '''
     session = get_session()
-    session.begin()
+    lock = {'node_id': node_id, 'action_id': action_id}
+    for attempt in range(LOCK_ATTEMPTS):
+        if _lock_insert(session, [(models.NodeLock, lock)]):
+            return action_id
 
-    lock = session.query(models.NodeLock).get(node_id)
-    if lock is None:
-        lock = models.NodeLock(node_id=node_id, action_id=action_id)
-        session.add(lock)
-    session.commit()
+        owner = session.query(models.NodeLock.action_id).\
+            filter_by(node_id=node_id).scalar()
+        if owner is not None:
+            return owner
 
-    return lock.action_id
+    return None
 
 
 def node_lock_release(node_id, action_id):
     session = get_session()
     session.begin()
-
-    success = False
-    lock = session.query(models.NodeLock).get(node_id)
-    if lock is not None and lock.action_id == action_id:
-        session.delete(lock)
-        success = True
-
+    released = session.query(models.NodeLock).\
+        filter_by(node_id=node_id, action_id=action_id).\
+        delete(synchronize_session=False)
     session.commit()
-    return success
+    return released == 1
 
 
 def node_lock_steal(node_id, action_id):
     session = get_session()
     session.begin()
-    lock = session.query(models.NodeLock).get(node_id)
-    if lock is not None:
-        lock.action_id = action_id
-        lock.save(session)
-    else:
-        lock = models.NodeLock(node_id=node_id, action_id=action_id)
-        session.add(lock)
+    locked = session.query(models.NodeLock).\
+        filter_by(node_id=node_id).\
+        update({'action_id': action_id}, synchronize_session=False)
+    if not locked:
+        session.execute(models.NodeLock.__table__.insert(),
+                        {'node_id': node_id, 'action_id': action_id})
     session.commit()
-    return lock.action_id
+    return action_id
+
+
+def _lock_release_all(session, action_ids):
+    '''Release all locks held or waited for by some actions.
+
+    :return: IDs of the clusters whose locks were released.
+    '''
+    session.query(models.NodeLock).\
+        filter(models.NodeLock.action_id.in_(action_ids)).\
+        delete(synchronize_session=False)
+    session.query(models.ClusterLockWaiter).\
+        filter(models.ClusterLockWaiter.action_id.in_(action_ids)).\
+        delete(synchronize_session=False)
+
+    holders = session.query(models.ClusterLockHolder).\
+        filter(models.ClusterLockHolder.action_id.in_(action_ids))
+    cluster_ids = set(holder.cluster_id for holder in holders)
+    if not cluster_ids:
+        return []
+    holders.delete(synchronize_session=False)
+
+    # Shared locks keep the remaining holders, the others are removed.
+    holder = models.ClusterLockHolder
+    lock = models.ClusterLock
+    remaining = sql.select([sql.func.count(holder.action_id)]).\
+        where(holder.cluster_id == lock.cluster_id).as_scalar()
+    locks = session.query(lock).filter(lock.cluster_id.in_(cluster_ids))
+    locks.filter(lock.semaphore > 0).\
+        update({'semaphore': remaining}, synchronize_session=False)
+    locks.filter(~sql.exists().where(holder.cluster_id == lock.cluster_id)).\
+        delete(synchronize_session=False)
+    return list(cluster_ids)
+
+
+# Engines
+def engine_heartbeat(context, engine_id, host, timestamp):
+    '''Record a heartbeat of an engine, registering it if needed.'''
+    session = _session(context)
+    updated = session.query(models.Engine).\
+        filter_by(id=engine_id).\
+        update({'updated_time': timestamp}, synchronize_session=False)
+    if not updated:
+        engine = models.Engine(id=engine_id, host=host,
+                               created_time=timestamp,
+                               updated_time=timestamp)
+        engine.save(session)
+
+
+def engine_get(context, engine_id):
+    return model_query(context, models.Engine).get(engine_id)
+
+
+def engine_get_all(context):
+    return model_query(context, models.Engine).all()
+
+
+def _engine_release(session, engine_id, timestamp, reason):
+    '''Fail the actions of an engine and release all locks they hold.
+
+    The work is done with a fixed number of statements however many
+    actions and locks are involved.
+
+    :return: IDs of the clusters whose locks were released.
+    '''
+    # Actions waiting for their dependents are left without a thread as
+    # well, so they fail the same way.
+    query = session.query(models.Action.id).\
+        filter_by(owner=engine_id).\
+        filter(models.Action.status.in_([ACTION_RUNNING, ACTION_WAITING]))
+    action_ids = [row.id for row in query]
+    if not action_ids:
+        return []
+
+    session.query(models.Action).\
+        filter(models.Action.id.in_(action_ids)).\
+        update({'owner': None,
+                'status': ACTION_FAILED,
+                'status_reason': reason,
+                'end_time': timestamp},
+               synchronize_session=False)
+    _action_mark_dependents(session, action_ids, {
+        'owner': None,
+        'status': ACTION_FAILED,
+        'status_reason': _('Dependent action failed'),
+        'end_time': timestamp,
+    })
+    return _lock_release_all(session, action_ids)
+
+
+def engine_delete(context, engine_id, timestamp):
+    '''Unregister an engine which is stopping.
+
+    The actions the engine was running have been stopped, so they are
+    marked FAILED and their locks released the same way as engine_gc does
+    for a dead engine. Otherwise no other engine could clean up after them
+    once the engine is gone from the registry.
+
+    :param engine_id: ID of the engine.
+    :param timestamp: end time of the failed actions.
+    :return: IDs of the clusters whose locks were released.
+    '''
+    session = _session(context)
+    session.begin()
+    session.query(models.Engine).\
+        filter_by(id=engine_id).\
+        delete(synchronize_session=False)
+    cluster_ids = _engine_release(session, engine_id, timestamp,
+                                  _('The engine running the action was '
+                                    'stopped.'))
+    session.commit()
+    session.expire_all()
+    return cluster_ids
+
+
+def engine_gc(context, engine_id, expiry, timestamp):
+    '''Clean up after an engine that stopped sending heartbeats.
+
+    The actions the engine was running are marked FAILED together with the
+    actions depending on them, and all locks they hold are released.
+
+    :param engine_id: ID of the engine.
+    :param expiry: the engine is only considered dead if its last heartbeat
+                   is older than this.
+    :param timestamp: end time of the failed actions.
+    :return: IDs of the clusters whose locks were released, or None if the
+             engine is alive or has been cleaned up by another engine.
+    '''
+    session = _session(context)
+    session.begin()
+    dead = session.query(models.Engine).\
+        filter_by(id=engine_id).\
+        filter(models.Engine.updated_time < expiry).\
+        delete(synchronize_session=False)
+    if not dead:
+        session.commit()
+        return None
+
+    cluster_ids = _engine_release(session, engine_id, timestamp,
+                                  _('The engine running the action died.'))
+    session.commit()
+    session.expire_all()
+    return cluster_ids
 
 
 # Policies
@@ -609,6 +1019,10 @@ def policy_get(context, policy_id, show_deleted=False):
     return policy
 
 
+def policy_get_version(context, policy_id):
+    return _get_version(context, models.Policy, policy_id)
+
+
 def policy_get_by_name(context, name, show_deleted=False):
     return query_by_name(context, models.Policy, name,
                          show_deleted=show_deleted)
@@ -651,6 +1065,8 @@ def policy_update(context, policy_id, values):
         raise exception.PolicyNotFound(policy=policy_id)
 
     policy.update(values)
+    # Increased in SQL so that concurrent updates get distinct revisions
+    policy.revision = models.Policy.revision + 1
     policy.save(_session(context))
     return policy
 
@@ -701,6 +1117,24 @@ def cluster_policy_get_all(context, cluster_id, filters=None,
                            default_sort_keys=['priority']).all()
 
 
+def cluster_policy_get_by_type(context, policy_type):
+    '''Get the enabled bindings of a type of policies to live clusters.
+
+    :returns: A list of (cluster ID, policy spec) tuples.
+    '''
+    query = model_query(context, models.ClusterPolicies.cluster_id,
+                        models.Policy.spec).\
+        join(models.Policy,
+             models.ClusterPolicies.policy_id == models.Policy.id).\
+        join(models.Cluster,
+             models.ClusterPolicies.cluster_id == models.Cluster.id)
+
+    return query.filter(models.Policy.type == policy_type).\
+        filter(models.ClusterPolicies.enabled.is_(True)).\
+        filter(models.Policy.deleted_time.is_(None)).\
+        filter(models.Cluster.deleted_time.is_(None)).all()
+
+
 def cluster_policy_attach(context, cluster_id, policy_id, values):
     binding = models.ClusterPolicies()
     binding.cluster_id = cluster_id
@@ -751,6 +1185,21 @@ def profile_get(context, profile_id, show_deleted=False):
     return profile
 
 
+def profile_get_version(context, profile_id):
+    return _get_version(context, models.Profile, profile_id)
+
+
+def profile_get_names(context, profile_ids):
+    '''Get the names of some profiles without loading the whole rows.
+
+    :param profile_ids: a list of profile IDs.
+    :returns: A dict mapping the IDs of the profiles found to their names.
+    '''
+    query = model_query(context, models.Profile.id, models.Profile.name).\
+        filter(models.Profile.id.in_(profile_ids))
+    return dict((row.id, row.name) for row in query)
+
+
 def profile_get_by_name(context, name, show_deleted=False):
     return query_by_name(context, models.Profile, name,
                          show_deleted=show_deleted)
@@ -793,6 +1242,8 @@ def profile_update(context, profile_id, values):
         raise exception.ProfileNotFound(profile=profile_id)
 
     profile.update(values)
+    # Increased in SQL so that concurrent updates get distinct revisions
+    profile.revision = models.Profile.revision + 1
     profile.save(_session(context))
     return profile
 
@@ -811,27 +1262,52 @@ def profile_delete(context, profile_id, force=False):
 
 
 # Events
-def _delete_event_rows(context, cluster_id, limit):
-    # MySQL does not support LIMIT in subqueries,
-    # sqlite does not support JOIN in DELETE.
-    # So we must manually supply the IN() values.
-    # pgsql SHOULD work with the pure DELETE/JOIN below but that must be
-    # confirmed via integration tests.
-    query = event_count_by_cluster(context, cluster_id)
-    session = _session(context)
-    all_events = query.order_by(models.Event.timestamp).limit(limit).all()
-    ids = [r.id for r in all_events]
-    q = session.query(models.Event).filter(models.Event.id.in_(ids))
-    return q.delete(synchronize_session='fetch')
+def event_prune(context, cluster_id=None):
+    '''Delete the oldest events of clusters beyond max_events_per_cluster.
 
+    :param cluster_id: ID of the cluster to prune. If not specified, all
+                       clusters having too many events are pruned.
+    :returns: The number of events deleted.
+    '''
+    max_events = cfg.CONF.max_events_per_cluster
+    if not max_events:
+        return 0
 
-def event_prune(context, cluster_id):
-    if cfg.CONF.max_events_per_cluster:
-        event_count = event_count_by_cluster(context, cluster_id)
-        if (event_count >= cfg.CONF.max_events_per_cluster):
-            # prune events
-            batch_size = cfg.CONF.event_purge_batch_size
-            _delete_event_rows(context, cluster_id, batch_size)
+    if cluster_id is None:
+        query = model_query(context, models.Event.cluster_id).\
+            filter(models.Event.cluster_id.isnot(None)).\
+            group_by(models.Event.cluster_id).\
+            having(sql.func.count(models.Event.id) > max_events)
+        cluster_ids = [r.cluster_id for r in query]
+    else:
+        cluster_ids = [cluster_id]
+
+    deleted = 0
+    for cid in cluster_ids:
+        excess = event_count_by_cluster(context, cid) - max_events
+        if excess <= 0:
+            continue
+
+        query = model_query(context, models.Event.id).\
+            filter_by(cluster_id=cid).\
+            order_by(models.Event.timestamp, models.Event.id)
+        deleted += _delete_chunked(context, models.Event, query,
+                                   limit=excess)
+    return deleted
+
+
+def event_purge(context, age, granularity='days', archived=False):
+    '''Delete the events older than the given age.
+
+    :param archived: Whether to delete archived events instead of the events
+                     in the event table.
+    :returns: The number of events deleted.
+    '''
+    time_line = _get_time_line(age, granularity)
+    model = models.EventArchive if archived else models.Event
+    query = model_query(context, model.id).\
+        filter(model.timestamp < time_line)
+    return _delete_chunked(context, model, query)
 
 
 def event_create(context, values):
@@ -843,20 +1319,78 @@ def event_create(context, values):
     return event
 
 
+# Rows written by each multi-row INSERT, which keeps the number of bound
+# parameters below the limit of SQLite.
+EVENT_INSERT_ROWS = 50
+
+
+def event_create_many(context, values_list):
+    '''Create a batch of events with multi-row INSERT statements.
+
+    :param values_list: a list of dicts, each for an event to be created.
+    :returns: a list of IDs of the events created.
+    '''
+    table = models.Event.__table__
+    columns = [c.name for c in table.columns]
+    rows = []
+    for values in values_list:
+        row = dict((c, values.get(c, None)) for c in columns)
+        if row['id'] is None:
+            row['id'] = str(uuid.uuid4())
+        if row['status_reason'] is not None:
+            row['status_reason'] = row['status_reason'][:255]
+        rows.append(row)
+
+    session = _session(context)
+    session.begin()
+    for i in range(0, len(rows), EVENT_INSERT_ROWS):
+        session.execute(table.insert().values(rows[i:i + EVENT_INSERT_ROWS]))
+    session.commit()
+    return [row['id'] for row in rows]
+
+
+def event_archive(context, age, granularity='days'):
+    '''Move the events older than the given age into the archive table.
+
+    :returns: The number of events archived.
+    '''
+    time_line = _get_time_line(age, granularity)
+    columns = [c.name for c in models.EventArchive.__table__.columns]
+    source = models.Event.__table__
+    target = models.EventArchive.__table__
+
+    def copy(session, ids):
+        select = sql.select([source.c[c] for c in columns]).\
+            where(source.c.id.in_(ids))
+        session.execute(target.insert().from_select(columns, select))
+
+    query = model_query(context, models.Event.id).\
+        filter(models.Event.timestamp < time_line).\
+        order_by(models.Event.timestamp, models.Event.id)
+    return _delete_chunked(context, models.Event, query, cleanup=copy)
+
+
+def event_archive_horizon(context):
+    '''Get the timestamp of the newest archived event, or None.'''
+    return model_query(context,
+                       sql.func.max(models.EventArchive.timestamp)).scalar()
+
+
 def event_get(context, event_id):
-    return model_query(context, models.Event).get(event_id)
+    event = model_query(context, models.Event).get(event_id)
+    if event is None:
+        event = model_query(context, models.EventArchive).get(event_id)
+    return event
 
 
 def event_get_by_short_id(context, short_id):
-    return query_by_short_id(context, models.Event, short_id)
+    event = query_by_short_id(context, models.Event, short_id)
+    if event is None:
+        event = query_by_short_id(context, models.EventArchive, short_id)
+    return event
 
 
-def _event_filter_paginate_query(context, query, filters=None,
-                                 limit=None, marker=None,
-                                 sort_keys=None, sort_dir=None):
-    if filters is None:
-        filters = {}
-
+def _event_sort_keys(sort_keys):
     sort_key_map = {
         consts.EVENT_TIMESTAMP: models.Event.timestamp.key,
         consts.EVENT_OBJ_TYPE: models.Event.obj_type.key,
@@ -864,27 +1398,66 @@ def _event_filter_paginate_query(context, query, filters=None,
         consts.EVENT_USER: models.Event.user.key,
         consts.EVENT_ACTION: models.Event.action.key,
     }
-    keys = _get_sort_keys(sort_keys, sort_key_map)
+    return _get_sort_keys(sort_keys, sort_key_map)
 
-    query = db_filters.exact_filter(query, models.Event, filters)
-    return _paginate_query(context, query, models.Event,
+
+def _event_filter_paginate_query(context, query, filters=None,
+                                 limit=None, marker=None,
+                                 sort_keys=None, sort_dir=None,
+                                 model=models.Event, marker_models=None):
+    if filters is None:
+        filters = {}
+
+    keys = _event_sort_keys(sort_keys)
+
+    query = db_filters.exact_filter(query, model, filters)
+    return _paginate_query(context, query, model,
                            limit=limit, marker=marker,
                            sort_keys=keys, sort_dir=sort_dir,
-                           default_sort_keys=['timestamp']).all()
+                           default_sort_keys=['timestamp'],
+                           marker_models=marker_models).all()
 
 
 def event_get_all(context, limit=None, marker=None, sort_keys=None,
                   sort_dir=None, filters=None, tenant_safe=True,
-                  show_deleted=False):
-    query = soft_delete_aware_query(context, models.Event,
-                                    show_deleted=show_deleted)
-    if tenant_safe:
-        query = query.filter_by(project=context.tenant_id)
+                  show_deleted=False, start_time=None, end_time=None):
+    '''Get events, including the archived ones in the given time range.
 
-    return _event_filter_paginate_query(context, query, filters=filters,
-                                        limit=limit, marker=marker,
-                                        sort_keys=sort_keys,
-                                        sort_dir=sort_dir)
+    :param start_time: optional earliest timestamp of the events returned.
+                       The archive is read only if it has events at or
+                       after this time.
+    :param end_time: optional timestamp before which events are returned.
+    '''
+    event_models = [models.Event]
+    if start_time is not None:
+        horizon = event_archive_horizon(context)
+        if horizon is not None and start_time <= horizon:
+            event_models.append(models.EventArchive)
+
+    events = []
+    for model in event_models:
+        query = soft_delete_aware_query(context, model,
+                                        show_deleted=show_deleted)
+        if tenant_safe:
+            query = query.filter_by(project=context.tenant_id)
+        if start_time is not None:
+            query = query.filter(model.timestamp >= start_time)
+        if end_time is not None:
+            query = query.filter(model.timestamp < end_time)
+
+        events.extend(_event_filter_paginate_query(
+            context, query, filters=filters, limit=limit, marker=marker,
+            sort_keys=sort_keys, sort_dir=sort_dir, model=model,
+            marker_models=event_models))
+
+    if len(event_models) > 1:
+        # Each table returned a page of its own, merge them into one
+        keys = (_event_sort_keys(sort_keys) or ['timestamp']) + ['id']
+        events.sort(key=lambda e: [getattr(e, k) for k in keys],
+                    reverse=(sort_dir == 'desc'))
+        events = events[:limit]
+
+    return events
 
 
 def event_count_by_cluster(context, cluster_id):
@@ -904,76 +1477,244 @@ def event_get_all_by_cluster(context, cluster_id, limit=None, marker=None,
                                         sort_dir=sort_dir)
 
 
-def purge_deleted(age, granularity='days'):
-    pass
-#    try:
-#        age = int(age)
-#    except ValueError:
-#        raise exception.Error(_("age should be an integer"))
-#    if age < 0:
-#        raise exception.Error(_("age should be a positive integer"))
-#
-#    if granularity not in ('days', 'hours', 'minutes', 'seconds'):
-#        raise exception.Error(
-#            _("granularity should be days, hours, minutes, or seconds"))
-#
-#    if granularity == 'days':
-#        age = age * 86400
-#    elif granularity == 'hours':
-#        age = age * 3600
-#    elif granularity == 'minutes':
-#        age = age * 60
-#
-#    time_line = datetime.datetime.now() - datetime.timedelta(seconds=age)
-#    engine = get_engine()
-#    meta = sqlalchemy.MetaData()
-#    meta.bind = engine
-#
-#    cluster = sqlalchemy.Table('cluster', meta, autoload=True)
-#    event = sqlalchemy.Table('event', meta, autoload=True)
-#    cluster_policies = sqlalchemy.Table('cluster_policy', meta, autoload=True)
-#    user_creds = sqlalchemy.Table('user_creds', meta, autoload=True)
-#
-#    stmt = sqlalchemy.select([cluster.c.id,
-#                              cluster.c.profile_id,
-#                              cluster.c.user_creds_id]).\
-#        where(cluster.c.deleted_at < time_line)
-#    deleted_clusters = engine.execute(stmt)
-#
-#    for s in deleted_clusters:
-#        event_del = event.delete().where(event.c.cluster_id == s[0])
-#        engine.execute(event_del)
-#        cluster_del = cluster.delete().where(cluster.c.id == s[0])
-#        engine.execute(cluster_del)
-#        cluster_policies_del = cluster_policies.delete().\
-#            where(.c.id == s[1])
-#        engine.execute(raw_template_del)
-#        user_creds_del = user_creds.delete().where(user_creds.c.id == s[2])
-#        engine.execute(user_creds_del)
+# Purge
+def _get_age_seconds(age, granularity='days'):
+    try:
+        age = int(age)
+    except ValueError:
+        raise exception.Error(_("age should be an integer"))
+    if age < 0:
+        raise exception.Error(_("age should be a positive integer"))
+
+    seconds = {
+        'days': 86400,
+        'hours': 3600,
+        'minutes': 60,
+        'seconds': 1,
+    }.get(granularity)
+    if seconds is None:
+        raise exception.Error(
+            _("granularity should be days, hours, minutes, or seconds"))
+
+    return age * seconds
+
+
+def _get_time_line(age, granularity='days'):
+    seconds = _get_age_seconds(age, granularity)
+    return timeutils.utcnow() - datetime.timedelta(seconds=seconds)
+
+
+def _delete_chunked(context, model, id_query, limit=None, cleanup=None):
+    '''Delete rows in chunks of at most event_purge_batch_size rows.
+
+    MySQL does not support LIMIT in subqueries and SQLite does not support
+    JOIN in DELETE, so the IDs of a chunk are selected first, which only
+    reads an index, and the rows are then removed by a single DELETE. Each
+    chunk is committed on its own so that locks are held briefly.
+
+    :param id_query: a query of the IDs of the rows to delete, in the order
+                     the rows are to be deleted.
+    :param limit: optional maximum number of rows to delete.
+    :param cleanup: optional function called with the session and the IDs
+                    of each chunk before the rows are deleted, e.g. for
+                    deleting the rows referring to them.
+    :returns: The number of rows deleted.
+    '''
+    batch_size = max(cfg.CONF.event_purge_batch_size, 1)
+    session = _session(context)
+    deleted = 0
+    while limit is None or deleted < limit:
+        size = batch_size
+        if limit is not None:
+            size = min(size, limit - deleted)
+
+        ids = [r[0] for r in id_query.limit(size)]
+        if not ids:
+            break
+
+        session.begin()
+        if cleanup is not None:
+            cleanup(session, ids)
+        session.query(model).filter(model.id.in_(ids)).\
+            delete(synchronize_session=False)
+        session.commit()
+
+        deleted += len(ids)
+        if len(ids) < size:
+            break
+
+    return deleted
+
+
+def _purge_action_refs(session, action_ids):
+    session.query(models.ActionDependency).\
+        filter(sql.or_(
+            models.ActionDependency.depended.in_(action_ids),
+            models.ActionDependency.dependent.in_(action_ids))).\
+        delete(synchronize_session=False)
+
+
+def _purge_node_refs(session, node_ids):
+    session.query(models.NodeLock).\
+        filter(models.NodeLock.node_id.in_(node_ids)).\
+        delete(synchronize_session=False)
+
+
+def _purge_cluster_refs(session, cluster_ids):
+    node_ids = [r.id for r in session.query(models.Node.id).
+                filter(models.Node.cluster_id.in_(cluster_ids))]
+    if node_ids:
+        _purge_node_refs(session, node_ids)
+        session.query(models.Node).\
+            filter(models.Node.id.in_(node_ids)).\
+            delete(synchronize_session=False)
+
+    for model in (models.Event, models.ClusterPolicies, models.ClusterLock,
+                  models.ClusterLockHolder, models.ClusterLockWaiter):
+        session.query(model).filter(model.cluster_id.in_(cluster_ids)).\
+            delete(synchronize_session=False)
+
+
+def purge_deleted(age, granularity='days', context=None):
+    '''Remove the records soft-deleted before the given age.
+
+    Soft-deleted actions, events, nodes and clusters are removed along with
+    the rows referring to them, and so is the history of the actions that
+    completed before the given age.
+
+    :returns: A dict containing the number of records removed of each kind.
+    '''
+    time_line = _get_time_line(age, granularity)
+    purges = [
+        ('action', models.Action, _purge_action_refs),
+        ('event', models.Event, None),
+        ('node', models.Node, _purge_node_refs),
+        ('cluster', models.Cluster, _purge_cluster_refs),
+    ]
+
+    result = {}
+    for name, model, cleanup in purges:
+        query = model_query(context, model.id).\
+            filter(model.deleted_time < time_line)
+        result[name] = _delete_chunked(context, model, query,
+                                       cleanup=cleanup)
+
+    end_time = time.time() - _get_age_seconds(age, granularity)
+    query = model_query(context, models.ActionHistory.id).\
+        filter(models.ActionHistory.end_time < end_time)
+    result['action_history'] = _delete_chunked(context,
+                                               models.ActionHistory, query)
+    return result
 
 
 # Actions
+def _action_values(values):
+    '''Split the dependencies out of the values for an action.'''
+    values = dict(values)
+    values.setdefault('id', str(uuid.uuid4()))
+    depends_on = values.pop('depends_on', None) or []
+    depended_by = values.pop('depended_by', None) or []
+
+    edges = [(d, values['id']) for d in depends_on]
+    edges.extend([(values['id'], d) for d in depended_by])
+    return values, edges
+
+
+def _action_edges_insert(session, edges):
+    if edges:
+        values = [{'depended': e[0], 'dependent': e[1]} for e in set(edges)]
+        session.execute(models.ActionDependency.__table__.insert(), values)
+
+
 def action_create(context, values):
+    values, edges = _action_values(values)
+    session = _session(context)
+    session.begin()
     action = models.Action()
     action.update(values)
-    action.save(_session(context))
+    session.add(action)
+    # Flush the action first so that the dependencies can refer to it
+    session.flush()
+    _action_edges_insert(session, edges)
+    session.commit()
     return action
 
 
+def action_create_many(context, values_list, dependent=None):
+    '''Create a batch of actions in a single transaction.
+
+    :param values_list: a list of dicts, each for an action to be created.
+    :param dependent: optional ID of an action which depends on all the
+                      actions created. The dependencies are recorded in the
+                      same transaction and the dependent action is put into
+                      WAITING status.
+    :returns: a list of the action objects created.
+    '''
+    session = _session(context)
+    if dependent is not None:
+        _action_check_exists(session, [dependent])
+
+    session.begin()
+    actions = []
+    edges = []
+    for values in values_list:
+        values, action_edges = _action_values(values)
+        action = models.Action()
+        action.update(values)
+        actions.append(action)
+        edges.extend(action_edges)
+
+    session.add_all(actions)
+    session.flush()
+    _action_edges_insert(session, edges)
+    if dependent is not None and actions:
+        _action_dependency_add(session, [(a.id, dependent) for a in actions])
+
+    session.commit()
+    if dependent is not None:
+        # The dependent action may have been loaded into the session before
+        session.expire(session.query(models.Action).get(dependent))
+    return actions
+
+
 def action_get(context, action_id):
-    action = model_query(context, models.Action).get(action_id)
+    action = model_query(context, models.Action).\
+        options(orm.undefer_group('blobs')).get(action_id)
+    if not action:
+        action = model_query(context, models.ActionHistory).get(action_id)
     if not action:
         msg = _('Action with id "%s" not found') % action_id
         raise exception.NotFound(msg)
     return action
 
 
+def action_get_status(context, action_ids):
+    '''Get the status of some actions without loading the whole rows.
+
+    :param action_ids: a list of action IDs.
+    :return: A dict mapping the IDs of the actions found to their status.
+    '''
+    query = model_query(context, models.Action.id, models.Action.status).\
+        filter(models.Action.id.in_(action_ids))
+    return dict((row.id, row.status) for row in query)
+
+
 def action_get_by_name(context, name):
-    return query_by_name(context, models.Action, name)
+    action = query_by_name(context, models.Action, name)
+    if action is None:
+        # Actions in the history are never deleted, nor do they have a
+        # deleted_time column to filter on.
+        action = query_by_name(context, models.ActionHistory, name,
+                               show_deleted=True)
+    return action
 
 
 def action_get_by_short_id(context, short_id):
-    return query_by_short_id(context, models.Action, short_id)
+    action = query_by_short_id(context, models.Action, short_id)
+    if action is None:
+        action = query_by_short_id(context, models.ActionHistory, short_id,
+                                   show_deleted=True)
+    return action
 
 
 def action_get_1st_ready(context):
@@ -996,9 +1737,11 @@ def action_get_all_by_owner(context, owner_id):
 
 def action_get_all(context, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, show_deleted=False):
-    query = soft_delete_aware_query(context, models.Action,
-                                    show_deleted=show_deleted)
+    '''Get actions, including the ones compacted into the action history.
 
+    The history is left out when the actions are filtered or sorted by a
+    field it does not keep, e.g. the owner or the interval.
+    '''
     if filters is None:
         filters = {}
 
@@ -1014,120 +1757,152 @@ def action_get_all(context, filters=None, limit=None, marker=None,
     }
     keys = _get_sort_keys(sort_keys, sort_key_map)
 
-    query = db_filters.exact_filter(query, models.Action, filters)
-    return _paginate_query(context, query, models.Action,
-                           limit=limit, marker=marker,
-                           sort_keys=keys, sort_dir=sort_dir,
-                           default_sort_keys=['created_time']).all()
-
-
-def _action_dependency_add(context, action_id, field, adds):
-    if not isinstance(adds, list):
-        add_list = [adds]
-    else:
-        add_list = adds
-
-    action = model_query(context, models.Action).get(action_id)
-    if not action:
-        msg = _('Action with id "%s" not found') % action_id
+    action_models = [models.Action]
+    history_columns = models.ActionHistory.__table__.columns.keys()
+    if set(filters).union(keys).issubset(history_columns):
+        action_models.append(models.ActionHistory)
+
+    actions = []
+    for model in action_models:
+        if model is models.Action:
+            query = soft_delete_aware_query(context, model,
+                                            show_deleted=show_deleted)
+            query = query.options(orm.undefer_group('blobs'),
+                                  orm.subqueryload('_depends_on'),
+                                  orm.subqueryload('_depended_by'))
+        else:
+            query = model_query(context, model)
+
+        query = db_filters.exact_filter(query, model, filters)
+        actions.extend(_paginate_query(context, query, model,
+                                       limit=limit, marker=marker,
+                                       sort_keys=keys, sort_dir=sort_dir,
+                                       default_sort_keys=['created_time'],
+                                       marker_models=action_models).all())
+
+    if len(action_models) > 1:
+        # Each table returned a page of its own, merge them into one
+        keys = (keys or ['created_time']) + ['id']
+        actions.sort(key=lambda a: [getattr(a, k) for k in keys],
+                     reverse=(sort_dir == 'desc'))
+        actions = actions[:limit]
+
+    return actions
+
+
+def _action_check_exists(session, action_ids):
+    '''Make sure that all the specified actions exist.'''
+    ids = set(action_ids)
+    query = session.query(models.Action.id).\
+        filter(models.Action.id.in_(ids))
+    missing = ids - set(row[0] for row in query)
+    if missing:
+        msg = _('Action with id "%s" not found') % missing.pop()
         raise exception.NotFound(msg)
 
-    if action[field] is None:
-        d = add_list
-    else:
-        d = list(set(action[field]).union(set(add_list)))
-    action[field] = d
 
-    if field == 'depends_on':
-        action.status = ACTION_WAITING
-        action.status_reason = ACTION_WAITING
-        action.status_reason = _('The action is waiting for its dependancy \
-                                   being completed.')
+def _action_dependency_add(session, edges):
+    '''Add dependencies and put the dependent actions into WAITING status.
 
+    :param edges: a list of (depended, dependent) tuples.
+    '''
+    dependents = set(edge[1] for edge in edges)
+    query = session.query(models.ActionDependency).\
+        filter(models.ActionDependency.dependent.in_(dependents))
+    existing = set((d.depended, d.dependent) for d in query)
+
+    values = []
+    for depended, dependent in set(edges) - existing:
+        values.append({'depended': depended, 'dependent': dependent})
+    if values:
+        session.execute(models.ActionDependency.__table__.insert(), values)
+
+    session.query(models.Action).\
+        filter(models.Action.id.in_(dependents)).\
+        update({'status': ACTION_WAITING,
+                'status_reason': _('The action is waiting for its '
+                                   'dependancy being completed.')},
+               synchronize_session=False)
+
+
+def _action_dependency_ready(session, action_ids):
+    '''Mark actions READY if they no longer depend on any other action.'''
+    if not action_ids:
+        return
 
-def _action_dependency_del(query, action_id, field, dels):
-    if not isinstance(dels, list):
-        del_list = [dels]
-    else:
-        del_list = dels
+    pending = sql.exists().where(
+        models.ActionDependency.dependent == models.Action.id)
+    session.query(models.Action).\
+        filter(models.Action.id.in_(action_ids)).\
+        filter(~pending).\
+        update({'status': ACTION_READY,
+                'status_reason': _('The action becomes ready due to all '
+                                   'dependencies have been satisfied.')},
+               synchronize_session=False)
 
-    action = query.get(action_id)
-    if not action:
-        msg = _('Action with id "%s" not found') % action_id
-        LOG.warning(msg)
-        return
 
-    if action[field] is not None:
-        action[field] = list(set(action[field]) - set(del_list))
+def _action_dependents_all(session, action_ids):
+    '''Get IDs of all actions depending on some actions, directly or not.
 
-    if field == 'depends_on' and len(action[field]) == 0:
-        action.status = ACTION_READY
-        action.status_reason = _('The action becomes ready due to all '
-                                 'dependencies have been satisfied.')
+    The dependency graph is walked level by level, so the number of queries
+    issued is the depth of the graph rather than the number of actions.
+    '''
+    found = set()
+    current = set(action_ids)
+    while current:
+        query = session.query(models.ActionDependency.dependent).\
+            filter(models.ActionDependency.depended.in_(current))
+        current = set(row[0] for row in query) - found - set(action_ids)
+        found |= current
+    return found
 
 
-def action_add_dependency(context, depended, dependent):
+def _action_edges(depended, dependent):
     if isinstance(depended, list) and isinstance(dependent, list):
         raise exception.NotSupport(
             _('Multiple dependencies between lists not support'))
 
-    query = model_query(context, models.Action)
-    session = query.session
-
     if isinstance(depended, list):   # e.g. D depends on A,B,C
-        session.begin()
-        for d in depended:
-            _action_dependency_add(context, d, "depended_by", dependent)
-
-        _action_dependency_add(context, dependent, "depends_on", depended)
-        session.commit()
-        return
+        return [(d, dependent) for d in depended]
 
     # Only dependent can be a list now, convert it to a list if it
     # is not a list
     if not isinstance(dependent, list):  # e.g. B,C,D depend on A
-        dependents = [dependent]
-    else:
-        dependents = dependent
-
-    session.begin()
-    _action_dependency_add(context, depended, "depended_by", dependent)
-
-    for d in dependents:
-        _action_dependency_add(context, d, "depends_on", depended)
-    session.commit()
+        dependent = [dependent]
+    return [(depended, d) for d in dependent]
 
 
-def action_del_dependency(context, depended, dependent):
-    if isinstance(depended, list) and isinstance(dependent, list):
-        raise exception.NotSupport(
-            _('Multiple dependencies between lists not support'))
+def action_add_dependency(context, depended, dependent):
+    edges = _action_edges(depended, dependent)
 
-    query = model_query(context, models.Action)
-    session = query.session
+    session = _session(context)
+    _action_check_exists(session, [aid for edge in edges for aid in edge])
 
-    if isinstance(depended, list):   # e.g. D depends on A,B,C
-        session.begin()
-        for d in depended:
-            _action_dependency_del(query, d, "depended_by", dependent)
+    session.begin()
+    _action_dependency_add(session, edges)
+    session.commit()
+    session.expire_all()
 
-        _action_dependency_del(query, dependent, "depends_on", depended)
-        session.commit()
-        return
 
-    # Only dependent can be a list now, convert it to a list if it
-    # is not a list
-    if not isinstance(dependent, list):  # e.g. B,C,D depend on A
-        dependents = [dependent]
-    else:
-        dependents = dependent
+def action_del_dependency(context, depended, dependent):
+    edges = _action_edges(depended, dependent)
 
+    session = _session(context)
     session.begin()
-    _action_dependency_del(query, depended, "depended_by", dependent)
+    if isinstance(depended, list):
+        query = session.query(models.ActionDependency).\
+            filter_by(dependent=dependent).\
+            filter(models.ActionDependency.depended.in_(depended))
+    else:
+        query = session.query(models.ActionDependency).\
+            filter_by(depended=depended).\
+            filter(models.ActionDependency.dependent.in_(
+                [edge[1] for edge in edges]))
+    query.delete(synchronize_session=False)
 
-    for d in dependents:
-        _action_dependency_del(query, d, "depends_on", depended)
+    _action_dependency_ready(session, set(edge[1] for edge in edges))
     session.commit()
+    session.expire_all()
 
 
 def action_mark_succeeded(context, action_id, timestamp):
@@ -1145,37 +1920,38 @@ def action_mark_succeeded(context, action_id, timestamp):
     action.status_reason = _('Action completed successfully.')
     action.end_time = timestamp
 
-    for a in action.depended_by:
-        _action_dependency_del(query, a, 'depends_on', action_id)
-    action.depended_by = []
+    query = session.query(models.ActionDependency.dependent).\
+        filter(models.ActionDependency.depended == action_id)
+    dependents = [row[0] for row in query]
+    session.query(models.ActionDependency).\
+        filter_by(depended=action_id).\
+        delete(synchronize_session=False)
+    _action_dependency_ready(session, dependents)
 
     session.commit()
+    session.expire_all()
     return action
 
 
-def _mark_failed_action(query, action_id, timestamp, reason):
-    action = query.get(action_id)
-    if not action:
-        LOG.warning(_('Action with id "%s" not found') % action_id)
-        return
-
-    action.owner = None
-    action.status = ACTION_FAILED
-    action.status_reason = reason
-    action.end_time = timestamp
-
-    if action.depended_by is not None:
-        for child in action.depended_by:
-            _mark_failed_action(query, child, timestamp, reason)
+def _action_mark_dependents(session, action_ids, values):
+    '''Propagate actions' completion to all actions depending on them.'''
+    dependents = _action_dependents_all(session, action_ids)
+    if dependents:
+        session.query(models.Action).\
+            filter(models.Action.id.in_(dependents)).\
+            update(values, synchronize_session=False)
 
 
 def action_mark_failed(context, action_id, timestamp, reason=None):
     query = model_query(context, models.Action)
+    action = query.get(action_id)
+    if not action:
+        raise exception.NotFound(
+            _('Action with id "%s" not found') % action_id)
 
     session = query.session
     session.begin()
 
-    action = query.get(action_id)
     action.owner = None
     action.status = ACTION_FAILED
     if reason is not None:
@@ -1184,30 +1960,20 @@ def action_mark_failed(context, action_id, timestamp, reason=None):
         action.status_reason = _('Action execution failed')
     action.end_time = timestamp
 
-    for child in action.depended_by:
-        child_reason = _('Action %(id)s failed: %(reason)s') % {
-            'id': action_id, 'reason': action.status_reason}
-        _mark_failed_action(query, child, timestamp, child_reason)
+    child_reason = _('Action %(id)s failed: %(reason)s') % {
+        'id': action_id, 'reason': action.status_reason}
+    _action_mark_dependents(session, [action_id], {
+        'owner': None,
+        'status': ACTION_FAILED,
+        'status_reason': child_reason[:255],
+        'end_time': timestamp,
+    })
 
     session.commit()
+    session.expire_all()
     return action
 
 
-def _mark_cancelled_action(query, action_id, timestamp):
-    action = query.get(action_id)
-    if not action:
-        LOG.warning(_('Action with id "%s" not found') % action_id)
-        return
-
-    action.owner = None
-    action.status = ACTION_CANCELED
-    action.status_reason = _('Dependent action was cancelled')
-    action.end_time = timestamp
-    if action.depended_by is not None:
-        for a in action.depended_by:
-            _mark_cancelled_action(query, a, timestamp)
-
-
 def action_mark_cancelled(context, action_id, timestamp):
     query = model_query(context, models.Action)
     action = query.get(action_id)
@@ -1220,43 +1986,124 @@ def action_mark_cancelled(context, action_id, timestamp):
 
     action.owner = None
     action.status = ACTION_CANCELED
-    action.reason = _('Action execution was cancelled')
+    action.status_reason = _('Action execution was cancelled')
     action.end_time = timestamp
 
-    for a in action.depended_by:
-        _mark_cancelled_action(query, a, timestamp)
-    session.commit()
+    _action_mark_dependents(session, [action_id], {
+        'owner': None,
+        'status': ACTION_CANCELED,
+        'status_reason': _('Dependent action was cancelled'),
+        'end_time': timestamp,
+    })
 
+    session.commit()
+    session.expire_all()
     return action
 
 
+def _action_claim(session, query, owner, timestamp):
+    '''Set the owner of the actions matched by query atomically.
+
+    The ownership test is part of the UPDATE statement itself, so two
+    engines racing for the same action cannot both succeed.
+    '''
+    values = {
+        'owner': owner,
+        'start_time': timestamp,
+        'status': ACTION_RUNNING,
+        'status_reason': _('The action is being processed.'),
+    }
+    return query.update(values, synchronize_session=False) == 1
+
+
 def action_acquire(context, action_id, owner, timestamp):
     session = _session(context)
-
-    action = session.query(models.Action).get(action_id)
-    if not action:
+    query = session.query(models.Action).\
+        filter_by(id=action_id).\
+        filter(sql.or_(models.Action.owner.is_(None),
+                       models.Action.owner == owner)).\
+        filter(~models.Action.status.in_([ACTION_SUCCEEDED, ACTION_FAILED,
+                                          ACTION_CANCELED]))
+    if not _action_claim(session, query, owner, timestamp):
         return None
 
-    if action.owner and action.owner != owner:
-        return None
+    action = session.query(models.Action).get(action_id)
+    session.refresh(action)
+    return action
 
-    try:
-        session.begin()
-        try:
 
-            action.owner = owner
-            action.start_time = timestamp
-            action.status = ACTION_RUNNING
-            action.status_reason = _('The action is being processed.')
-            action.save(_session(context))
+def _action_ready_query(session, owner, derived):
+    '''Query for the READY actions in one priority class, in claim order.
 
-            session.commit()
-            return action
-        except Exception:
-            session.rollback()
+    Derived actions are ordered by the number of actions the engine is
+    running for the same parent action, so that a huge cluster operation
+    cannot starve the smaller ones.
+    '''
+    query = session.query(models.Action.id).\
+        filter_by(status=ACTION_READY).\
+        filter(models.Action.owner.is_(None))
+
+    if not derived:
+        return query.\
+            filter(sql.or_(models.Action.cause.is_(None),
+                           models.Action.cause != ACTION_CAUSE_DERIVED)).\
+            order_by(models.Action.created_time)
+
+    running = orm.aliased(models.Action)
+    running_dep = orm.aliased(models.ActionDependency)
+    load = session.query(running_dep.dependent.label('parent'),
+                         sql.func.count(running.id).label('running')).\
+        join(running, running.id == running_dep.depended).\
+        filter(running.owner == owner).\
+        filter(running.status == ACTION_RUNNING).\
+        group_by(running_dep.dependent).\
+        subquery()
+
+    dep = orm.aliased(models.ActionDependency)
+    return query.\
+        filter(models.Action.cause == ACTION_CAUSE_DERIVED).\
+        outerjoin(dep, dep.depended == models.Action.id).\
+        outerjoin(load, load.c.parent == dep.dependent).\
+        order_by(sql.func.coalesce(load.c.running, 0),
+                 models.Action.created_time)
+
+
+def action_acquire_1st_ready(context, owner, timestamp, derived=False):
+    '''Claim a READY action not owned by any engine.
+
+    :param owner: ID of the engine claiming the action.
+    :param timestamp: start time of the action.
+    :param derived: whether to claim a derived action rather than an action
+                    requested by users.
+    :returns: the action claimed, or None if there is nothing to claim in
+              the given class at the moment.
+    '''
+    session = _session(context)
+    for attempt in range(ACTION_CLAIM_ATTEMPTS):
+        query = _action_ready_query(session, owner, derived).\
+            limit(ACTION_CLAIM_CANDIDATES)
+        candidates = [row[0] for row in query]
+        if not candidates:
             return None
-    except exc.InvalidRequestError:
-        return None
+
+        for action_id in candidates:
+            query = session.query(models.Action).\
+                filter_by(id=action_id, status=ACTION_READY).\
+                filter(models.Action.owner.is_(None))
+            if _action_claim(session, query, owner, timestamp):
+                action = session.query(models.Action).get(action_id)
+                session.refresh(action)
+                return action
+
+    return None
+
+
+def action_count_ready(context):
+    '''Count the READY actions waiting to be claimed by an engine.'''
+    return model_query(context, models.Action).\
+        filter_by(status=ACTION_READY).\
+        filter(models.Action.owner.is_(None)).\
+        count()
 
 
 def action_abandon(context, action_id):
@@ -1278,7 +2125,8 @@ def action_abandon(context, action_id):
 
 
 def action_lock_check(context, action_id, owner=None):
-    action = model_query(context, models.Action).get(action_id)
+    action = model_query(context, models.Action.owner).\
+        filter(models.Action.id == action_id).first()
     if not action:
         raise exception.NotFound(
             _('Action with id "%s" not found') % action_id)
@@ -1299,12 +2147,43 @@ def action_signal(context, action_id, value):
     action.save(query.session)
 
 
-def action_signal_query(context, action_id):
-    action = model_query(context, models.Action).get(action_id)
-    if not action:
-        return None
+def action_get_control(context, action_id):
+    '''Get the control signal of an action, or None if there is none.'''
+    return model_query(context, models.Action.control).\
+        filter(models.Action.id == action_id).scalar()
+
 
-    return action.control
+def action_compact(context, age, granularity='days'):
+    '''Move the actions completed before the given age to action history.
+
+    Only the summary of the actions is kept, their context, inputs and
+    outputs are dropped.
+
+    :returns: The number of actions moved.
+    '''
+    end_time = time.time() - _get_age_seconds(age, granularity)
+    columns = [c.name for c in models.ActionHistory.__table__.columns]
+    source = models.Action.__table__
+    target = models.ActionHistory.__table__
+
+    def move(session, ids):
+        select = sql.select([source.c[c] for c in columns]).\
+            where(source.c.id.in_(ids))
+        session.execute(target.insert().from_select(columns, select))
+        _purge_action_refs(session, ids)
+
+    query = model_query(context, models.Action.id).\
+        filter(models.Action.status.in_([ACTION_SUCCEEDED, ACTION_FAILED,
+                                         ACTION_CANCELED])).\
+        filter(models.Action.end_time < end_time)
+    return _delete_chunked(context, models.Action, query, cleanup=move)
+
+
+def action_history_get_all(context, target=None):
+    query = model_query(context, models.ActionHistory)
+    if target is not None:
+        query = query.filter_by(target=target)
+    return query.order_by(models.ActionHistory.end_time).all()
 
 
 def action_delete(context, action_id, force=False):
@@ -1317,8 +2196,15 @@ def action_delete(context, action_id, force=False):
         raise exception.NotFound(msg)
 
     # TODO(liuh): Need check if and how an action can be safety deleted
-    action.delete()
-    query.session.flush()
+    session = query.session
+    session.begin()
+    session.query(models.ActionDependency).\
+        filter(sql.or_(
+            models.ActionDependency.depended == action_id,
+            models.ActionDependency.dependent == action_id)).\
+        delete(synchronize_session=False)
+    session.delete(action)
+    session.commit()
 
 
 # Utils
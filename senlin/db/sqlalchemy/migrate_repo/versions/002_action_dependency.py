@@ -0,0 +1,56 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    action = sqlalchemy.Table('action', meta, autoload=True)
+
+    dependency = sqlalchemy.Table(
+        'action_dependency', meta,
+        sqlalchemy.Column('depended', sqlalchemy.String(36),
+                          sqlalchemy.ForeignKey('action.id'),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('dependent', sqlalchemy.String(36),
+                          sqlalchemy.ForeignKey('action.id'),
+                          primary_key=True, nullable=False, index=True),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    dependency.create()
+
+    # Move the dependencies recorded in the JSON lists into the new table,
+    # skipping those referring to actions that no longer exist.
+    rows = migrate_engine.execute(
+        sqlalchemy.select([action.c.id, action.c.depends_on])).fetchall()
+    action_ids = set(row[0] for row in rows)
+    edges = []
+    for action_id, depends_on in rows:
+        for depended in set(json.loads(depends_on or 'null') or []):
+            if depended in action_ids:
+                edges.append({'depended': depended, 'dependent': action_id})
+    if edges:
+        migrate_engine.execute(dependency.insert(), edges)
+
+    action.c.depends_on.drop()
+    action.c.depended_by.drop()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would lose action dependencies')
@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+# Indexes for the queries the engine issues most frequently, in the form
+# of (table, index name, columns).
+INDEXES = (
+    # action_get_1st_ready, action_get_all_ready
+    ('action', 'ix_action_status', ('status',)),
+    # action_get_all_by_owner
+    ('action', 'ix_action_owner', ('owner',)),
+    # query_by_name
+    ('action', 'ix_action_name', ('name',)),
+    ('cluster', 'ix_cluster_name_project', ('name', 'project')),
+    ('node', 'ix_node_name_project', ('name', 'project')),
+    ('policy', 'ix_policy_name', ('name',)),
+    ('profile', 'ix_profile_name', ('name',)),
+    # cluster_get_all_by_parent
+    ('cluster', 'ix_cluster_parent', ('parent',)),
+    # node_get_all_by_cluster, node_get_by_name_and_cluster
+    ('node', 'ix_node_cluster_id_name', ('cluster_id', 'name')),
+    # node_get_by_physical_id
+    ('node', 'ix_node_physical_id', ('physical_id',)),
+    # event_count_by_cluster, event_get_all_by_cluster
+    ('event', 'ix_event_cluster_id_timestamp', ('cluster_id', 'timestamp')),
+    # event_get_all, sorted by timestamp by default
+    ('event', 'ix_event_timestamp', ('timestamp',)),
+)
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, index_name, columns in INDEXES:
+        table = sqlalchemy.Table(table_name, meta, autoload=True)
+        index = sqlalchemy.Index(index_name,
+                                 *[table.c[c] for c in columns])
+        index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, index_name, columns in INDEXES:
+        table = sqlalchemy.Table(table_name, meta, autoload=True)
+        index = sqlalchemy.Index(index_name,
+                                 *[table.c[c] for c in columns])
+        index.drop(migrate_engine)
@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    sqlalchemy.Table('cluster', meta, autoload=True)
+    cluster_lock = sqlalchemy.Table('cluster_lock', meta, autoload=True)
+
+    holder = sqlalchemy.Table(
+        'cluster_lock_holder', meta,
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36),
+                          sqlalchemy.ForeignKey('cluster.id'),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('action_id', sqlalchemy.String(36),
+                          primary_key=True, nullable=False),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    holder.create()
+
+    # Move the lock holders recorded in the JSON lists into the new table
+    rows = migrate_engine.execute(
+        sqlalchemy.select([cluster_lock.c.cluster_id,
+                           cluster_lock.c.action_ids])).fetchall()
+    holders = []
+    for cluster_id, action_ids in rows:
+        for action_id in set(json.loads(action_ids or 'null') or []):
+            holders.append({'cluster_id': cluster_id, 'action_id': action_id})
+    if holders:
+        migrate_engine.execute(holder.insert(), holders)
+
+    cluster_lock.c.action_ids.drop()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would lose cluster lock holders')
@@ -0,0 +1,45 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    sqlalchemy.Table('cluster', meta, autoload=True)
+
+    waiter = sqlalchemy.Table(
+        'cluster_lock_waiter', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True,
+                          autoincrement=True),
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36),
+                          sqlalchemy.ForeignKey('cluster.id'),
+                          nullable=False),
+        sqlalchemy.Column('action_id', sqlalchemy.String(36),
+                          nullable=False),
+        sqlalchemy.Column('scope', sqlalchemy.Integer, nullable=False),
+        sqlalchemy.UniqueConstraint('cluster_id', 'action_id',
+                                    name='uniq_cluster_lock_waiter0action'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    waiter.create()
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    waiter = sqlalchemy.Table('cluster_lock_waiter', meta, autoload=True)
+    waiter.drop()
@@ -0,0 +1,56 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+# Listings are paginated by seeking past the (sort key, id) tuple of the
+# marker row. These indexes cover the default sort key of each listing, so
+# that fetching a page costs the same no matter how deep it is.
+INDEXES = (
+    ('cluster', 'ix_cluster_init_time_id', ('init_time', 'id')),
+    ('node', 'ix_node_init_time_id', ('init_time', 'id')),
+    ('action', 'ix_action_created_time_id', ('created_time', 'id')),
+    ('event', 'ix_event_timestamp_id', ('timestamp', 'id')),
+)
+
+# Indexes made redundant by the ones above, in the form of (table, index
+# name, columns).
+REPLACED = (
+    ('event', 'ix_event_timestamp', ('timestamp',)),
+)
+
+
+def _index(meta, table_name, index_name, columns):
+    table = sqlalchemy.Table(table_name, meta, autoload=True)
+    return sqlalchemy.Index(index_name, *[table.c[c] for c in columns])
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, index_name, columns in INDEXES:
+        _index(meta, table_name, index_name, columns).create(migrate_engine)
+
+    for table_name, index_name, columns in REPLACED:
+        _index(meta, table_name, index_name, columns).drop(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, index_name, columns in REPLACED:
+        _index(meta, table_name, index_name, columns).create(migrate_engine)
+
+    for table_name, index_name, columns in INDEXES:
+        _index(meta, table_name, index_name, columns).drop(migrate_engine)
@@ -0,0 +1,52 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    # Old events are moved here from the event table. The cluster_id is
+    # not a foreign key because archived events outlive their clusters.
+    event_archive = sqlalchemy.Table(
+        'event_archive', meta,
+        sqlalchemy.Column('id', sqlalchemy.String(36),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('timestamp', sqlalchemy.DateTime, nullable=False),
+        sqlalchemy.Column('deleted_time', sqlalchemy.DateTime),
+        sqlalchemy.Column('obj_id', sqlalchemy.String(36)),
+        sqlalchemy.Column('obj_name', sqlalchemy.String(255)),
+        sqlalchemy.Column('obj_type', sqlalchemy.String(36)),
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36)),
+        sqlalchemy.Column('level', sqlalchemy.String(63)),
+        sqlalchemy.Column('user', sqlalchemy.String(36)),
+        sqlalchemy.Column('project', sqlalchemy.String(36)),
+        sqlalchemy.Column('action', sqlalchemy.String(36)),
+        sqlalchemy.Column('status', sqlalchemy.String(255)),
+        sqlalchemy.Column('status_reason', sqlalchemy.String(255)),
+        sqlalchemy.Index('ix_event_archive_timestamp_id', 'timestamp', 'id'),
+        sqlalchemy.Index('ix_event_archive_cluster_id_timestamp',
+                         'cluster_id', 'timestamp'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    event_archive.create()
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    event_archive = sqlalchemy.Table('event_archive', meta, autoload=True)
+    event_archive.drop()
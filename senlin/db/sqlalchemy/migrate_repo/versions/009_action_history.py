@@ -0,0 +1,49 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    # Completed actions are moved here from the action table, without the
+    # context, inputs and outputs they were executed with.
+    action_history = sqlalchemy.Table(
+        'action_history', meta,
+        sqlalchemy.Column('id', sqlalchemy.String(36),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('name', sqlalchemy.String(63)),
+        sqlalchemy.Column('target', sqlalchemy.String(36)),
+        sqlalchemy.Column('action', sqlalchemy.Text),
+        sqlalchemy.Column('cause', sqlalchemy.String(255)),
+        sqlalchemy.Column('start_time', sqlalchemy.Float),
+        sqlalchemy.Column('end_time', sqlalchemy.Float),
+        sqlalchemy.Column('status', sqlalchemy.String(255)),
+        sqlalchemy.Column('status_reason', sqlalchemy.String(255)),
+        sqlalchemy.Column('created_time', sqlalchemy.DateTime),
+        sqlalchemy.Column('updated_time', sqlalchemy.DateTime),
+        sqlalchemy.Index('ix_action_history_target', 'target'),
+        sqlalchemy.Index('ix_action_history_end_time', 'end_time'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    action_history.create()
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    action_history = sqlalchemy.Table('action_history', meta, autoload=True)
+    action_history.drop()
@@ -0,0 +1,37 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+# Tables whose rows count their updates, so that cached objects can tell
+# whether they are stale even when several updates fall in the same second.
+TABLES = ('profile', 'policy')
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name in TABLES:
+        table = sqlalchemy.Table(table_name, meta, autoload=True)
+        revision = sqlalchemy.Column('revision', sqlalchemy.Integer,
+                                     nullable=False, server_default='0')
+        revision.create(table)
+
+
+def downgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    for table_name in TABLES:
+        table = sqlalchemy.Table(table_name, meta, autoload=True)
+        table.c.revision.drop()
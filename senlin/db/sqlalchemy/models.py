@@ -22,6 +22,7 @@ import six
 import sqlalchemy
 from sqlalchemy.ext import declarative
 from sqlalchemy.orm import backref
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import session as orm_session
 
@@ -86,6 +87,12 @@ class Cluster(BASE, SenlinBase, SoftDelete):
     """Represents a cluster created by the Senlin engine."""
 
     __tablename__ = 'cluster'
+    __table_args__ = (
+        sqlalchemy.Index('ix_cluster_name_project', 'name', 'project'),
+        sqlalchemy.Index('ix_cluster_parent', 'parent'),
+        sqlalchemy.Index('ix_cluster_init_time_id', 'init_time', 'id'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
@@ -117,6 +124,13 @@ class Node(BASE, SenlinBase, SoftDelete):
     """Represents a Node created by the Senlin engine."""
 
     __tablename__ = 'node'
+    __table_args__ = (
+        sqlalchemy.Index('ix_node_name_project', 'name', 'project'),
+        sqlalchemy.Index('ix_node_cluster_id_name', 'cluster_id', 'name'),
+        sqlalchemy.Index('ix_node_physical_id', 'physical_id'),
+        sqlalchemy.Index('ix_node_init_time_id', 'init_time', 'id'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
@@ -141,6 +155,18 @@ class Node(BASE, SenlinBase, SoftDelete):
     data = sqlalchemy.Column(types.Dict)
 
 
+class Engine(BASE, SenlinBase):
+    """Store the engines running and the time of their last heartbeat."""
+
+    __tablename__ = 'engine'
+
+    id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True,
+                           nullable=False)
+    host = sqlalchemy.Column(sqlalchemy.String(255))
+    created_time = sqlalchemy.Column(sqlalchemy.DateTime)
+    updated_time = sqlalchemy.Column(sqlalchemy.DateTime)
+
+
 class ClusterLock(BASE, SenlinBase):
     """Store cluster locks for actions performed by multiple workers.
 
@@ -152,10 +178,40 @@ class ClusterLock(BASE, SenlinBase):
     cluster_id = sqlalchemy.Column(sqlalchemy.String(36),
                                    sqlalchemy.ForeignKey('cluster.id'),
                                    primary_key=True, nullable=False)
-    action_ids = sqlalchemy.Column(types.List)
     semaphore = sqlalchemy.Column(sqlalchemy.Integer)
 
 
+class ClusterLockHolder(BASE, SenlinBase):
+    """Store the actions that are holding a cluster lock."""
+
+    __tablename__ = 'cluster_lock_holder'
+
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36),
+                                   sqlalchemy.ForeignKey('cluster.id'),
+                                   primary_key=True, nullable=False)
+    action_id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True,
+                                  nullable=False)
+
+
+class ClusterLockWaiter(BASE, SenlinBase):
+    """Store the actions waiting for a cluster lock, in FIFO order."""
+
+    __tablename__ = 'cluster_lock_waiter'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('cluster_id', 'action_id',
+                                    name='uniq_cluster_lock_waiter0action'),
+        SenlinBase.__table_args__,
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True,
+                           autoincrement=True)
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36),
+                                   sqlalchemy.ForeignKey('cluster.id'),
+                                   nullable=False)
+    action_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    scope = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+
+
 class NodeLock(BASE, SenlinBase):
     """Store node locks for actions performed by multiple workers.
 
@@ -174,6 +230,10 @@ class Policy(BASE, SenlinBase, SoftDelete):
     '''A policy managed by the Senlin engine.'''
 
     __tablename__ = 'policy'
+    __table_args__ = (
+        sqlalchemy.Index('ix_policy_name', 'name'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
@@ -186,6 +246,9 @@ class Policy(BASE, SenlinBase, SoftDelete):
     deleted_time = sqlalchemy.Column(sqlalchemy.DateTime)
     spec = sqlalchemy.Column(types.Dict)
     data = sqlalchemy.Column(types.Dict)
+    # Number of updates, tells cached copies of the policy from current ones
+    revision = sqlalchemy.Column(sqlalchemy.Integer, nullable=False,
+                                 default=0)
 
 
 class ClusterPolicies(BASE, SenlinBase):
@@ -214,6 +277,10 @@ class Profile(BASE, SenlinBase, SoftDelete):
     '''A profile managed by the Senlin engine.'''
 
     __tablename__ = 'profile'
+    __table_args__ = (
+        sqlalchemy.Index('ix_profile_name', 'name'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
@@ -226,17 +293,29 @@ class Profile(BASE, SenlinBase, SoftDelete):
     created_time = sqlalchemy.Column(sqlalchemy.DateTime)
     updated_time = sqlalchemy.Column(sqlalchemy.DateTime)
     deleted_time = sqlalchemy.Column(sqlalchemy.DateTime)
+    # Number of updates, tells cached copies of the profile from current ones
+    revision = sqlalchemy.Column(sqlalchemy.Integer, nullable=False,
+                                 default=0)
 
 
 class Action(BASE, SenlinBase, SoftDelete):
     '''An action persisted in the Senlin database.'''
 
     __tablename__ = 'action'
+    __table_args__ = (
+        sqlalchemy.Index('ix_action_status', 'status'),
+        sqlalchemy.Index('ix_action_owner', 'owner'),
+        sqlalchemy.Index('ix_action_name', 'name'),
+        sqlalchemy.Index('ix_action_created_time_id', 'created_time', 'id'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
     name = sqlalchemy.Column(sqlalchemy.String(63))
-    context = sqlalchemy.Column(types.Dict)
+    # The JSON columns are only loaded when accessed, or when a query asks
+    # for the 'blobs' group, so that status polling doesn't parse them.
+    context = deferred(sqlalchemy.Column(types.Dict), group='blobs')
     target = sqlalchemy.Column(sqlalchemy.String(36))
     action = sqlalchemy.Column(sqlalchemy.Text)
     cause = sqlalchemy.Column(sqlalchemy.String(255))
@@ -248,19 +327,108 @@ class Action(BASE, SenlinBase, SoftDelete):
     status = sqlalchemy.Column(sqlalchemy.String(255))
     status_reason = sqlalchemy.Column(sqlalchemy.String(255))
     control = sqlalchemy.Column(sqlalchemy.String(255))
-    inputs = sqlalchemy.Column(types.Dict)
-    outputs = sqlalchemy.Column(types.Dict)
-    depends_on = sqlalchemy.Column(types.List)
-    depended_by = sqlalchemy.Column(types.List)
+    inputs = deferred(sqlalchemy.Column(types.Dict), group='blobs')
+    outputs = deferred(sqlalchemy.Column(types.Dict), group='blobs')
     created_time = sqlalchemy.Column(sqlalchemy.DateTime)
     updated_time = sqlalchemy.Column(sqlalchemy.DateTime)
     deleted_time = sqlalchemy.Column(sqlalchemy.DateTime)
 
+    _depends_on = relationship(
+        'ActionDependency', viewonly=True,
+        primaryjoin='Action.id == ActionDependency.dependent')
+    _depended_by = relationship(
+        'ActionDependency', viewonly=True,
+        primaryjoin='Action.id == ActionDependency.depended')
+
+    @property
+    def depends_on(self):
+        '''IDs of the actions this action depends on.'''
+        return [d.depended for d in self._depends_on]
+
+    @property
+    def depended_by(self):
+        '''IDs of the actions depending on this action.'''
+        return [d.dependent for d in self._depended_by]
+
+
+class ActionHistory(BASE, SenlinBase):
+    '''The summary of a completed action moved out of the action table.'''
+
+    __tablename__ = 'action_history'
+    __table_args__ = (
+        sqlalchemy.Index('ix_action_history_target', 'target'),
+        sqlalchemy.Index('ix_action_history_end_time', 'end_time'),
+        SenlinBase.__table_args__,
+    )
+
+    id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.String(63))
+    target = sqlalchemy.Column(sqlalchemy.String(36))
+    action = sqlalchemy.Column(sqlalchemy.Text)
+    cause = sqlalchemy.Column(sqlalchemy.String(255))
+    start_time = sqlalchemy.Column(sqlalchemy.Float)
+    end_time = sqlalchemy.Column(sqlalchemy.Float)
+    status = sqlalchemy.Column(sqlalchemy.String(255))
+    status_reason = sqlalchemy.Column(sqlalchemy.String(255))
+    created_time = sqlalchemy.Column(sqlalchemy.DateTime)
+    updated_time = sqlalchemy.Column(sqlalchemy.DateTime)
+
+    # The fields dropped from the action, so that the summary can be read
+    # the same way as a record of the action table.
+    owner = None
+    interval = None
+    timeout = None
+    deleted_time = None
+
+    @property
+    def context(self):
+        '''The credentials of the action are not kept.'''
+        return {'is_admin': False}
+
+    @property
+    def inputs(self):
+        return {}
+
+    @property
+    def outputs(self):
+        return {}
+
+    @property
+    def depends_on(self):
+        return []
+
+    @property
+    def depended_by(self):
+        return []
+
+
+class ActionDependency(BASE, SenlinBase):
+    '''A dependency between two actions.
+
+    The dependent action cannot proceed until the depended action has
+    completed.
+    '''
+
+    __tablename__ = 'action_dependency'
+
+    depended = sqlalchemy.Column(sqlalchemy.String(36),
+                                 sqlalchemy.ForeignKey('action.id'),
+                                 primary_key=True)
+    dependent = sqlalchemy.Column(sqlalchemy.String(36),
+                                  sqlalchemy.ForeignKey('action.id'),
+                                  primary_key=True, index=True)
+
 
 class Event(BASE, SenlinBase, SoftDelete):
     """Represents an event generated by the Senin engine."""
 
     __tablename__ = 'event'
+    __table_args__ = (
+        sqlalchemy.Index('ix_event_cluster_id_timestamp',
+                         'cluster_id', 'timestamp'),
+        sqlalchemy.Index('ix_event_timestamp_id', 'timestamp', 'id'),
+        SenlinBase.__table_args__,
+    )
 
     id = sqlalchemy.Column('id', sqlalchemy.String(36),
                            primary_key=True,
@@ -280,3 +448,29 @@ class Event(BASE, SenlinBase, SoftDelete):
     action = sqlalchemy.Column(sqlalchemy.String(36))
     status = sqlalchemy.Column(sqlalchemy.String(255))
     status_reason = sqlalchemy.Column(sqlalchemy.String(255))
+
+
+class EventArchive(BASE, SenlinBase):
+    """Represents an event moved out of the event table for its age."""
+
+    __tablename__ = 'event_archive'
+    __table_args__ = (
+        sqlalchemy.Index('ix_event_archive_timestamp_id', 'timestamp', 'id'),
+        sqlalchemy.Index('ix_event_archive_cluster_id_timestamp',
+                         'cluster_id', 'timestamp'),
+        SenlinBase.__table_args__,
+    )
+
+    id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True)
+    timestamp = sqlalchemy.Column(sqlalchemy.DateTime)
+    deleted_time = sqlalchemy.Column(sqlalchemy.DateTime)
+    obj_id = sqlalchemy.Column(sqlalchemy.String(36))
+    obj_name = sqlalchemy.Column(sqlalchemy.String(255))
+    obj_type = sqlalchemy.Column(sqlalchemy.String(36))
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36))
+    level = sqlalchemy.Column(sqlalchemy.String(64))
+    user = sqlalchemy.Column(sqlalchemy.String(36))
+    project = sqlalchemy.Column(sqlalchemy.String(36))
+    action = sqlalchemy.Column(sqlalchemy.String(36))
+    status = sqlalchemy.Column(sqlalchemy.String(255))
+    status_reason = sqlalchemy.Column(sqlalchemy.String(255))
@@ -42,4 +42,22 @@ IMPL = LazyPluggable('backend', sqlalchemy='senlin.db.sqlalchemy.api')
 
 
 def purge_deleted(age, granularity='days'):
-    IMPL.purge_deleted(age, granularity)
+    return IMPL.purge_deleted(age, granularity)
+
+
+def purge_events(age, granularity='days', archive_age=0):
+    deleted = IMPL.event_prune(None)
+    if int(age) > 0:
+        deleted += IMPL.event_purge(None, age, granularity)
+    if int(archive_age) > 0:
+        deleted += IMPL.event_purge(None, archive_age, granularity,
+                                    archived=True)
+    return deleted
+
+
+def archive_events(age, granularity='days'):
+    return IMPL.event_archive(None, age, granularity)
+
+
+def compact_actions(age, granularity='days'):
+    return IMPL.action_compact(None, age, granularity)
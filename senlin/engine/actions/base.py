@@ -22,6 +22,7 @@ from senlin.common import exception
 from senlin.common.i18n import _
 from senlin.common.i18n import _LI
 from senlin.db import api as db_api
+from senlin.engine import dispatcher
 from senlin.policies import base as policy_mod
 
 wallclock = time.time
@@ -149,10 +150,9 @@ class Action(object):
         self.updated_time = kwargs.get('updated_time', None)
         self.deleted_time = kwargs.get('deleted_time', None)
 
-    def store(self, context):
-        '''Store the action record into database table.'''
-
-        values = {
+    def _db_values(self):
+        '''Get the values of the action in the form of a DB record.'''
+        return {
             'name': self.name,
             'context': self.context.to_dict(),
             'target': self.target,
@@ -174,6 +174,10 @@ class Action(object):
             'deleted_time': self.deleted_time,
         }
 
+    def store(self, context):
+        '''Store the action record into database table.'''
+
+        values = self._db_values()
         if self.id:
             values['updated_time'] = datetime.datetime.utcnow()
             action = db_api.action_update(context, values)
@@ -184,6 +188,33 @@ class Action(object):
         self.id = action.id
         return self.id
 
+    @classmethod
+    def store_many(cls, context, actions, dependent=None):
+        '''Create the DB records for a batch of new actions.
+
+        :param context: the context used for DB operations;
+        :param actions: a list of action objects which have no ID assigned;
+        :param dependent: optional ID of an action which depends on all the
+                          new actions. The dependencies are built in the
+                          same transaction as the action creation.
+        :returns: a list of IDs of the actions created.
+        '''
+        created_time = datetime.datetime.utcnow()
+        values_list = []
+        for action in actions:
+            values = action._db_values()
+            values['created_time'] = created_time
+            values_list.append(values)
+
+        records = db_api.action_create_many(context, values_list,
+                                            dependent=dependent)
+        for action, record in zip(actions, records):
+            action.id = record.id
+            if dependent is not None:
+                action.depended_by = [dependent]
+
+        return [action.id for action in actions]
+
     @classmethod
     def _from_db_record(cls, record):
         '''Construct a action object from database record.
@@ -294,10 +325,20 @@ class Action(object):
         self.status = status
         self.status_reason = reason
 
+        if status != self.READY:
+            # Let the actions depending on this one know we are done instead
+            # of having them polling the database
+            for parent in self.depended_by or []:
+                dispatcher.wake_action(self.context, parent)
+
     def get_status(self):
-        action = db_api.action_get(self.context, self.id)
-        self.status = action.status
-        return action.status
+        statuses = db_api.action_get_status(self.context, [self.id])
+        if self.id not in statuses:
+            raise exception.NotFound(
+                _('Action with id "%s" not found') % self.id)
+
+        self.status = statuses[self.id]
+        return self.status
 
     def is_timeout(self):
         time_lapse = wallclock() - self.start_time
@@ -309,8 +350,7 @@ class Action(object):
             LOG.debug('Action %s run timeout' % self.id)
             return self.RES_TIMEOUT
 
-        result = db_api.action_signal_query(self.context, self.id)
-        return result
+        return dispatcher.signal_get(self.context, self.id)
 
     def is_cancelled(self):
         return self._check_signal() == self.SIG_CANCEL
@@ -404,6 +444,7 @@ def ActionProc(context, action_id, worker_id):
              {'name': six.text_type(action.action), 'id': action.id})
 
     reason = 'Action completed'
+    dispatcher.signal_listen(context, action.id)
     try:
         # Step 3: execute the action
         result, reason = action.execute()
@@ -421,3 +462,4 @@ def ActionProc(context, action_id, worker_id):
     finally:
         # NOTE: locks on action is eventually released here by status update
         action.set_status(result, reason)
+        dispatcher.signal_ignore(action.id)
@@ -12,6 +12,7 @@
 
 import random
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from senlin.common import consts
@@ -23,7 +24,6 @@ from senlin.engine.actions import base
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
 from senlin.engine import node as node_mod
-from senlin.engine import scheduler
 from senlin.engine import senlin_lock
 from senlin.policies import base as policy_mod
 
@@ -50,42 +50,74 @@ class ClusterAction(base.Action):
         super(ClusterAction, self).__init__(context, action, **kwargs)
 
     def _wait_for_dependents(self):
-        self.get_status()
+        '''Wait for all derived actions to complete.
+
+        The action is woken up by its dependents when they finish or by a
+        cancel request, so there is no need to poll the database. A poll
+        is still done every periodic_interval seconds in case a wakeup
+        gets lost.
+        '''
         reason = ''
-        while self.status != self.READY:
-            if self.status == self.FAILED:
-                reason = _('%(action)s [%(id)s] failed due to dependent '
-                           'action failure') % {'action': self.action,
-                                                'id': self.id}
-                LOG.debug(reason)
-                return self.RES_ERROR, reason
-
-            if self.is_cancelled():
-                # During this period, if cancel request come, cancel this
-                # cluster operation immediately, then release the cluster
-                # lock and return.
-                reason = _('%(action)s %(id)s cancelled') % {
-                    'action': self.action, 'id': self.id}
-                LOG.debug(reason)
-                return self.RES_CANCEL, reason
-
-            if self.is_timeout():
-                # Action timeout, return
-                reason = _('%(action)s %(id)s timeout') % {
-                    'action': self.action, 'id': self.id}
-                LOG.debug(reason)
-                return self.RES_TIMEOUT
-
-            # Continue waiting (with reschedule)
-            scheduler.reschedule(self, 1)
+        with dispatcher.ActionWaiter(self.id) as waiter:
             self.get_status()
+            while self.status != self.READY:
+                if self.status == self.FAILED:
+                    reason = _('%(action)s [%(id)s] failed due to dependent '
+                               'action failure') % {'action': self.action,
+                                                    'id': self.id}
+                    LOG.debug(reason)
+                    return self.RES_ERROR, reason
+
+                if self.is_cancelled():
+                    # During this period, if cancel request come, cancel this
+                    # cluster operation immediately, then release the cluster
+                    # lock and return.
+                    reason = _('%(action)s %(id)s cancelled') % {
+                        'action': self.action, 'id': self.id}
+                    LOG.debug(reason)
+                    return self.RES_CANCEL, reason
+
+                if self.is_timeout():
+                    # Action timeout, return
+                    reason = _('%(action)s %(id)s timeout') % {
+                        'action': self.action, 'id': self.id}
+                    LOG.debug(reason)
+                    return self.RES_TIMEOUT, reason
+
+                # Continue waiting until woken up or the next poll is due
+                waiter.wait(self._get_wait_time())
+                self.get_status()
 
         return self.RES_OK, 'All dependents ended with success'
 
+    def _get_wait_time(self):
+        '''Seconds to wait before checking dependents status again.'''
+        wait_time = cfg.CONF.periodic_interval
+        if self.timeout is not None and self.start_time is not None:
+            remaining = self.timeout - (base.wallclock() - self.start_time)
+            wait_time = max(min(wait_time, remaining), 0)
+        return wait_time
+
+    def _start_derived_actions(self, actions):
+        '''Utility method for launching derived actions.
+
+        The actions are created in READY status, together with their
+        dependencies on this action, in a single DB transaction. They are
+        then announced to the dispatchers using a single message.
+        '''
+        for action in actions:
+            action.status = self.READY
+
+        action_ids = base.Action.store_many(self.context, actions,
+                                            dependent=self.id)
+        dispatcher.notify(self.context, dispatcher.Dispatcher.NEW_ACTIONS,
+                          None, action_ids=action_ids)
+
     def _create_nodes(self, cluster, count, policy_data):
         '''Utility method for node creation.'''
         placement = policy_data.get('placement', None)
 
+        nodes = []
         for m in range(count):
             name = 'node-%s-%003d' % (cluster.id[:8], cluster.size + m + 1)
             node = node_mod.Node(name, cluster.profile_id, cluster.id,
@@ -94,25 +126,22 @@ class ClusterAction(base.Action):
             if placement is not None:
                 # We assume placement is a list
                 node.data['placement'] = placement[m]
-            node.store(self.context)
-
-            kwargs = {
-                'name': 'node_create_%s' % node.id[:8],
-                'target': node.id,
-                'cause': base.CAUSE_DERIVED,
-            }
-
-            action = base.Action(self.context, 'NODE_CREATE', **kwargs)
-            action.store(self.context)
-
-            # Build dependency and make the new action ready
-            db_api.action_add_dependency(self.context, action.id, self.id)
-            action.set_status(self.READY)
-
-            dispatcher.notify(self.context, dispatcher.Dispatcher.NEW_ACTION,
-                              None, action_id=action.id)
+            nodes.append(node)
 
         if count > 0:
+            node_mod.Node.store_many(self.context, nodes)
+
+            actions = []
+            for node in nodes:
+                kwargs = {
+                    'name': 'node_create_%s' % node.id[:8],
+                    'target': node.id,
+                    'cause': base.CAUSE_DERIVED,
+                }
+                actions.append(base.Action(self.context, 'NODE_CREATE',
+                                           **kwargs))
+            self._start_derived_actions(actions)
+
             # Wait for cluster creation to complete
             return self._wait_for_dependents()
 
@@ -150,27 +179,23 @@ class ClusterAction(base.Action):
             return self.RES_ERROR
 
         # Create NodeActions for all nodes
-        node_list = cluster.get_nodes()
-        for node_id in node_list:
+        actions = []
+        for node in cluster.get_nodes():
             kwargs = {
-                'name': 'node_update_%s' % node_id[:8],
-                'target': node_id,
+                'name': 'node_update_%s' % node.id[:8],
+                'target': node.id,
                 'cause': base.CAUSE_DERIVED,
                 'inputs': {
                     'new_profile_id': new_profile_id,
                 }
             }
-            action = base.Action(self.context, 'NODE_UPDATE', **kwargs)
-            action.store(self.context)
-
-            db_api.action_add_dependency(action, self)
-            action.set_status(self.READY)
-            dispatcher.notify(self.context, dispatcher.Dispatcher.NEW_ACTION,
-                              None, action_id=action.id)
+            actions.append(base.Action(self.context, 'NODE_UPDATE',
+                                       **kwargs))
 
         # Wait for cluster updating complete
         result = self.RES_OK
-        if cluster.size > 0:
+        if len(actions) > 0:
+            self._start_derived_actions(actions)
             result, reason = self._wait_for_dependents()
 
         if result == self.RES_OK:
@@ -187,21 +212,14 @@ class ClusterAction(base.Action):
             if not destroy:
                 action_name = consts.NODE_LEAVE
 
-        for node_id in nodes:
-            action = base.Action(self.context, action_name,
-                                 name='node_delete_%s' % node_id[:8],
-                                 target=node_id,
-                                 cause=base.CAUSE_DERIVED)
-            action.store(self.context)
-
-            # Build dependency and make the new action ready
-            db_api.action_add_dependency(self.context, action.id, self.id)
-            action.set_status(self.READY)
-
-            dispatcher.notify(self.context, dispatcher.Dispatcher.NEW_ACTION,
-                              None, action_id=action.id)
-
         if len(nodes) > 0:
+            actions = []
+            for node_id in nodes:
+                actions.append(base.Action(self.context, action_name,
+                                           name='node_delete_%s' % node_id[:8],
+                                           target=node_id,
+                                           cause=base.CAUSE_DERIVED))
+            self._start_derived_actions(actions)
             return self._wait_for_dependents()
 
         return self.RES_OK, ''
@@ -270,17 +288,14 @@ class ClusterAction(base.Action):
         if len(nodes) == 0:
             return self.RES_OK, reason
 
+        actions = []
         for node_id in nodes:
-            action = base.Action(self.context, 'NODE_JOIN',
-                                 name='node_join_%s' % node.id[:8],
-                                 target=node.id,
-                                 cause=base.CAUSE_DERIVED,
-                                 inputs={'cluster_id': cluster.id})
-            action.store(self.context)
-            db_api.action_add_dependency(self.context, action.id, self.id)
-            action.set_status(self.READY)
-            dispatcher.notify(self.context, dispatcher.Dispatcher.NEW_ACTION,
-                              None, action_id=action.id)
+            actions.append(base.Action(self.context, 'NODE_JOIN',
+                                       name='node_join_%s' % node_id[:8],
+                                       target=node_id,
+                                       cause=base.CAUSE_DERIVED,
+                                       inputs={'cluster_id': cluster.id}))
+        self._start_derived_actions(actions)
 
         # Wait for dependent action if any
         result, new_reason = self._wait_for_dependents()
@@ -18,8 +18,10 @@ from oslo_log import log as logging
 from senlin.common import exception
 from senlin.common.i18n import _LE
 from senlin.common.i18n import _LW
+from senlin.common import utils
 from senlin.db import api as db_api
 from senlin.engine import event as event_mod
+from senlin.engine import health_probe
 from senlin.engine import node as node_mod
 from senlin.openstack.common import periodic_task
 from senlin.profiles import base as profiles_base
@@ -80,21 +82,40 @@ class Cluster(periodic_task.PeriodicTasks):
         # heathy checking
         self.detect_enabled = False
         self.detect_interval = 1  # times of global periodic task interval.
-        self.detect_counter = 0
 
-        # rt is a dict for runtime data
-        # TODO(Qiming): nodes have to be reloaded when membership changes
-        self.rt = {}
+        # rt is a dict for runtime data, which is loaded on first use
+        self.rt = utils.RuntimeData()
 
         if context is not None:
             self._load_runtime_data(context)
 
     def _load_runtime_data(self, context):
-        self.rt = {
-            'profile': profiles_base.Profile.load(context, self.profile_id),
-            'nodes': node_mod.Node.load_all(context, cluster_id=self.id),
-            'policies': [],
-        }
+        '''Set up the runtime data to be loaded from DB when needed.
+
+        Nothing is loaded here. Any value loaded previously is dropped, so
+        'nodes' and 'node_ids' should be invalidated whenever the membership
+        of the cluster changes.
+        '''
+        def _node_ids():
+            if 'nodes' in self.rt:
+                return [node.id for node in self.rt['nodes']]
+            return db_api.node_get_ids_by_clusters(context, [self.id])[self.id]
+
+        def _profile_name():
+            if 'profile' in self.rt:
+                return self.rt['profile'].name
+            names = db_api.profile_get_names(context, [self.profile_id])
+            return names.get(self.profile_id)
+
+        self.rt = utils.RuntimeData({
+            'profile': lambda: profiles_base.Profile.load(context,
+                                                          self.profile_id),
+            'nodes': lambda: node_mod.Node.load_all(context,
+                                                    cluster_id=self.id),
+            'policies': list,
+            'node_ids': _node_ids,
+            'profile_name': _profile_name,
+        })
 
     def store(self, context):
         '''Store the cluster in database and return its ID.
@@ -182,9 +203,20 @@ class Cluster(periodic_task.PeriodicTasks):
         records = db_api.cluster_get_all(context, limit, marker, sort_keys,
                                          sort_dir, filters, tenant_safe,
                                          show_deleted, show_nested)
+        if not records:
+            return
+
+        # Fetch what to_dict() needs for all clusters at once instead of
+        # querying for each cluster.
+        node_ids = db_api.node_get_ids_by_clusters(
+            context, [record.id for record in records])
+        names = db_api.profile_get_names(
+            context, list(set(record.profile_id for record in records)))
 
         for record in records:
             cluster = cls._from_db_record(context, record)
+            cluster.rt['node_ids'] = node_ids[record.id]
+            cluster.rt['profile_name'] = names.get(record.profile_id)
             yield cluster
 
     def to_dict(self):
@@ -206,9 +238,9 @@ class Cluster(periodic_task.PeriodicTasks):
             'status_reason': self.status_reason,
             'tags': self.tags,
             'data': self.data,
-            'nodes': [node.id for node in self.rt['nodes']],
+            'nodes': self.rt['node_ids'],
             'policies': [policy.id for policy in self.rt['policies']],
-            'profile_name': self.rt['profile'].name,
+            'profile_name': self.rt['profile_name'],
         }
         return info
 
@@ -337,26 +369,44 @@ class Cluster(periodic_task.PeriodicTasks):
         self.detection_inteval = (detection_interval /
                                   CONF.periodic_interval_max)
 
-    @periodic_task.periodic_task
-    def heathy_check(self):
-        if(not self.detect_enabled):
-            return
-
-        if(self.detect_counter < self.detect_interval):
-            self.detect_counter += 1
-            return
-        self.detect_counter = 0
+    def heathy_check(self, context):
+        '''Check the health of the nodes in the cluster.
 
-        fails = 0
-        for nd in self.rt.nodes:
-            if(nd.rt.profile.do_check(nd)):
-                continue
+        The nodes are probed concurrently. Active nodes failing the check
+        are set to ERROR, and nodes set to ERROR by a previous check are
+        set back to ACTIVE when they pass it.
 
-            fails += 1
-
-        # TODO(Anyone):
-        # How to enforce the HA policy?
-        pass
+        :param context: The context used for loading the nodes, which may
+                        be an admin context not bound to the cluster's
+                        project.
+        :returns: A list of the IDs of the nodes failing the check.
+        '''
+        nodes = node_mod.Node.load_all(context, cluster_id=self.id,
+                                       tenant_safe=False)
+        results = health_probe.probe(nodes)
+
+        failed = [nd.id for nd in nodes if results[nd.id] is False]
+        down = [nd.id for nd in nodes
+                if results[nd.id] is False and nd.status == nd.ACTIVE]
+        up = [nd.id for nd in nodes
+              if results[nd.id] and nd.status == nd.ERROR and
+              nd.status_reason == health_probe.HEALTH_CHECK_FAILED]
+
+        # Nodes changed by an action meanwhile are left alone
+        if down:
+            db_api.node_update_all(
+                context, down,
+                {'status': node_mod.Node.ERROR,
+                 'status_reason': health_probe.HEALTH_CHECK_FAILED},
+                expected_status=node_mod.Node.ACTIVE)
+        if up:
+            db_api.node_update_all(
+                context, up,
+                {'status': node_mod.Node.ACTIVE,
+                 'status_reason': health_probe.HEALTH_CHECK_PASSED},
+                expected_status=node_mod.Node.ERROR)
+
+        return failed
 
     def periodic_tasks(self, context, raise_on_error=False):
         '''Tasks to be run at a periodic interval.'''
@@ -10,17 +10,43 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
+import eventlet
+from eventlet import event as eventlet_event
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
 
 from senlin.common import consts
+from senlin.common import context as req_context
+from senlin.common import exception
+from senlin.common.i18n import _LE
 from senlin.common.i18n import _LI
 from senlin.common import messaging as rpc_messaging
+from senlin.db import api as db_api
 from senlin.openstack.common import service
 
 LOG = logging.getLogger(__name__)
 
+# Actions in this engine that are blocked waiting for a wakeup, keyed by
+# action ID.
+_waiters = {}
+
+# Latest control signal of each action running in this engine, as a
+# (signal, time) tuple keyed by action ID. The time tells when the signal
+# was last received or read from the database.
+_signals = {}
+
+# Seconds after which the signal of an action running in this engine is
+# read from the database again, in case a signal message was lost.
+SIGNAL_REFRESH_INTERVAL = 30
+
+# IDs of new actions not yet announced to the dispatchers, and the thread
+# that is going to announce them.
+_new_actions = []
+_notifier = None
+
 
 class Dispatcher(service.Service):
     '''Listen on an AMQP queue named for the engine.
@@ -29,9 +55,11 @@ class Dispatcher(service.Service):
     '''
 
     OPERATIONS = (
-        NEW_ACTION, CANCEL_ACTION, STOP
+        NEW_ACTION, NEW_ACTIONS, CANCEL_ACTION, WAKE_ACTION, SIGNAL_ACTION,
+        STOP
     ) = (
-        'new_action', 'cancel_action', 'stop'
+        'new_action', 'new_actions', 'cancel_action', 'wake_action',
+        'signal_action', 'stop'
     )
 
     def __init__(self, engine_service, topic, version, thread_group_mgr):
@@ -56,7 +84,12 @@ class Dispatcher(service.Service):
         return True
 
     def new_action(self, context, action_id=None):
-        self.TG.start_action(context, action_id, self.engine_id)
+        '''Claim READY actions, the new action included, if possible.'''
+        self.TG.schedule()
+
+    def new_actions(self, context, action_ids=None):
+        '''Claim READY actions after a batch of them has been created.'''
+        self.TG.schedule()
 
     def cancel_action(self, context, action_id):
         '''Cancel an action.'''
@@ -70,6 +103,19 @@ class Dispatcher(service.Service):
         '''Resume an action.'''
         self.TG.resume_action(context, action_id)
 
+    def wake_action(self, context, action_id):
+        '''Wake up an action waiting in this engine, if any.'''
+        waiter = _waiters.get(action_id)
+        if waiter is None:
+            return False
+
+        waiter.wake()
+        return True
+
+    def signal_action(self, context, action_id, signal):
+        '''Deliver a control signal to an action running in this engine.'''
+        return _signal_local(action_id, signal)
+
     def stop(self):
         super(Dispatcher, self).stop()
         # Wait for all action threads to be finished
@@ -80,33 +126,213 @@ class Dispatcher(service.Service):
         LOG.info(_LI("All action threads have been finished"))
 
 
-def notify(context, call, engine_id, *args, **kwargs):
-    '''Send notification to dispatcher
-
-    :param context: rpc request context
-    :param call: remote method want to call
-    :param engine_id: dispatcher want to notify, if None, broadcast
-    '''
-
-    timeout = cfg.CONF.engine_life_check_timeout
+def _cast(context, call, engine_id, **kwargs):
     client = rpc_messaging.get_rpc_client(version=consts.RPC_API_VERSION)
 
     if engine_id:
         # Notify specific dispatcher identified by engine_id
         call_context = client.prepare(
             version=consts.RPC_API_VERSION,
-            timeout=timeout,
             topic=consts.ENGINE_DISPATCHER_TOPIC,
             server=engine_id)
     else:
         # Broadcast to all disptachers
         call_context = client.prepare(
             version=consts.RPC_API_VERSION,
-            timeout=timeout,
-            topic=consts.ENGINE_DISPATCHER_TOPIC)
+            topic=consts.ENGINE_DISPATCHER_TOPIC,
+            fanout=True)
+
+    call_context.cast(context, call, **kwargs)
+
+
+def _flush_new_actions():
+    '''Broadcast the queued action IDs in a single NEW_ACTIONS message.
+
+    The IDs may have been queued by requests of different users, so the
+    message is sent with an admin context instead of any of theirs.
+    '''
+    global _notifier
+
+    eventlet.sleep(cfg.CONF.notify_coalesce_window)
+    action_ids = _new_actions[:]
+    del _new_actions[:]
+    _notifier = None
+
+    try:
+        _cast(req_context.get_admin_context(), Dispatcher.NEW_ACTIONS, None,
+              action_ids=action_ids)
+    except Exception as ex:
+        # The actions are still picked up by the periodic database scan.
+        LOG.error(_LE('Failed notifying dispatchers of %(num)s new actions: '
+                      '%(ex)s'), {'num': len(action_ids), 'ex': ex})
+
+
+def notify(context, call, engine_id, **kwargs):
+    '''Send notification to dispatcher without waiting for a reply.
+
+    NEW_ACTION and NEW_ACTIONS broadcasts are not sent right away. The
+    action IDs are queued and all IDs queued within notify_coalesce_window
+    seconds go out as a single NEW_ACTIONS message.
+
+    :param context: rpc request context
+    :param call: remote method want to call
+    :param engine_id: dispatcher want to notify, if None, broadcast
+    :return: True if the notification has been sent or queued.
+    '''
+    global _notifier
+
+    if engine_id is None and call in (Dispatcher.NEW_ACTION,
+                                      Dispatcher.NEW_ACTIONS):
+        if call == Dispatcher.NEW_ACTION:
+            _new_actions.append(kwargs['action_id'])
+        else:
+            _new_actions.extend(kwargs['action_ids'])
+
+        if _notifier is None:
+            _notifier = eventlet.spawn(_flush_new_actions)
+        return True
+
+    _cast(context, call, engine_id, **kwargs)
+    return True
+
+
+class ActionWaiter(object):
+    '''A wakeup point for an action that is waiting on other actions.
+
+    While the waiter is registered, a wakeup sent to the action is never
+    lost: if it arrives before the action starts waiting, the next wait()
+    returns immediately.
+    '''
+
+    def __init__(self, action_id):
+        self.action_id = action_id
+        self._event = eventlet_event.Event()
+
+    def __enter__(self):
+        _waiters[self.action_id] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if _waiters.get(self.action_id) is self:
+            _waiters.pop(self.action_id)
+
+    def wake(self):
+        if not self._event.ready():
+            self._event.send(True)
+
+    def wait(self, timeout=None):
+        '''Wait for a wakeup.
+
+        :param timeout: seconds to wait at most; None means forever.
+        :return: True if a wakeup was received, False on timeout.
+        '''
+        with eventlet.Timeout(timeout, False):
+            self._event.wait()
+
+        woken = self._event.ready()
+        if woken:
+            self._event = eventlet_event.Event()
+        return woken
+
+
+def wake_action(context, action_id):
+    '''Wake up an action that may be waiting for its dependencies.
+
+    The action is woken up directly if it is waiting in this engine.
+    Otherwise the engine that owns the action is notified over RPC.
+
+    :param context: rpc request context
+    :param action_id: ID of the action to wake up
+    :return: True if a wakeup was delivered, False otherwise.
+    '''
+    waiter = _waiters.get(action_id)
+    if waiter is not None:
+        waiter.wake()
+        return True
 
     try:
-        call_context.call(context, call, *args, **kwargs)
+        owner = db_api.action_lock_check(context, action_id)
+    except exception.NotFound:
+        return False
+
+    if owner is None:
+        # Not running anywhere, the action will see the new status when it
+        # gets executed.
+        return False
+
+    return notify(context, Dispatcher.WAKE_ACTION, owner,
+                  action_id=action_id)
+
+
+def signal_listen(context, action_id):
+    '''Start serving the signals of an action from memory.
+
+    To be called when the action starts running in this engine.
+    '''
+    signal = db_api.action_get_control(context, action_id)
+    _signals[action_id] = (signal, time.time())
+
+
+def signal_ignore(action_id):
+    '''Stop serving the signals of an action that is done running.'''
+    _signals.pop(action_id, None)
+
+
+def signal_get(context, action_id):
+    '''Get the latest control signal sent to an action.
+
+    Signals of the actions running in this engine are served from memory.
+    The database is only read for them every SIGNAL_REFRESH_INTERVAL
+    seconds.
+    '''
+    entry = _signals.get(action_id)
+    now = time.time()
+    if entry is not None and now - entry[1] < SIGNAL_REFRESH_INTERVAL:
+        return entry[0]
+
+    signal = db_api.action_get_control(context, action_id)
+    if entry is not None and action_id in _signals:
+        _signals[action_id] = (signal, now)
+    return signal
+
+
+def _signal_local(action_id, signal):
+    if action_id not in _signals:
+        return False
+
+    _signals[action_id] = (signal, time.time())
+    # The action may be waiting for its dependents or to be resumed
+    waiter = _waiters.get(action_id)
+    if waiter is not None:
+        waiter.wake()
+    return True
+
+
+def send_signal(context, action_id, signal):
+    '''Deliver a control signal to an action.
+
+    The signal is expected to be saved in the database already, this only
+    makes the running action see it without delay. It is delivered
+    directly if the action runs in this engine, otherwise it is forwarded
+    to the engine that owns the action.
+
+    :param context: rpc request context
+    :param action_id: ID of the action to signal
+    :param signal: the control signal
+    :return: True if the signal has been delivered or forwarded.
+    '''
+    if _signal_local(action_id, signal):
         return True
-    except oslo_messaging.MessagingTimeout:
+
+    try:
+        owner = db_api.action_lock_check(context, action_id)
+    except exception.NotFound:
         return False
+
+    if owner is None:
+        # Not running, the action reads the signal from the database when
+        # it starts.
+        return False
+
+    return notify(context, Dispatcher.SIGNAL_ACTION, owner,
+                  action_id=action_id, signal=signal)
@@ -12,9 +12,14 @@
 
 import datetime
 import logging
+import uuid
 
+import eventlet
+from oslo_config import cfg
 from oslo_log import log
+import six
 
+from senlin.common import context as req_context
 from senlin.common import exception
 from senlin.common import i18n
 from senlin.db import api as db_api
@@ -27,6 +32,10 @@ _ = i18n._
 
 LOG = log.getLogger(__name__)
 
+# Values of the events waiting to be written into the database, see flush()
+_pending = []
+_flusher = None
+
 
 class Event(object):
     '''Class capturing an interesting happening in Senlin.'''
@@ -103,21 +112,27 @@ class Event(object):
     @classmethod
     def load_all(cls, context, filters=None, limit=None, marker=None,
                  sort_keys=None, sort_dir=None, tenant_safe=True,
-                 show_deleted=False):
-        '''Retrieve all events from database.'''
+                 show_deleted=False, start_time=None, end_time=None):
+        '''Retrieve all events from database.
+
+        Archived events are included when start_time reaches back to them.
+        '''
 
         records = db_api.event_get_all(context, limit=limit, marker=marker,
                                        sort_keys=sort_keys, sort_dir=sort_dir,
                                        filters=filters,
                                        tenant_safe=tenant_safe,
-                                       show_deleted=show_deleted)
+                                       show_deleted=show_deleted,
+                                       start_time=start_time,
+                                       end_time=end_time)
 
         for record in records:
             yield cls.from_db_record(record)
 
-    def store(self, context):
-        '''Store the event into database and return its ID.'''
-        values = {
+    def _db_values(self):
+        '''Get the values of the event in the form of a DB record.'''
+        return {
+            'id': self.id,
             'level': self.level,
             'timestamp': self.timestamp,
             'obj_id': self.obj_id,
@@ -132,6 +147,10 @@ class Event(object):
             'deleted_time': self.deleted_time,
         }
 
+    def store(self, context):
+        '''Store the event into database and return its ID.'''
+        values = self._db_values()
+        values.pop('id')
         event = db_api.event_create(context, values)
         self.id = event.id
 
@@ -160,13 +179,55 @@ class Event(object):
         return evt
 
 
+def _write(event):
+    '''Buffer an event to be written into the database with others.
+
+    The buffer is written when it has `event_batch_size` events, or after
+    `event_flush_interval` seconds, whichever comes first. If the buffer is
+    full, the caller writes it out before adding the event.
+    '''
+    global _flusher
+
+    if len(_pending) >= cfg.CONF.event_queue_size:
+        flush()
+
+    event.id = str(uuid.uuid4())
+    _pending.append(event._db_values())
+    if len(_pending) >= cfg.CONF.event_batch_size:
+        eventlet.spawn_n(flush)
+    elif _flusher is None:
+        _flusher = eventlet.spawn(_flush_later)
+
+
+def _flush_later():
+    global _flusher
+
+    eventlet.sleep(cfg.CONF.event_flush_interval)
+    _flusher = None
+    flush()
+
+
+def flush():
+    '''Write all buffered events into the database.'''
+    context = req_context.get_admin_context()
+    batch_size = cfg.CONF.event_batch_size
+    while _pending:
+        batch = _pending[:batch_size]
+        del _pending[:batch_size]
+        try:
+            db_api.event_create_many(context, batch)
+        except Exception as ex:
+            LOG.error(_LE('Failed writing %(num)d events: %(ex)s'),
+                      {'num': len(batch), 'ex': six.text_type(ex)})
+
+
 def critical(context, entity, action, status=None, status_reason=None,
              timestamp=None):
     timestamp = timestamp or datetime.datetime.utcnow()
     event = Event(timestamp, logging.CRITICAL, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user_id, project=context.project_id)
-    event.store(context)
+    _write(event)
     LOG.critical(_LC('%(name)s[%(id)s] - %(status)s: %(reason)s') %
                  {'name': entity.name, 'id': entity.id, 'status': status,
                   'reason': status_reason})
@@ -178,7 +239,7 @@ def error(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.ERROR, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user_id, project=context.project_id)
-    event.store(context)
+    _write(event)
     LOG.error(_LE('%(name)s[%(id)s] %(action)s - %(status)s: %(reason)s') %
               {'name': entity.name, 'id': entity.id, 'action': action,
                'status': status, 'reason': status_reason})
@@ -190,7 +251,7 @@ def warning(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.WARNING, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user_id, project=context.project_id)
-    event.store(context)
+    _write(event)
     LOG.warning(_LW('%(name)s[%(id)s] %(action)s - %(status)s: %(reason)s') %
                 {'name': entity.name, 'id': entity.id, 'action': action,
                  'status': status, 'reason': status_reason})
@@ -202,7 +263,7 @@ def info(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.INFO, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user_id, project=context.project_id)
-    event.store(context)
+    _write(event)
     LOG.info(_LI('%(name)s[%(id)s] %(action)s - %(status)s: %(reason)s') %
              {'name': entity.name, 'id': entity.id, 'action': action,
               'status': status, 'reason': status_reason})
@@ -214,7 +275,7 @@ def debug(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.DEBUG, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user_id, project=context.project_id)
-    event.store(context)
+    _write(event)
     LOG.debug(_('%(name)s[%(id)s] %(action)s - %(status)s: %(reason)s') %
               {'name': entity.name, 'id': entity.id, 'action': action,
                'status': status, 'reason': status_reason})
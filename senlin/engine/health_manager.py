@@ -18,14 +18,26 @@ take corresponding actions to recover the clusters based on the pre-defined
 health policies.
 '''
 
+import bisect
+import hashlib
 import random
+import time
 
+import eventlet
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
+import six
 
 from senlin.common import consts
+from senlin.common import context
+from senlin.common.i18n import _LE
+from senlin.common.i18n import _LI
+from senlin.common.i18n import _LW
 from senlin.common import messaging as rpc_messaging
+from senlin.db import api as db_api
+from senlin.engine import cluster as cluster_mod
+from senlin.engine import senlin_lock
 from senlin.openstack.common import periodic_task
 from senlin.openstack.common import service
 
@@ -48,6 +60,46 @@ CONF.register_opts(health_mgr_opts)
 
 LOG = logging.getLogger(__name__)
 
+# Number of points each engine gets on the hash ring. More points spread
+# the clusters more evenly at the cost of a larger ring.
+HASH_RING_REPLICAS = 64
+
+# Health policies and their settings as stored in the database
+HEALTH_POLICY_TYPE = 'HealthPolicy'
+NODE_STATUS_POLLING = 'NODE_STATUS_POLLING'
+DEFAULT_CHECK_INTERVAL = 60
+
+
+def _hash(key):
+    '''Map a string to an integer evenly spread over [0, 2 ** 32).'''
+    digest = hashlib.md5(six.text_type(key).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16)
+
+
+class HashRing(object):
+    '''A consistent hash ring assigning clusters to engines.
+
+    Each engine is placed on the ring at a number of points and a cluster
+    is owned by the engine at the first point following the hash of its ID.
+    When an engine joins or leaves, only the clusters next to its points
+    change owner, the others stay where they are.
+    '''
+
+    def __init__(self, members, replicas=HASH_RING_REPLICAS):
+        self.members = frozenset(members)
+        points = sorted((_hash('%s-%s' % (member, i)), member)
+                        for member in self.members
+                        for i in range(replicas))
+        self._keys = [p[0] for p in points]
+        self._owners = [p[1] for p in points]
+
+    def get_owner(self, key):
+        '''Get the member owning the given key, None if there is none.'''
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[index]
+
 
 class Health_Manager(service.Service, periodic_task.PeriodicTasks):
 
@@ -63,9 +115,107 @@ class Health_Manager(service.Service, periodic_task.PeriodicTasks):
         self.periodic_enable = CONF.periodic_enable
         self.periodic_fuzzy_delay = CONF.periodic_fuzzy_delay
 
+        # The ring of live engines clusters are partitioned over
+        self.ring = HashRing([])
+        # Number of sweeps done, and the sweep each cluster owned by this
+        # engine was last checked in
+        self.sweeps = 0
+        self.checked = {}
+
+    def _update_ring(self, ctx):
+        '''Rebuild the hash ring when an engine has joined or left.'''
+        expiry = senlin_lock.engine_expiry()
+        engines = set(e.id for e in db_api.engine_get_all(ctx)
+                      if e.updated_time >= expiry)
+        # This engine may not have recorded its first heartbeat yet
+        engines.add(self.engine_id)
+        if engines == self.ring.members:
+            return
+
+        LOG.info(_LI('Engine %(id)s rebalancing health checks over '
+                     '%(count)s engines.'), {'id': self.engine_id,
+                                             'count': len(engines)})
+        self.ring = HashRing(engines)
+
+    def _get_due_clusters(self, ctx):
+        '''Get the clusters of this engine's shard due for a check.
+
+        A cluster is checked every `interval` seconds of its health policy,
+        rounded up to a number of sweeps.
+
+        :returns: A list of cluster IDs.
+        '''
+        intervals = {}
+        for cluster_id, spec in db_api.cluster_policy_get_by_type(
+                ctx, HEALTH_POLICY_TYPE):
+            if self.ring.get_owner(cluster_id) != self.engine_id:
+                continue
+            detection = (spec or {}).get('detection', {})
+            if detection.get('type') != NODE_STATUS_POLLING:
+                continue
+            interval = int(detection.get('interval', DEFAULT_CHECK_INTERVAL))
+            intervals[cluster_id] = min(intervals.get(cluster_id, interval),
+                                        interval)
+
+        # Forget the clusters moved to other engines or no longer checked
+        for cluster_id in set(self.checked) - set(intervals):
+            del self.checked[cluster_id]
+
+        due = []
+        for cluster_id, interval in six.iteritems(intervals):
+            sweeps = max(1, -(-interval // self.periodic_interval_max))
+            last = self.checked.get(cluster_id)
+            if last is None or self.sweeps - last >= sweeps:
+                due.append(cluster_id)
+        return due
+
+    def _check_cluster(self, ctx, cluster_id):
+        try:
+            record = db_api.cluster_get(ctx, cluster_id, tenant_safe=False)
+            if record is None:
+                return
+            cluster = cluster_mod.Cluster.load(ctx, cluster=record)
+            failed = cluster.heathy_check(ctx)
+        except Exception as ex:
+            LOG.error(_LE('Failed checking health of cluster %(cluster)s: '
+                          '%(ex)s'), {'cluster': cluster_id,
+                                      'ex': six.text_type(ex)})
+            return
+
+        self.checked[cluster_id] = self.sweeps
+        if failed:
+            LOG.warn(_LW('Nodes %(nodes)s of cluster %(cluster)s failed '
+                         'health check.'), {'nodes': failed,
+                                            'cluster': cluster_id})
+
     def periodic_tasks(self, raise_on_error=False):
-        """Tasks to be run at a periodic interval."""
-        #TODO(anyone): iterate clusters and call their periodic_tasks
+        '''Check the health of the clusters owned by this engine.
+
+        Clusters are partitioned over the live engines by consistent
+        hashing, so each cluster is checked by one engine only. The checks
+        are spread over the interval, each cluster at a fixed offset.
+        '''
+        ctx = context.get_admin_context()
+        try:
+            self._update_ring(ctx)
+            due = self._get_due_clusters(ctx)
+        except Exception as ex:
+            LOG.error(_LE('Failed scheduling health checks by engine '
+                          '%(id)s: %(ex)s'), {'id': self.engine_id,
+                                              'ex': six.text_type(ex)})
+            if raise_on_error:
+                raise
+            return self.periodic_interval_max
+
+        self.sweeps += 1
+        start = time.time()
+        scale = float(self.periodic_interval_max) / 2 ** 32
+        for offset, cluster_id in sorted((_hash(c) * scale, c) for c in due):
+            delay = start + offset - time.time()
+            if delay > 0:
+                eventlet.sleep(delay)
+            self._check_cluster(ctx, cluster_id)
+
         return self.periodic_interval_max
 
     def start(self):
@@ -83,7 +233,8 @@ class Health_Manager(service.Service, periodic_task.PeriodicTasks):
                 initial_delay = None
 
             self.threadgroup.add_timer(self.periodic_interval_max,
-                                       self.periodic_tasks)
+                                       self.periodic_tasks,
+                                       initial_delay=initial_delay)
 
     def listening(self, context):
         '''Respond affirmatively to confirm that the engine performing the
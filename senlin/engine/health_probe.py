@@ -0,0 +1,112 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Health probing of nodes.
+
+The nodes are checked concurrently by a bounded pool of green threads, so a
+sweep over a cluster takes about as long as its slowest check instead of the
+sum of them. Profiles able to check many nodes with a single request, e.g.
+by listing the Heat stacks at once, do so through their batch check hook.
+'''
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
+
+from senlin.common.i18n import _LE
+from senlin.common.i18n import _LW
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('health_check_concurrency', 'senlin.common.config')
+CONF.import_opt('health_check_timeout', 'senlin.common.config')
+
+# Reasons of the node status changes made by health checks
+HEALTH_CHECK_FAILED = 'Health check failed'
+HEALTH_CHECK_PASSED = 'Health check passed'
+
+
+def _check_batch(profile, nodes):
+    try:
+        with eventlet.Timeout(CONF.health_check_timeout):
+            return profile.do_check_all(nodes)
+    except eventlet.Timeout:
+        LOG.warn(_LW('Health check of %(count)s nodes of profile '
+                     '%(profile)s timed out.'), {'count': len(nodes),
+                                                 'profile': profile.id})
+    except Exception as ex:
+        LOG.error(_LE('Failed checking health of %(count)s nodes of '
+                      'profile %(profile)s: %(ex)s'),
+                  {'count': len(nodes), 'profile': profile.id,
+                   'ex': six.text_type(ex)})
+    return {}
+
+
+def _check_node(profile, node):
+    try:
+        with eventlet.Timeout(CONF.health_check_timeout):
+            result = profile.do_check(node)
+    except eventlet.Timeout:
+        LOG.warn(_LW('Health check of node %s timed out.'), node.id)
+        return None
+    except Exception as ex:
+        LOG.error(_LE('Failed checking health of node %(node)s: %(ex)s'),
+                  {'node': node.id, 'ex': six.text_type(ex)})
+        return None
+
+    if result is NotImplemented:
+        return None
+    return bool(result)
+
+
+def probe(nodes):
+    '''Check the health of the given nodes.
+
+    :param nodes: A list of node objects.
+    :returns: A dict mapping node IDs to True if the node is healthy, False
+              if it is not, or None if its health is unknown, e.g. because
+              the check failed or timed out.
+    '''
+    groups = {}
+    for nd in nodes:
+        groups.setdefault(nd.profile_id, []).append(nd)
+
+    pool = eventlet.GreenPool(max(1, CONF.health_check_concurrency))
+    results = dict((nd.id, None) for nd in nodes)
+
+    # Nodes of the same profile share its object, loaded only once
+    profiles = {}
+    batches = []
+    for profile_id, group in six.iteritems(groups):
+        profile = group[0].rt['profile']
+        profiles[profile_id] = profile
+        batches.append((group, pool.spawn(_check_batch, profile, group)))
+
+    singles = []
+    for group, thread in batches:
+        checked = thread.wait()
+        if checked is NotImplemented:
+            singles.extend(group)
+            continue
+        for nd in group:
+            results[nd.id] = checked.get(nd.id)
+
+    def check(nd):
+        return nd.id, _check_node(profiles[nd.profile_id], nd)
+
+    for node_id, result in pool.imap(check, singles):
+        results[node_id] = result
+
+    return results
@@ -17,6 +17,7 @@ from oslo_log import log as logging
 from senlin.common import exception
 from senlin.common.i18n import _LE
 from senlin.common.i18n import _LW
+from senlin.common import utils
 from senlin.db import api as db_api
 from senlin.engine import event as event_mod
 from senlin.profiles import base as profile_base
@@ -65,25 +66,30 @@ class Node(object):
         self.status_reason = kwargs.get('status_reason', 'Initializing')
         self.data = kwargs.get('data', {})
         self.tags = kwargs.get('tags', {})
-        self.rt = {}
+        # rt is a dict for runtime data, which is loaded on first use
+        self.rt = utils.RuntimeData()
 
         if context is not None:
             self.project = context.project_id
             self._load_runtime_data(context)
 
     def _load_runtime_data(self, context):
-        self.rt = {
-            'profile': profile_base.Profile.load(context, self.profile_id),
-        }
-
-    def store(self, context):
-        '''Store the node record into database table.
-
-        The invocation of DB API could be a node_create or a node_update,
-        depending on whether node has an ID assigned.
-        '''
-
-        values = {
+        '''Set up the runtime data to be loaded from DB when needed.'''
+        def _profile_name():
+            if 'profile' in self.rt:
+                return self.rt['profile'].name
+            names = db_api.profile_get_names(context, [self.profile_id])
+            return names.get(self.profile_id)
+
+        self.rt = utils.RuntimeData({
+            'profile': lambda: profile_base.Profile.load(context,
+                                                         self.profile_id),
+            'profile_name': _profile_name,
+        })
+
+    def _db_values(self):
+        '''Get the values of the node in the form of a DB record.'''
+        return {
             'name': self.name,
             'physical_id': self.physical_id,
             'cluster_id': self.cluster_id,
@@ -101,6 +107,14 @@ class Node(object):
             'tags': self.tags,
         }
 
+    def store(self, context):
+        '''Store the node record into database table.
+
+        The invocation of DB API could be a node_create or a node_update,
+        depending on whether node has an ID assigned.
+        '''
+
+        values = self._db_values()
         if self.id:
             db_api.node_update(context, self.id, values)
             # TODO(Qiming): create event/log
@@ -115,6 +129,29 @@ class Node(object):
         self._load_runtime_data(context)
         return self.id
 
+    @classmethod
+    def store_many(cls, context, nodes):
+        '''Create the DB records for a batch of new nodes.
+
+        All records are created in a single transaction, which is much
+        cheaper than calling store() on each node when there are many.
+
+        :param context: the context used for DB operations;
+        :param nodes: a list of node objects which have no ID assigned;
+        :returns: a list of IDs of the nodes created.
+        '''
+        init_time = datetime.datetime.utcnow()
+        values_list = []
+        for node in nodes:
+            node.init_time = init_time
+            values_list.append(node._db_values())
+
+        records = db_api.node_create_many(context, values_list)
+        for node, record in zip(nodes, records):
+            node.id = record.id
+
+        return [node.id for node in nodes]
+
     @classmethod
     def _from_db_record(cls, context, record):
         '''Construct a node object from database record.
@@ -164,7 +201,14 @@ class Node(object):
                                       filters=filters,
                                       tenant_safe=tenant_safe)
 
-        return [cls._from_db_record(context, record) for record in records]
+        nodes = [cls._from_db_record(context, record) for record in records]
+        if nodes:
+            # Nodes mostly share a few profiles, get their names at once
+            names = db_api.profile_get_names(
+                context, list(set(node.profile_id for node in nodes)))
+            for node in nodes:
+                node.rt['profile_name'] = names.get(node.profile_id)
+        return nodes
 
     def to_dict(self):
         node_dict = {
@@ -184,7 +228,7 @@ class Node(object):
             'status_reason': self.status_reason,
             'data': self.data,
             'tags': self.tags,
-            'profile_name': self.rt['profile'].name,
+            'profile_name': self.rt['profile_name'],
         }
         return node_dict
 
@@ -11,14 +11,22 @@
 # under the License.
 
 import eventlet
+import logging as sys_logging
 import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
+import six
 
+from senlin.common import context as req_context
+from senlin.common.i18n import _LE
+from senlin.db import api as db_api
 from senlin.engine.actions import base as action_mod
 from senlin.engine import dispatcher
 from senlin.openstack.common import threadgroup
+from senlin.policies import base as policy_base
+from senlin.profiles import base as profile_base
 
 LOG = logging.getLogger(__name__)
 
@@ -28,15 +36,44 @@ wallclock = time.time
 class ThreadGroupManager(object):
     '''Thread group manager.'''
 
-    def __init__(self):
+    def __init__(self, engine_id=None):
         super(ThreadGroupManager, self).__init__()
+        self.engine_id = engine_id
         self.threads = {}
-        self.group = threadgroup.ThreadGroup()
+        self.max_actions = cfg.CONF.max_actions_per_engine
+
+        # Actions requested by users and actions derived from them are
+        # run in two priority classes, each allowed max_actions threads.
+        # User actions are always claimed first and never queue behind
+        # a backlog of derived actions. Since they often wait for their
+        # derived actions, the latter having slots of their own also
+        # guarantees that they can make progress.
+        self.derived = set()
+
+        # Action threads are only started when there is a free slot, so
+        # spawning a thread into the pool never blocks.
+        self.group = threadgroup.ThreadGroup(
+            thread_pool_size=2 * self.max_actions)
+
+        # Whether a scan for READY actions is in progress, and whether
+        # another scan was requested while it was in progress.
+        self._scanning = False
+        self._rescan = False
+
+        # Counters about claimed actions, see get_stats()
+        self._claimed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
 
         # Create dummy service task, because when there is nothing queued
         # on self.tg the process exits
         self.add_timer(cfg.CONF.periodic_interval, self._service_task)
 
+        if engine_id is not None:
+            # Catch READY actions whose notifications were lost or which
+            # could not be claimed earlier due to lack of capacity.
+            self.add_timer(cfg.CONF.action_claim_interval, self.schedule)
+
     def _service_task(self):
         '''Dummy task which gets queued on the service.Service threadgroup.
 
@@ -47,38 +84,111 @@ class ThreadGroupManager(object):
 
         (Yanyan)Not sure this is still necessary, just keep it temporarily.
         '''
-        # TODO(Yanyan): have this task call dbapi purge events
-        pass
+        if (self.engine_id is not None and
+                LOG.isEnabledFor(sys_logging.DEBUG)):
+            LOG.debug('Action scheduler stats of engine %(engine)s: '
+                      '%(stats)s', {'engine': self.engine_id,
+                                    'stats': self.get_stats()})
 
     def start(self, func, *args, **kwargs):
         '''Run the given method in a sub-thread.'''
 
         return self.group.add_thread(func, *args, **kwargs)
 
+    def schedule(self):
+        '''Claim READY actions from the database and run them.
+
+        Actions are claimed only while this engine runs fewer than
+        max_actions_per_engine actions of their class, the rest are left in
+        the database for other engines, or for the scan triggered when one
+        of the running actions finishes.
+        '''
+        self._rescan = True
+        if self._scanning:
+            # The scan in progress will do another round
+            return
+
+        self._scanning = True
+        try:
+            while self._rescan:
+                self._rescan = False
+                for derived in (False, True):
+                    self._claim(derived)
+        except Exception as ex:
+            LOG.error(_LE('Failed claiming actions for engine %(engine)s: '
+                          '%(ex)s'), {'engine': self.engine_id,
+                                      'ex': six.text_type(ex)})
+        finally:
+            self._scanning = False
+
+    def _running(self, derived):
+        '''Number of actions of the given class running in this engine.'''
+        if derived:
+            return len(self.derived)
+        return len(self.threads) - len(self.derived)
+
+    def _claim(self, derived):
+        '''Claim and start actions of one class until it has no free slot.'''
+        while self._running(derived) < self.max_actions:
+            context = req_context.get_admin_context()
+            action = db_api.action_acquire_1st_ready(
+                context, self.engine_id, wallclock(), derived=derived)
+            if action is None:
+                return
+
+            if action.created_time is not None:
+                waited = timeutils.delta_seconds(action.created_time,
+                                                 timeutils.utcnow())
+                self._claimed += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+            if derived:
+                self.derived.add(action.id)
+            self.start_action(context, action.id, self.engine_id)
+
+    def get_stats(self):
+        '''Get the metrics of action scheduling in this engine.
+
+        :returns: A dict containing the number of running actions in each
+                  class, the number of READY actions in the database not
+                  claimed by any engine yet, and the number of actions
+                  claimed by this engine along with the average and maximum
+                  seconds they had waited since creation. The hit and miss
+                  counters of the profile and policy caches are included.
+        '''
+        context = req_context.get_admin_context()
+        claimed = self._claimed
+        return {
+            'running': self._running(False),
+            'running_derived': self._running(True),
+            'queued': db_api.action_count_ready(context),
+            'claimed': claimed,
+            'wait_time_avg': self._wait_total / claimed if claimed else 0.0,
+            'wait_time_max': self._wait_max,
+            'profile_cache': profile_base._cache.get_stats(),
+            'policy_cache': policy_base._cache.get_stats(),
+        }
+
     def start_action(self, context, action_id, worker_id):
         '''Run the given action in a sub-thread.
 
-        Release the action lock when the thread finishes?
-
-        :param context: The context of rpc request.
+        :param context: The context used for DB operations.
         :param action_id: ID of the action to run in thread.
+        :param worker_id: ID of the engine running the action.
         '''
-        def check_and_notify_retry():
-            action = action_mod.Action.load(context, action_id)
-            # This is for actions with RETRY
-            if action.status == action.READY:
-                dispatcher.notify(context, dispatcher.Dispatcher.NEW_ACTION,
-                                  None, action_id=action_id)
-
-        def release(gt, context, action_id):
+        def release(gt, action_id):
             '''Callback function that will be passed to GreenThread.link().'''
             # Remove action thread from thread list
-            self.threads.pop(action_id)
-            check_and_notify_retry()
+            self.threads.pop(action_id, None)
+            self.derived.discard(action_id)
+            # A slot is free now, and the action itself might have become
+            # READY again for a retry.
+            self.schedule()
 
         th = self.start(action_mod.ActionProc, context, action_id, worker_id)
         self.threads[action_id] = th
-        th.link(release, context, action_id)
+        th.link(release, action_id)
         return th
 
     def cancel_action(self, context, action_id):
@@ -87,17 +197,28 @@ class ThreadGroupManager(object):
         #               running. We have to trace back to scheduler to know if
         #               there is any thread working on it.
         action = action_mod.Action.load(context, action_id)
+        if action.owner is None and action.status == action.READY:
+            # The action is still queued. Take it so that nobody else can
+            # start it and cancel it right away.
+            if db_api.action_acquire(context, action_id, self.engine_id,
+                                     wallclock()):
+                action.set_status(action.RES_CANCEL)
+                return
+
         action.signal(context, action.SIG_CANCEL)
+        dispatcher.send_signal(context, action_id, action.SIG_CANCEL)
 
     def suspend_action(self, context, action_id):
         '''Suspend an action execution progress.'''
         action = action_mod.Action.load(context, action_id)
         action.signal(context, action.SIG_SUSPEND)
+        dispatcher.send_signal(context, action_id, action.SIG_SUSPEND)
 
     def resume_action(self, context, action_id):
         '''Resume an action execution progress.'''
         action = action_mod.Action.load(context, action_id)
         action.signal(context, action.SIG_RESUME)
+        dispatcher.send_signal(context, action_id, action.SIG_RESUME)
 
     def add_timer(self, interval, func, *args, **kwargs):
         '''Define a periodic task, to be run in a separate thread, in the
@@ -105,7 +226,7 @@ class ThreadGroupManager(object):
         Interval is from cfg.CONF.periodic_interval
         '''
 
-        self.group.add_timer(cfg.CONF.periodic_interval, func, *args, **kwargs)
+        self.group.add_timer(interval, func, *args, **kwargs)
 
     def stop_timers(self):
         self.group.stop_timers()
@@ -146,9 +267,10 @@ def action_wait(action):
     '''Keep waiting util action resume control flag is set.'''
 
     # TODO(Yanyan): This may not be correct!!!
-    while not action.is_resumed():
-        reschedule(action, sleep_time=1)
-        continue
+    with dispatcher.ActionWaiter(action.id) as waiter:
+        while not action.is_resumed():
+            # Woken up as soon as a signal is delivered to the action
+            waiter.wait(1)
 
 
 def sleep(sleep_time):
@@ -11,29 +11,42 @@
 # under the License.
 
 import contextlib
+import datetime
+import time
 import uuid
 
 from oslo_config import cfg
 from oslo_log import log as logging
-import oslo_messaging
 from oslo_utils import excutils
+from oslo_utils import timeutils
 
+from senlin.common import context as req_context
 from senlin.common import exception
 from senlin.common.i18n import _LE
 from senlin.common.i18n import _LI
 from senlin.common.i18n import _LW
-from senlin.common import messaging as rpc_messaging
 from senlin.db import api as db_api
-from senlin.engine import scheduler
+from senlin.engine import dispatcher
 
 CONF = cfg.CONF
 
-CONF.import_opt('engine_life_check_timeout', 'senlin.common.config')
+CONF.import_opt('heartbeat_interval', 'senlin.common.config')
 CONF.import_opt('lock_retry_times', 'senlin.common.config')
 CONF.import_opt('lock_retry_interval', 'senlin.common.config')
 
 LOG = logging.getLogger(__name__)
 
+# Threads in this engine waiting for a lock to be released, keyed by the
+# ID of the locked cluster or node.
+_release_waiters = {}
+
+# Liveness of other engines as (alive, time checked) tuples, keyed by the
+# engine ID.
+_engines = {}
+
+# Number of heartbeats an engine can miss before it is considered dead.
+ENGINE_DEAD_HEARTBEATS = 3
+
 LOCK_SCOPES = (
     CLUSTER_SCOPE, NODE_SCOPE,
 ) = (
@@ -41,6 +54,16 @@ LOCK_SCOPES = (
 )
 
 
+def engine_expiry():
+    '''Return the time before which heartbeats are from dead engines.'''
+    timeout = CONF.heartbeat_interval * ENGINE_DEAD_HEARTBEATS
+    return timeutils.utcnow() - datetime.timedelta(seconds=timeout)
+
+
+def engine_expired(engine):
+    return engine.updated_time < engine_expiry()
+
+
 class BaseLock(object):
     '''Base class for locks.'''
 
@@ -53,13 +76,19 @@ class BaseLock(object):
 
     @staticmethod
     def engine_alive(context, engine_id):
-        client = rpc_messaging.get_rpc_client(version='1.0', topic=engine_id)
-        client_context = client.prepare(
-            timeout=cfg.CONF.engine_life_check_timeout)
-        try:
-            return client_context.call(context, 'listening')
-        except oslo_messaging.MessagingTimeout:
-            return False
+        '''Check whether an engine is alive from its heartbeats.
+
+        The answer is cached for one heartbeat interval.
+        '''
+        now = time.time()
+        cached = _engines.get(engine_id)
+        if cached is not None and now - cached[1] < CONF.heartbeat_interval:
+            return cached[0]
+
+        engine = db_api.engine_get(context, engine_id)
+        alive = engine is not None and not engine_expired(engine)
+        _engines[engine_id] = (alive, now)
+        return alive
 
     @staticmethod
     def generate_engine_id():
@@ -180,6 +209,59 @@ class BaseLock(object):
             raise
 
 
+class _ReleaseWaiter(dispatcher.ActionWaiter):
+    '''A wakeup point for an action waiting for a lock.
+
+    The action is woken up when the lock is released in this engine, or
+    when the lock is handed over to it, possibly by another engine.
+    '''
+
+    def __init__(self, target_id, action_id):
+        super(_ReleaseWaiter, self).__init__(action_id)
+        self.target_id = target_id
+
+    def __enter__(self):
+        _release_waiters.setdefault(self.target_id, []).append(self)
+        return super(_ReleaseWaiter, self).__enter__()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        waiters = _release_waiters.get(self.target_id, [])
+        if self in waiters:
+            waiters.remove(self)
+            if not waiters:
+                _release_waiters.pop(self.target_id)
+        super(_ReleaseWaiter, self).__exit__(exc_type, exc_value, tb)
+
+
+def _notify_release(target_id):
+    for waiter in _release_waiters.pop(target_id, []):
+        waiter.wake()
+
+
+def _acquire_with_retry(target_id, action_id, acquire):
+    '''Try acquire() until the action holds the lock or time runs out.
+
+    A thread that fails to get the lock waits for it to be released in
+    this engine, or to be handed over to it. Other releases are picked up
+    every lock_retry_interval seconds. The total time spent waiting is
+    the same as retrying lock_retry_times times.
+
+    :param acquire: a function trying to acquire the lock and returning
+                    the IDs of the actions that hold it.
+    :return: the lock holders returned by the last try.
+    '''
+    interval = cfg.CONF.lock_retry_interval
+    deadline = time.time() + cfg.CONF.lock_retry_times * interval
+    while True:
+        # Register before trying so that no release can be missed
+        with _ReleaseWaiter(target_id, action_id) as waiter:
+            owners = acquire()
+            remaining = deadline - time.time()
+            if action_id in owners or remaining <= 0:
+                return owners
+            waiter.wait(min(interval, remaining))
+
+
 def cluster_lock_acquire(cluster_id, action_id, scope=CLUSTER_SCOPE,
                          forced=False):
     '''Try to lock the specified cluster
@@ -187,24 +269,15 @@ def cluster_lock_acquire(cluster_id, action_id, scope=CLUSTER_SCOPE,
     :param forced_locking: set to True to cancel current action that
                            owns the lock, if any.
     '''
-    # Step 1: try lock the cluster - if the returned owner_id is the
-    #         action id, it was a success
-    owners = db_api.cluster_lock_acquire(cluster_id, action_id, scope)
+    # Step 1: try lock the cluster, waiting for the lock to be released if
+    #         it is in use
+    owners = _acquire_with_retry(
+        cluster_id, action_id,
+        lambda: db_api.cluster_lock_acquire(cluster_id, action_id, scope))
     if action_id in owners:
         return True
 
-    # Step 2: retry using global configuration options
-    retries = cfg.CONF.lock_retry_times
-    retry_interval = cfg.CONF.lock_retry_interval
-
-    while retries > 0:
-        scheduler.sleep(retry_interval)
-        owners = db_api.cluster_lock_acquire(cluster_id, action_id, scope)
-        if action_id in owners:
-            return True
-        retries = retries - 1
-
-    # Step 3: Last resort is 'forced locking', only needed when retry failed
+    # Step 2: Last resort is 'forced locking', only needed when retry failed
     if forced:
         owners = db_api.cluster_lock_steal(cluster_id, action_id)
         return action_id in owners
@@ -213,11 +286,26 @@ def cluster_lock_acquire(cluster_id, action_id, scope=CLUSTER_SCOPE,
                   'action %(new)s failed grabbing the lock') % {
                       'old': str(owners), 'new': action_id})
 
+    # Leave the wait queue, passing the lock on in case it was just handed
+    # over to this action.
+    cluster_lock_release(cluster_id, action_id, scope)
     return False
 
 
 def cluster_lock_release(cluster_id, action_id, scope):
     db_api.cluster_lock_release(cluster_id, action_id, scope)
+    cluster_lock_handoff(cluster_id)
+
+
+def cluster_lock_handoff(cluster_id):
+    '''Hand a free cluster lock over to the next actions in the queue.
+
+    The actions waiting in this engine are woken up directly, the others
+    via their engines.
+    '''
+    context = req_context.get_admin_context()
+    for waiter_id in db_api.cluster_lock_handoff(cluster_id):
+        dispatcher.wake_action(context, waiter_id)
 
 
 def node_lock_acquire(node_id, action_id, forced=False):
@@ -226,34 +314,26 @@ def node_lock_acquire(node_id, action_id, forced=False):
     :param forced_locking: set to True to cancel current action that
                            owns the lock, if any.
     '''
-    # Step 1: try lock the node - if the returned owner_id is the
-    #         action id, it was a success
-    owner = db_api.node_lock_acquire(node_id, action_id)
-    if action_id == owner:
+    # Step 1: try lock the node, waiting for the lock to be released if
+    #         it is in use
+    owners = _acquire_with_retry(
+        node_id, action_id,
+        lambda: [db_api.node_lock_acquire(node_id, action_id)])
+    if action_id in owners:
         return True
 
-    # Step 2: retry using global configuration options
-    retries = cfg.CONF.lock_retry_times
-    retry_interval = cfg.CONF.lock_retry_interval
-
-    while retries > 0:
-        scheduler.sleep(retry_interval)
-        owner = db_api.node_lock_acquire(node_id, action_id)
-        if action_id == owner:
-            return True
-        retries = retries - 1
-
-    # Step 3: Last resort is 'forced locking', only needed when retry failed
+    # Step 2: Last resort is 'forced locking', only needed when retry failed
     if forced:
         owner = db_api.node_lock_steal(node_id, action_id)
         return action_id == owner
 
     LOG.error(_LE('Node is already locked by action %(old)s, '
                   'action %(new)s failed grabbing the lock') % {
-                      'old': owner, 'new': action_id})
+                      'old': owners[0], 'new': action_id})
 
     return False
 
 
 def node_lock_release(node_id, action_id):
     db_api.node_lock_release(node_id, action_id)
+    _notify_release(node_id)
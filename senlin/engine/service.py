@@ -16,6 +16,7 @@ import functools
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import six
 
@@ -87,12 +88,19 @@ class EngineService(service.Service):
         environment.initialize()
 
     def init_tgm(self):
-        self.TG = scheduler.ThreadGroupManager()
+        self.TG = scheduler.ThreadGroupManager(self.engine_id)
 
     def start(self):
         self.engine_id = senlin_lock.BaseLock.generate_engine_id()
         self.init_tgm()
 
+        # Register this engine before it starts taking any action
+        self.heartbeat()
+        self.TG.add_timer(cfg.CONF.heartbeat_interval, self.heartbeat)
+        if cfg.CONF.purge_interval > 0:
+            self.TG.add_timer(cfg.CONF.purge_interval, self.purge,
+                              initial_delay=cfg.CONF.purge_interval)
+
         # create a dispatcher greenthread for this engine.
         self.dispatcher = dispatcher.Dispatcher(self,
                                                 self.dispatcher_topic,
@@ -140,14 +148,94 @@ class EngineService(service.Service):
         self.health_mgr.stop()
 
         self.TG.stop()
+        # Write out the events buffered by the actions just stopped
+        event_mod.flush()
+        # The actions just stopped are failed and their locks released
+        # along with the engine, so that their clusters are not left locked
+        cluster_ids = db_api.engine_delete(context.get_admin_context(),
+                                           self.engine_id,
+                                           scheduler.wallclock())
+        for cluster_id in cluster_ids:
+            senlin_lock.cluster_lock_handoff(cluster_id)
         # Terminate the engine process
         LOG.info(_LI("All threads were gone, terminating engine"))
         super(EngineService, self).stop()
 
+    def heartbeat(self):
+        '''Record a heartbeat and clean up after the dead engines.'''
+        ctx = context.get_admin_context()
+        try:
+            db_api.engine_heartbeat(ctx, self.engine_id, self.host,
+                                    timeutils.utcnow())
+            self._reap_engines(ctx)
+        except Exception as ex:
+            LOG.error(_LE('Failed recording heartbeat of engine %(id)s: '
+                          '%(ex)s'), {'id': self.engine_id,
+                                      'ex': six.text_type(ex)})
+
+    def purge(self):
+        '''Remove expired events and soft-deleted records from database.'''
+        ctx = context.get_admin_context()
+        try:
+            events = db_api.event_prune(ctx)
+            if cfg.CONF.event_retention_days > 0:
+                events += db_api.event_purge(ctx,
+                                             cfg.CONF.event_retention_days)
+            if cfg.CONF.event_archive_retention_days > 0:
+                events += db_api.event_purge(
+                    ctx, cfg.CONF.event_archive_retention_days,
+                    archived=True)
+            actions = 0
+            if cfg.CONF.action_retention_hours > 0:
+                actions = db_api.action_compact(
+                    ctx, cfg.CONF.action_retention_hours, 'hours')
+            deleted = {}
+            if cfg.CONF.deleted_retention_days > 0:
+                deleted = db_api.purge_deleted(
+                    cfg.CONF.deleted_retention_days, context=ctx)
+            LOG.debug('Engine %(id)s purged %(events)s events, moved '
+                      '%(actions)s actions to history and deleted records '
+                      '%(deleted)s', {'id': self.engine_id,
+                                      'events': events,
+                                      'actions': actions,
+                                      'deleted': deleted})
+        except Exception as ex:
+            LOG.error(_LE('Failed purging database by engine %(id)s: '
+                          '%(ex)s'), {'id': self.engine_id,
+                                      'ex': six.text_type(ex)})
+
+    def _reap_engines(self, ctx):
+        expiry = senlin_lock.engine_expiry()
+        for engine in db_api.engine_get_all(ctx):
+            if engine.id == self.engine_id or engine.updated_time >= expiry:
+                continue
+
+            # Only one of the engines racing for it gets the cluster IDs
+            cluster_ids = db_api.engine_gc(ctx, engine.id, expiry,
+                                           scheduler.wallclock())
+            if cluster_ids is None:
+                continue
+
+            LOG.info(_LI('Engine %(id)s on host %(host)s is dead, its '
+                         'actions have been failed and its locks '
+                         'released.'), {'id': engine.id, 'host': engine.host})
+            for cluster_id in cluster_ids:
+                senlin_lock.cluster_lock_handoff(cluster_id)
+
     @request_context
     def get_revision(self, context):
         return cfg.CONF.revision['senlin_engine_revision']
 
+    @request_context
+    def get_stats(self, context):
+        '''Get the action scheduling metrics of the engine serving the call.
+
+        :param context: An instance of the request context.
+        :return: A dict containing the stats of the action scheduler, see
+                 ThreadGroupManager.get_stats().
+        '''
+        return self.TG.get_stats()
+
     @request_context
     def profile_type_list(self, context):
         return environment.global_env().get_profile_types()
@@ -437,6 +525,7 @@ class EngineService(service.Service):
                                    name='cluster_create_%s' % cluster.id[:8],
                                    target=cluster.id,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
 
         # Notify Dispatchers that a new action has been ready.
@@ -558,6 +647,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    cause=action_mod.CAUSE_RPC,
                                    inputs={'nodes': found})
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -598,6 +688,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    cause=action_mod.CAUSE_RPC,
                                    inputs={'nodes': found})
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -624,6 +715,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    inputs=inputs,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -649,6 +741,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    inputs=inputs,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -664,6 +757,7 @@ class EngineService(service.Service):
                                    name='cluster_delete_%s' % cluster.id[:8],
                                    target=cluster.id,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -739,6 +833,7 @@ class EngineService(service.Service):
                                    name='node_create_%s' % node.id[:8],
                                    target=node.id,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
 
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
@@ -814,6 +909,7 @@ class EngineService(service.Service):
                                    name='node_delete_%s' % node.id[:8],
                                    target=node.id,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -846,6 +942,7 @@ class EngineService(service.Service):
                                    target=db_node.id,
                                    cause=action_mod.CAUSE_RPC,
                                    inputs={'cluster_id': db_cluster.id})
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -861,6 +958,7 @@ class EngineService(service.Service):
                                    name='node_leave_%s' % db_node.id[:8],
                                    target=db_node.id,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -936,6 +1034,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    inputs=inputs,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -956,6 +1055,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    inputs={'policy_id': db_policy.id},
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -987,6 +1087,7 @@ class EngineService(service.Service):
                                    target=db_cluster.id,
                                    inputs=inputs,
                                    cause=action_mod.CAUSE_RPC)
+        action.status = action.READY
         action.store(context)
         dispatcher.notify(context, self.dispatcher.NEW_ACTION,
                           None, action_id=action.id)
@@ -1067,13 +1168,18 @@ class EngineService(service.Service):
     @request_context
     def event_list(self, context, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, tenant_safe=True,
-                   show_deleted=False):
+                   show_deleted=False, start_time=None, end_time=None):
+        start_time = utils.parse_time_param(consts.PARAM_START_TIME,
+                                            start_time)
+        end_time = utils.parse_time_param(consts.PARAM_END_TIME, end_time)
         all_actions = event_mod.Event.load_all(context, filters=filters,
                                                limit=limit, marker=marker,
                                                sort_keys=sort_keys,
                                                sort_dir=sort_dir,
                                                tenant_safe=tenant_safe,
-                                               show_deleted=show_deleted)
+                                               show_deleted=show_deleted,
+                                               start_time=start_time,
+                                               end_time=end_time)
 
         results = [action.to_dict() for action in all_actions]
         return results
@@ -0,0 +1,166 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+A watcher of the Heat stacks operated by the engine.
+'''
+
+import random
+
+import eventlet
+from eventlet import event
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
+
+from senlin.common.i18n import _LE
+
+LOG = logging.getLogger(__name__)
+
+# Maximum number of stack IDs in the filter of each stack listing, which
+# keeps the request URL short enough.
+STACK_LIST_CHUNK = 50
+
+# Number of polls in a row failing to list the stacks of a client, after
+# which the actions waiting for them are failed with the error, e.g. when
+# the credentials have expired or the endpoint is gone.
+STACK_LIST_MAX_FAILURES = 3
+
+
+class StackWatcher(object):
+    '''Watch the stacks being operated on behalf of all node actions.
+
+    Instead of every node action polling its own stack, the stacks are
+    polled by a single thread listing them in bulk, with one request per
+    Heat client and chunk of stacks. The polling backs off exponentially,
+    with jitter, as long as no stack changes. An action waiting for a stack
+    is woken up when the stack operation is no longer in progress, or with
+    the error if the stacks keep failing to be listed.
+    '''
+
+    def __init__(self):
+        # key -> [client, {stack ID: (action, waiter)}, failed polls in a row]
+        self._groups = {}
+        self._thread = None
+        self._interval = None
+
+    def wait(self, client, key, stack_id, action):
+        '''Wait until a stack operation is no longer in progress.
+
+        :param client: The HeatClient used for polling the stack.
+        :param key: The key of the credentials of the client. Stacks watched
+                    with the same key are listed together.
+        :param stack_id: ID of the stack.
+        :param action: The stack action in progress, e.g. 'CREATE'.
+        :returns: The stack as last listed, or None if it was not found.
+        :raises: The error of listing the stack, if it failed in
+                 STACK_LIST_MAX_FAILURES polls in a row.
+        '''
+        waiter = event.Event()
+        group = self._groups.setdefault(key, [client, {}, 0])
+        group[0] = client
+        group[1][stack_id] = (action, waiter)
+
+        self._interval = cfg.CONF.stack_poll_interval
+        if self._thread is None:
+            self._thread = eventlet.spawn(self._run)
+
+        try:
+            return waiter.wait()
+        finally:
+            # The waiting action may have been cancelled or timed out
+            self._unwatch(key, stack_id, waiter)
+
+    def _unwatch(self, key, stack_id, waiter):
+        group = self._groups.get(key)
+        if group is None:
+            return
+
+        entry = group[1].get(stack_id)
+        if entry is not None and entry[1] is waiter:
+            del group[1][stack_id]
+        if not group[1]:
+            del self._groups[key]
+
+    def _run(self):
+        try:
+            while self._groups:
+                interval = self._interval
+                # Jitter keeps engines from polling Heat in lockstep
+                eventlet.sleep(random.uniform(interval / 2.0, interval))
+                if self.poll():
+                    self._interval = cfg.CONF.stack_poll_interval
+                else:
+                    self._interval = min(self._interval * 2,
+                                         cfg.CONF.stack_poll_max_interval)
+        finally:
+            self._thread = None
+
+    def poll(self):
+        '''List all the stacks watched once and wake up the waiters.
+
+        :returns: True if any waiter was woken up.
+        '''
+        woken = False
+        for key, group in list(self._groups.items()):
+            client, stacks, failures = group
+            failed = False
+            stack_ids = list(stacks)
+            for i in range(0, len(stack_ids), STACK_LIST_CHUNK):
+                chunk = stack_ids[i:i + STACK_LIST_CHUNK]
+                try:
+                    found = dict((s.id, s) for s in
+                                 client.stack_list(id=chunk,
+                                                   show_deleted=True))
+                except Exception as ex:
+                    LOG.error(_LE('Failed listing stacks %(ids)s: %(ex)s'),
+                              {'ids': chunk, 'ex': six.text_type(ex)})
+                    failed = True
+                    if failures + 1 < STACK_LIST_MAX_FAILURES:
+                        continue
+
+                    for stack_id in chunk:
+                        entry = stacks.pop(stack_id, None)
+                        if entry is not None:
+                            entry[1].send_exception(ex)
+                            woken = True
+                    continue
+
+                for stack_id in chunk:
+                    entry = stacks.get(stack_id)
+                    if entry is None:
+                        continue
+
+                    action, waiter = entry
+                    stack = found.get(stack_id)
+                    if (stack is not None and
+                            stack.stack_status == action + '_IN_PROGRESS'):
+                        continue
+
+                    del stacks[stack_id]
+                    waiter.send(stack)
+                    woken = True
+
+            group[2] = failures + 1 if failed else 0
+
+        return woken
+
+
+_watcher = StackWatcher()
+
+
+def wait(client, key, stack_id, action):
+    '''Wait until a stack operation is no longer in progress.
+
+    See StackWatcher.wait for the parameters.
+    '''
+    return _watcher.wait(client, key, stack_id, action)
@@ -11,13 +11,19 @@
 # under the License.
 
 import collections
+import copy
 import datetime
 
+from senlin.common import cache
 from senlin.common import exception
 from senlin.common import schema
 from senlin.db import api as db_api
 from senlin.engine import environment
 
+# Policy objects loaded from the database, keyed by ID and versioned by
+# their revision.
+_cache = cache.VersionedCache()
+
 CHECK_RESULTS = (
     CHECK_OK, CHECK_ERROR
 ) = (
@@ -121,12 +127,37 @@ class Policy(object):
     @classmethod
     def load(cls, context, policy_id=None, policy=None):
         '''Retrieve and reconstruct a policy object from DB.'''
+        if policy is None:
+            version = db_api.policy_get_version(context, policy_id)
+        elif policy.deleted_time is None:
+            policy_id = policy.id
+            version = policy.revision
+        else:
+            version = None
+
+        if version is not None:
+            cached = _cache.get(policy_id, version)
+            if cached is not None:
+                return cached._copy(context)
+
         if policy is None:
             policy = db_api.policy_get(context, policy_id)
             if policy is None:
                 raise exception.PolicyNotFound(policy=policy_id)
 
-        return cls._from_db_record(context, policy)
+        obj = cls._from_db_record(context, policy)
+        if version is None:
+            return obj
+
+        _cache.put(obj.id, version, obj)
+        return obj._copy(context)
+
+    def _copy(self, context):
+        '''Make a copy of a cached policy for use with the given context.'''
+        obj = copy.copy(self)
+        obj.context = context
+        obj.spec_data = schema.Spec(obj.spec_schema, obj.spec, context)
+        return obj
 
     @classmethod
     def load_all(cls, context, limit=None, sort_keys=None, marker=None,
@@ -144,6 +175,7 @@ class Policy(object):
 
     @classmethod
     def delete(cls, context, policy_id):
+        _cache.invalidate(policy_id)
         db_api.policy_delete(context, policy_id)
 
     def store(self, context):
@@ -162,6 +194,7 @@ class Policy(object):
         if self.id is not None:
             self.updated_time = timestamp
             values['updated_time'] = timestamp
+            _cache.invalidate(self.id)
             db_api.policy_update(self.context, self.id, values)
         else:
             self.created_time = timestamp
@@ -116,7 +116,7 @@ class HealthPolicy(base.Policy):
         super(HealthPolicy, self).__init__(type_name, name, kwargs)
 
         self.check_type = self.spec_data[self.DETECTION][self.DETECTION_TYPE]
-        self.interval = self.spec_data[self.DETECTION][self.CHECK_INTERVAL]
+        self.interval = self.spec_data[self.DETECTION][self.DETECTION_INTERVAL]
 
     def attach(self, ctx, cluster, data):
         '''Hook for policy attach.
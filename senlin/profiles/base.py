@@ -10,9 +10,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
 import datetime
 
 from oslo_log import log as logging
+from senlin.common import cache
 from senlin.common import context
 from senlin.common import exception
 from senlin.common import schema
@@ -21,6 +23,11 @@ from senlin.engine import environment
 
 LOG = logging.getLogger(__name__)
 
+# Profile objects loaded from the database, keyed by ID and versioned by
+# their revision. Nodes of a cluster usually share a profile, so it is
+# constructed only once instead of once per node.
+_cache = cache.VersionedCache()
+
 
 class Profile(object):
     '''Base class for profiles.'''
@@ -75,12 +82,31 @@ class Profile(object):
     @classmethod
     def load(cls, context, profile_id=None, profile=None):
         '''Retrieve a profile object from database.'''
+        if profile is None:
+            version = db_api.profile_get_version(context, profile_id)
+        elif profile.deleted_time is None:
+            profile_id = profile.id
+            version = profile.revision
+        else:
+            version = None
+
+        if version is not None:
+            cached = _cache.get(profile_id, version)
+            if cached is not None:
+                return copy.copy(cached)
+
         if profile is None:
             profile = db_api.profile_get(context, profile_id)
             if profile is None:
                 raise exception.ProfileNotFound(profile=profile_id)
 
-        return cls.from_db_record(profile)
+        obj = cls.from_db_record(profile)
+        if version is None:
+            return obj
+
+        _cache.put(obj.id, version, obj)
+        # Callers may modify the object returned, keep the cached one intact
+        return copy.copy(obj)
 
     @classmethod
     def load_all(cls, context, limit=None, sort_keys=None, marker=None,
@@ -98,6 +124,7 @@ class Profile(object):
 
     @classmethod
     def delete(cls, context, profile_id):
+        _cache.invalidate(profile_id)
         db_api.profile_delete(context, profile_id)
 
     def store(self, context):
@@ -116,6 +143,7 @@ class Profile(object):
         if self.id:
             self.updated_time = timestamp
             values['updated_time'] = timestamp
+            _cache.invalidate(self.id)
             db_api.profile_update(self.context, self.id, values)
         else:
             self.created_time = timestamp
@@ -164,6 +192,18 @@ class Profile(object):
         '''For subclass to override.'''
         return NotImplemented
 
+    def do_check_all(self, objs):
+        '''For subclass to override.
+
+        Check the health of a number of objects at once, e.g. with a single
+        request to the service hosting them.
+
+        :returns: A dict mapping the IDs of the objects to the results of
+                  their checks, or NotImplemented if the objects can only be
+                  checked one by one.
+        '''
+        return NotImplemented
+
     def to_dict(self):
         pb_dict = {
             'id': self.id,
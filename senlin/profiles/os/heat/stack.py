@@ -18,8 +18,9 @@ from senlin.common import context
 from senlin.common import exception
 from senlin.common.i18n import _
 from senlin.common import schema
+from senlin.common import sdk
 from senlin.drivers import heat_v1 as heatclient
-from senlin.engine import scheduler
+from senlin.engine import stack_watcher
 from senlin.profiles import base
 
 LOG = logging.getLogger(__name__)
@@ -117,25 +118,32 @@ class StackProfile(base.Profile):
 
         return True
 
-    def _check_action_complete(self, obj, action):
-        stack = self.heat().stack_get(id=self.stack_id)
+    def _wait_for_action(self, obj, action):
+        '''Wait for a stack action to complete.
+
+        :returns: True if the action completed, otherwise an exception is
+                  raised.
+        '''
+        ctx = self.context
+        key = (self.id, ctx.user_id, ctx.project_id or ctx.tenant_id,
+               ctx.region_name)
+        stack = stack_watcher.wait(self.heat(), key, self.stack_id, action)
+        if stack is None:
+            if action == 'DELETE':
+                return True
+            raise exception.NodeStatusError(
+                status='NOT_FOUND',
+                reason=_('Stack %s not found') % self.stack_id)
+
         status = stack.stack_status.split('_', 1)
 
         if status[0] == action:
-            if status[1] == 'IN_PROGRESS':
-                return False
-
             if status[1] == 'COMPLETE':
                 return True
 
-            if status[1] == 'FAILED':
-                raise exception.NodeStatusError(
-                    status=stack.stack_status,
-                    reason=stack.stack_status_reason)
-            else:
-                raise exception.NodeStatusError(
-                    status=stack.stack_status,
-                    reason=stack.stack_status_reason)
+            raise exception.NodeStatusError(
+                status=stack.stack_status,
+                reason=stack.stack_status_reason)
         else:
             msg = _('Node action mismatch detected: expected=%(expected)s '
                     'actual=%(actual)s') % dict(expected=action,
@@ -161,8 +169,7 @@ class StackProfile(base.Profile):
         self.stack_id = stack.id
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'CREATE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'CREATE')
 
         return stack.id
 
@@ -175,8 +182,7 @@ class StackProfile(base.Profile):
             raise ex
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'DELETE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'DELETE')
 
         return True
 
@@ -206,15 +212,41 @@ class StackProfile(base.Profile):
         self.heat().stack_update(**fields)
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'UPDATE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'UPDATE')
 
         return True
 
+    @staticmethod
+    def _is_healthy(stack):
+        if stack is None:
+            return False
+        status = stack.stack_status
+        return not (status.startswith('DELETE') or status.endswith('FAILED'))
+
     def do_check(self, obj):
-        #TODO(anyone):
-        #Use heat client to query stack status
-        return True
+        if not obj.physical_id:
+            return False
+
+        try:
+            stack = self.heat().stack_get(id=obj.physical_id)
+        except sdk.exc.HttpException as ex:
+            sdk.ignore_not_found(ex)
+            return False
+
+        return self._is_healthy(stack)
+
+    def do_check_all(self, objs):
+        '''Check the stacks of a number of nodes with a few stack lists.'''
+        stack_ids = list(set(obj.physical_id for obj in objs
+                             if obj.physical_id))
+        stacks = {}
+        for i in range(0, len(stack_ids), stack_watcher.STACK_LIST_CHUNK):
+            chunk = stack_ids[i:i + stack_watcher.STACK_LIST_CHUNK]
+            for stack in self.heat().stack_list(id=chunk):
+                stacks[stack.id] = stack
+
+        return dict((obj.id, self._is_healthy(stacks.get(obj.physical_id)))
+                    for obj in objs)
 
     def get_template(self):
         return {}
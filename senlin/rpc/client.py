@@ -313,13 +313,15 @@ class EngineClient(object):
 
     def event_list(self, ctxt, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, tenant_safe=True,
-                   show_deleted=False):
+                   show_deleted=False, start_time=None, end_time=None):
         return self.call(ctxt,
                          self.make_msg('event_list', filters=filters,
                                        limit=limit, marker=marker,
                                        sort_keys=sort_keys, sort_dir=sort_dir,
                                        tenant_safe=tenant_safe,
-                                       show_deleted=show_deleted))
+                                       show_deleted=show_deleted,
+                                       start_time=start_time,
+                                       end_time=end_time))
 
     def event_get(self, ctxt, identity):
         return self.call(ctxt,
@@ -327,3 +329,6 @@ class EngineClient(object):
 
     def get_revision(self, ctxt):
         return self.call(ctxt, self.make_msg('get_revision'))
+
+    def get_stats(self, ctxt):
+        return self.call(ctxt, self.make_msg('get_stats'))
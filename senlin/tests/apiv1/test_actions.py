@@ -67,7 +67,7 @@ class ActionControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         result = self.controller.index(req, tenant_id=self.tenant)
 
-        default_args = {'limit': None, 'marker': None, 'sort_keys': None,
+        default_args = {'limit': 500, 'marker': None, 'sort_keys': None,
                         'sort_dir': None, 'filters': None,
                         'show_deleted': False}
 
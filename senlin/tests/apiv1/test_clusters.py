@@ -103,12 +103,35 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
         expected = {u'clusters': engine_resp}
         self.assertEqual(expected, result)
 
-        default_args = {'limit': None, 'sort_keys': None, 'marker': None,
+        default_args = {'limit': 500, 'sort_keys': None, 'marker': None,
                         'sort_dir': None, 'filters': None, 'tenant_safe': True,
                         'show_deleted': False, 'show_nested': False}
         mock_call.assert_called_once_with(
             req.context, ('cluster_list', default_args))
 
+    @mock.patch.object(rpc_client.EngineClient, 'call')
+    def test_index_next_link(self, mock_call, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True,
+                                 expected_request_count=2)
+        params = {'limit': '2', 'marker': 'c0', 'status': 'ACTIVE'}
+        req = self._get('/clusters', params=params)
+        mock_call.return_value = [{'id': 'c1'}, {'id': 'c2'}]
+
+        result = self.controller.index(req, tenant_id=self.tenant)
+
+        links = result['clusters_links']
+        self.assertEqual(1, len(links))
+        self.assertEqual('next', links[0]['rel'])
+        self.assertIn('marker=c2', links[0]['href'])
+        self.assertNotIn('marker=c0', links[0]['href'])
+        self.assertIn('limit=2', links[0]['href'])
+        self.assertIn('status=ACTIVE', links[0]['href'])
+
+        # No link is returned with the last page
+        mock_call.return_value = [{'id': 'c1'}]
+        result = self.controller.index(req, tenant_id=self.tenant)
+        self.assertNotIn('clusters_links', result)
+
     @mock.patch.object(rpc_client.EngineClient, 'call')
     def test_index_whitelists_pagination_params(self, mock_call, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'index', True)
@@ -175,6 +198,7 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_client.cluster_list.assert_called_once_with(mock.ANY,
                                                         filters=mock.ANY,
                                                         tenant_safe=True,
+                                                        limit=500,
                                                         show_deleted=False)
 
     def test_index_show_deleted_true(self, mock_enforce):
@@ -187,6 +211,7 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_client.cluster_list.assert_called_once_with(mock.ANY,
                                                         filters=mock.ANY,
                                                         tenant_safe=True,
+                                                        limit=500,
                                                         show_deleted=True)
 
     def test_index_show_nested_false(self, mock_enforce):
@@ -199,6 +224,7 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_client.cluster_list.assert_called_once_with(mock.ANY,
                                                         filters=mock.ANY,
                                                         tenant_safe=True,
+                                                        limit=500,
                                                         show_nested=False)
 
     def test_index_show_nested_true(self, mock_enforce):
@@ -211,6 +237,7 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_client.cluster_list.assert_called_once_with(mock.ANY,
                                                         filters=mock.ANY,
                                                         tenant_safe=True,
+                                                        limit=500,
                                                         show_nested=True)
 
     @mock.patch.object(rpc_client.EngineClient, 'call')
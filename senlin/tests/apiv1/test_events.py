@@ -11,6 +11,7 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
 import six
 
 from senlin.api.middleware import fault
@@ -63,13 +64,35 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         resp = self.controller.index(req, tenant_id=self.tenant)
 
-        kwargs = {'limit': None, 'marker': None, 'filters': None,
+        kwargs = {'limit': 500, 'marker': None, 'filters': None,
                   'sort_keys': None, 'sort_dir': None,
-                  'tenant_safe': True, 'show_deleted': False}
+                  'tenant_safe': True, 'show_deleted': False,
+                  'start_time': None, 'end_time': None}
         mock_call.assert_called_once_with(req.context,
                                           ('event_list', kwargs))
         self.assertEqual(resp, {'events': engine_resp})
 
+    def test_event_index_paged(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        cfg.CONF.set_override('list_page_size', 2, group='senlin_api')
+        req = self._get('/events')
+
+        pages = [[{'id': 'e1'}, {'id': 'e2'}], [{'id': 'e3'}, {'id': 'e4'}],
+                 [{'id': 'e5'}]]
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call',
+                                     side_effect=pages)
+
+        resp = self.controller.index(req, tenant_id=self.tenant)
+
+        # Only the first page is fetched before the response is sent
+        self.assertEqual(1, mock_call.call_count)
+        events = list(resp['events'])
+        self.assertEqual(['e1', 'e2', 'e3', 'e4', 'e5'],
+                         [e['id'] for e in events])
+        self.assertEqual(3, mock_call.call_count)
+        markers = [c[0][1][1]['marker'] for c in mock_call.call_args_list]
+        self.assertEqual([None, 'e2', 'e4'], markers)
+
     def test_event_index_whitelists_params(self, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'index', True)
         params = {
@@ -80,6 +103,8 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
             'filters': 'fake filters',
             'global_tenant': False,
             'show_deleted': False,
+            'start_time': '2015-03-05T08:53:15Z',
+            'end_time': '2015-03-06T08:53:15Z',
             'balrog': 'you shall not pass!'
         }
         req = self._get('/events', params=params)
@@ -92,7 +117,7 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_call_args, w = mock_call.call_args
         engine_args = rpc_call_args[1][1]
 
-        self.assertEqual(7, len(engine_args))
+        self.assertEqual(9, len(engine_args))
         self.assertIn('limit', engine_args)
         self.assertIn('marker', engine_args)
         self.assertIn('sort_keys', engine_args)
@@ -100,6 +125,8 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
         self.assertIn('filters', engine_args)
         self.assertIn('tenant_safe', engine_args)
         self.assertIn('show_deleted', engine_args)
+        self.assertIn('start_time', engine_args)
+        self.assertIn('end_time', engine_args)
         self.assertNotIn('balrog', engine_args)
 
     def test_event_index_global_tenant_true(self, mock_enforce):
@@ -156,6 +183,20 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
                          six.text_type(ex))
         self.assertFalse(mock_call.called)
 
+    def test_event_index_time_not_valid(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        params = {'start_time': 'yesterday'}
+        req = self._get('/events', params=params)
+
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call')
+        ex = self.assertRaises(senlin_exc.InvalidParameter,
+                               self.controller.index, req,
+                               tenant_id=self.tenant)
+
+        self.assertEqual("Invalid value 'yesterday' specified for "
+                         "'start_time'", six.text_type(ex))
+        self.assertFalse(mock_call.called)
+
     def test_event_index_whitelist_filter_params(self, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'index', True)
         params = {
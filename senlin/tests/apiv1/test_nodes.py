@@ -97,7 +97,7 @@ class NodeControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         result = self.controller.index(req, tenant_id=self.tenant)
 
-        default_args = {'cluster_id': None, 'limit': None, 'marker': None,
+        default_args = {'cluster_id': None, 'limit': 500, 'marker': None,
                         'sort_keys': None, 'sort_dir': None, 'filters': None,
                         'tenant_safe': True, 'show_deleted': False}
 
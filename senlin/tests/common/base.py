@@ -22,6 +22,7 @@ import testscenarios
 import testtools
 
 from senlin.common import messaging
+from senlin.engine import event
 from senlin.engine import scheduler
 # from senlin.tests.common import fakes
 from senlin.tests.common import utils
@@ -85,6 +86,15 @@ class SenlinTestCase(testscenarios.WithScenarios,
         utils.setup_dummy_db()
         self.addCleanup(utils.reset_dummy_db)
 
+        def drop_events():
+            # Events not written yet belong to this test only
+            del event._pending[:]
+            if event._flusher is not None:
+                event._flusher.kill()
+                event._flusher = None
+
+        self.addCleanup(drop_events)
+
     def stub_wallclock(self):
         """
         Overrides scheduler wallclock to speed up tests expecting timeouts.
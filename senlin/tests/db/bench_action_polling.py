@@ -0,0 +1,81 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Micro-benchmark of the DB calls used for polling running actions.
+
+Each call is timed twice: loading the whole action row with its JSON
+columns, which is what the engine used to do, and using the projection
+query that replaced it. Run it with:
+
+    python -m senlin.tests.db.bench_action_polling
+'''
+
+import time
+
+from sqlalchemy import orm
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import models
+from senlin.tests.common import utils
+
+REPEAT = 1000
+
+
+def _full_row(ctx, action_id):
+    return db_api.model_query(ctx, models.Action).\
+        options(orm.undefer_group('blobs')).get(action_id)
+
+
+def _measure(ctx, call):
+    '''Return the mean latency of a call in microseconds.'''
+    start = time.time()
+    for i in range(REPEAT):
+        ctx.session.expunge_all()
+        call()
+    return (time.time() - start) * 1000000.0 / REPEAT
+
+
+def main():
+    utils.setup_dummy_db()
+    ctx = utils.dummy_context()
+
+    # A realistic action carries the request context and sizable inputs
+    inputs = dict(('key_%d' % i, 'value_%d' % i) for i in range(200))
+    action = db_api.action_create(ctx, {
+        'name': 'bench', 'target': 'cluster', 'action': 'CLUSTER_SCALE_OUT',
+        'status': 'RUNNING', 'owner': 'engine', 'context': ctx.to_dict(),
+        'inputs': inputs, 'outputs': inputs})
+    ids = [action.id]
+
+    calls = [
+        ('status', lambda: _full_row(ctx, action.id).status,
+         lambda: db_api.action_get_status(ctx, ids)[action.id]),
+        ('control', lambda: _full_row(ctx, action.id).control,
+         lambda: db_api.action_get_control(ctx, action.id)),
+        ('owner', lambda: _full_row(ctx, action.id).owner,
+         lambda: db_api.action_lock_check(ctx, action.id)),
+    ]
+
+    print('%-10s %16s %16s %9s' % ('Polled', 'full row (us)',
+                                   'projection (us)', 'speedup'))
+    for name, before, after in calls:
+        before_us = _measure(ctx, before)
+        after_us = _measure(ctx, after)
+        print('%-10s %16.1f %16.1f %8.1fx' % (name, before_us, after_us,
+                                              before_us / after_us))
+
+    utils.reset_dummy_db()
+
+
+if __name__ == '__main__':
+    main()
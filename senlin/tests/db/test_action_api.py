@@ -10,10 +10,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 import time
 
+import mock
+
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import types
 from senlin.engine import parser
 from senlin.tests.common import base
 from senlin.tests.common import utils
@@ -46,6 +50,52 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(10, action.inputs['max_size'])
         self.assertIsNone(action.outputs)
 
+    def test_action_create_many(self):
+        values = []
+        for name in ['action_001', 'action_002', 'action_003']:
+            data = parser.simple_parse(shared.sample_action)
+            data['name'] = name
+            values.append(data)
+
+        actions = db_api.action_create_many(self.ctx, values)
+
+        self.assertEqual(3, len(actions))
+        for action, data in zip(actions, values):
+            retobj = db_api.action_get(self.ctx, action.id)
+            self.assertEqual(data['name'], retobj.name)
+            self.assertEqual(data['target'], retobj.target)
+            self.assertEqual(data['status'], retobj.status)
+            self.assertEqual(10, retobj.inputs['max_size'])
+
+    def test_action_create_many_with_dependent(self):
+        parent = _create_action(self.ctx, name='action_000')
+        values = []
+        for name in ['action_001', 'action_002']:
+            data = parser.simple_parse(shared.sample_action)
+            data.update({'name': name, 'status': 'READY'})
+            values.append(data)
+
+        actions = db_api.action_create_many(self.ctx, values,
+                                            dependent=parent.id)
+
+        ids = [a.id for a in actions]
+        parent = db_api.action_get(self.ctx, parent.id)
+        self.assertEqual(sorted(ids), sorted(parent.depends_on))
+        self.assertEqual(db_api.ACTION_WAITING, parent.status)
+        for action_id in ids:
+            action = db_api.action_get(self.ctx, action_id)
+            self.assertEqual([parent.id], action.depended_by)
+            self.assertEqual(db_api.ACTION_READY, action.status)
+
+    def test_action_create_many_dependent_not_found(self):
+        data = parser.simple_parse(shared.sample_action)
+        data['name'] = 'action_001'
+
+        self.assertRaises(exception.NotFound, db_api.action_create_many,
+                          self.ctx, [data], dependent='fake-action-id')
+        actions = db_api.action_get_all(self.ctx)
+        self.assertEqual(0, len(actions))
+
     def test_action_get(self):
         data = parser.simple_parse(shared.sample_action)
         action = _create_action(self.ctx)
@@ -62,6 +112,39 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(10, retobj.inputs['max_size'])
         self.assertIsNone(retobj.outputs)
 
+    def test_action_get_status(self):
+        action1 = _create_action(self.ctx, status='READY')
+        action2 = _create_action(self.ctx, status='RUNNING')
+
+        res = db_api.action_get_status(self.ctx, [action1.id, action2.id,
+                                                  'non-existent'])
+        self.assertEqual({action1.id: 'READY', action2.id: 'RUNNING'}, res)
+
+    def test_action_get_control(self):
+        action = _create_action(self.ctx)
+        db_api.action_signal(self.ctx, action.id, 'CANCEL')
+
+        res = db_api.action_get_control(self.ctx, action.id)
+        self.assertEqual('CANCEL', res)
+        res = db_api.action_get_control(self.ctx, 'non-existent')
+        self.assertIsNone(res)
+
+    def test_action_polling_skips_json_columns(self):
+        action = _create_action(self.ctx, owner='worker1')
+        self.ctx.session.expunge_all()
+
+        with mock.patch.object(types.json, 'loads',
+                               wraps=types.json.loads) as m:
+            db_api.action_get_status(self.ctx, [action.id])
+            db_api.action_get_control(self.ctx, action.id)
+            db_api.action_lock_check(self.ctx, action.id)
+            db_api.action_get_all_by_owner(self.ctx, 'worker1')
+            self.assertEqual(0, m.call_count)
+
+            self.ctx.session.expunge_all()
+            db_api.action_get(self.ctx, action.id)
+            self.assertNotEqual(0, m.call_count)
+
     def test_action_get_1st_ready(self):
         specs = [
             {'name': 'action_001', 'status': 'INIT'},
@@ -156,7 +239,7 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertIn(id_of['action_002'], l)
         self.assertIn(id_of['action_003'], l)
         self.assertIn(id_of['action_004'], l)
-        self.assertIsNone(action.depends_on)
+        self.assertEqual([], action.depends_on)
 
         for id in [id_of['action_002'],
                    id_of['action_003'],
@@ -165,7 +248,7 @@ class DBAPIActionTest(base.SenlinTestCase):
             l = action.depends_on
             self.assertEqual(1, len(l))
             self.assertIn(id_of['action_001'], l)
-            self.assertIsNone(action.depended_by)
+            self.assertEqual([], action.depended_by)
             self.assertEqual(action.status, db_api.ACTION_WAITING)
         return id_of
 
@@ -196,7 +279,7 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertIn(id_of['action_002'], l)
         self.assertIn(id_of['action_003'], l)
         self.assertIn(id_of['action_004'], l)
-        self.assertIsNone(action.depended_by)
+        self.assertEqual([], action.depended_by)
         self.assertEqual(action.status, db_api.ACTION_WAITING)
 
         for id in [id_of['action_002'],
@@ -206,7 +289,7 @@ class DBAPIActionTest(base.SenlinTestCase):
             l = action.depended_by
             self.assertEqual(1, len(l))
             self.assertIn(id_of['action_001'], l)
-            self.assertIsNone(action.depends_on)
+            self.assertEqual([], action.depends_on)
         return id_of
 
     def test_action_add_dependency_depended_list(self):
@@ -268,6 +351,23 @@ class DBAPIActionTest(base.SenlinTestCase):
             action = db_api.action_get(self.ctx, id)
             self.assertEqual(0, len(action.depends_on))
 
+    def test_action_mark_succeeded_with_other_dependencies(self):
+        timestamp = time.time()
+        id_of = self._check_action_add_dependency_depended_list()
+        db_api.action_mark_succeeded(self.ctx, id_of['action_002'], timestamp)
+
+        action = db_api.action_get(self.ctx, id_of['action_001'])
+        self.assertEqual(2, len(action.depends_on))
+        self.assertNotIn(id_of['action_002'], action.depends_on)
+        self.assertEqual(db_api.ACTION_WAITING, action.status)
+
+        db_api.action_mark_succeeded(self.ctx, id_of['action_003'], timestamp)
+        db_api.action_mark_succeeded(self.ctx, id_of['action_004'], timestamp)
+
+        action = db_api.action_get(self.ctx, id_of['action_001'])
+        self.assertEqual([], action.depends_on)
+        self.assertEqual(db_api.ACTION_READY, action.status)
+
     def _prepare_action_mark_failed_cancel(self):
         specs = [
             {'name': 'action_001', 'status': 'INIT', 'target': 'cluster_001'},
@@ -313,7 +413,7 @@ class DBAPIActionTest(base.SenlinTestCase):
             l = action.depended_by
             self.assertEqual(1, len(l))
             self.assertIn(id_of['action_001'], l)
-            self.assertIsNone(action.depends_on)
+            self.assertEqual([], action.depends_on)
 
         action = db_api.action_get(self.ctx, id_of['action_001'])
         l = action.depended_by
@@ -329,7 +429,7 @@ class DBAPIActionTest(base.SenlinTestCase):
             l = action.depends_on
             self.assertEqual(1, len(l))
             self.assertIn(id_of['action_001'], l)
-            self.assertIsNone(action.depended_by)
+            self.assertEqual([], action.depended_by)
             self.assertEqual(db_api.ACTION_WAITING, action.status)
 
         return id_of
@@ -386,6 +486,108 @@ class DBAPIActionTest(base.SenlinTestCase):
                                        timestamp)
         self.assertIsNone(action)
 
+    def test_action_acquire_completed(self):
+        action = _create_action(self.ctx, status='SUCCEEDED')
+        timestamp = time.time()
+        action = db_api.action_acquire(self.ctx, action.id, 'worker1',
+                                       timestamp)
+        self.assertIsNone(action)
+
+    def test_action_acquire_1st_ready(self):
+        specs = [
+            {'name': 'action_001', 'status': 'INIT'},
+            {'name': 'action_002', 'status': 'READY'},
+            {'name': 'action_003', 'status': 'READY', 'owner': 'worker2'},
+            {'name': 'action_004', 'status': 'SUCCEEDED'},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, action=shared.sample_action, **spec)
+
+        timestamp = time.time()
+        action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                 timestamp)
+        self.assertEqual('action_002', action.name)
+        self.assertEqual('worker1', action.owner)
+        self.assertEqual(db_api.ACTION_RUNNING, action.status)
+        self.assertEqual(timestamp, action.start_time)
+
+        action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                 timestamp)
+        self.assertIsNone(action)
+
+    def test_action_acquire_1st_ready_no_double_claim(self):
+        for i in range(5):
+            _create_action(self.ctx, name='action_%03d' % i, status='READY')
+
+        timestamp = time.time()
+        claimed = []
+        for worker in ['worker1', 'worker2'] * 3:
+            action = db_api.action_acquire_1st_ready(self.ctx, worker,
+                                                     timestamp)
+            claimed.append(action and action.id)
+
+        self.assertIsNone(claimed[-1])
+        self.assertEqual(5, len(set(claimed[:-1])))
+
+    def test_action_acquire_1st_ready_derived(self):
+        derived = db_api.ACTION_CAUSE_DERIVED
+        _create_action(self.ctx, name='action_001', status='READY',
+                       cause=derived)
+        _create_action(self.ctx, name='action_002', status='READY')
+
+        timestamp = time.time()
+        action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                 timestamp)
+        self.assertEqual('action_002', action.name)
+        action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                 timestamp)
+        self.assertIsNone(action)
+
+        action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                 timestamp, derived=True)
+        self.assertEqual('action_001', action.name)
+
+    def test_action_acquire_1st_ready_derived_fairness(self):
+        derived = db_api.ACTION_CAUSE_DERIVED
+        big = _create_action(self.ctx, name='big', status='RUNNING',
+                             owner='worker1')
+        small = _create_action(self.ctx, name='small', status='RUNNING',
+                               owner='worker1')
+        children = []
+        for i in range(4):
+            children.append(_create_action(
+                self.ctx, name='big_%s' % i, status='READY', cause=derived,
+                created_time=datetime.datetime(2015, 1, 1, 0, 0, i)))
+        children.append(_create_action(
+            self.ctx, name='small_0', status='READY', cause=derived,
+            created_time=datetime.datetime(2015, 1, 1, 0, 1, 0)))
+        db_api.action_add_dependency(self.ctx, [c.id for c in children[:4]],
+                                     big.id)
+        db_api.action_add_dependency(self.ctx, children[4].id, small.id)
+
+        timestamp = time.time()
+        names = []
+        for i in range(2):
+            action = db_api.action_acquire_1st_ready(self.ctx, 'worker1',
+                                                     timestamp, derived=True)
+            names.append(action.name)
+
+        # The small cluster gets its turn after one action of the big one
+        self.assertEqual('big_0', names[0])
+        self.assertEqual('small_0', names[1])
+
+    def test_action_count_ready(self):
+        specs = [
+            {'name': 'action_001', 'status': 'READY'},
+            {'name': 'action_002', 'status': 'READY', 'owner': 'worker1'},
+            {'name': 'action_003', 'status': 'RUNNING'},
+            {'name': 'action_004', 'status': 'READY'},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, action=shared.sample_action, **spec)
+
+        self.assertEqual(2, db_api.action_count_ready(self.ctx))
+
     def test_action_delete(self):
         action = _create_action(self.ctx)
         self.assertIsNotNone(action)
@@ -394,3 +596,67 @@ class DBAPIActionTest(base.SenlinTestCase):
 
         self.assertRaises(exception.NotFound, db_api.action_get,
                           self.ctx, action_id)
+
+    def test_action_compact(self):
+        now = time.time()
+        running = _create_action(self.ctx, name='A05', status='RUNNING')
+        specs = [
+            {'name': 'A01', 'status': 'SUCCEEDED', 'end_time': now - 7200},
+            # A dependency is left behind by the failed action
+            {'name': 'A02', 'status': 'FAILED', 'end_time': now - 7200,
+             'depends_on': [running.id]},
+            {'name': 'A03', 'status': 'CANCELLED', 'end_time': now - 7200},
+            {'name': 'A04', 'status': 'SUCCEEDED', 'end_time': now - 60},
+        ]
+        ids = [_create_action(self.ctx, **spec).id for spec in specs]
+        ids.append(running.id)
+
+        self.assertEqual(3, db_api.action_compact(self.ctx, 1, 'hours'))
+
+        # Check with a new session, the old one still has the objects
+        ctx = utils.dummy_context()
+        self.assertEqual([], db_api.action_get(ctx, ids[4]).depended_by)
+
+        history = db_api.action_history_get_all(ctx, target='cluster_001')
+        self.assertEqual(['A01', 'A02', 'A03'],
+                         sorted(h.name for h in history))
+        self.assertEqual({}, history[0].inputs)
+        self.assertEqual(now - 7200, history[0].end_time)
+
+        # The compacted actions can still be found
+        action = db_api.action_get(ctx, ids[1])
+        self.assertEqual('A02', action.name)
+        self.assertEqual('FAILED', action.status)
+        self.assertEqual([], action.depends_on)
+        self.assertEqual(ids[0], db_api.action_get_by_name(ctx, 'A01').id)
+        self.assertEqual(ids[2],
+                         db_api.action_get_by_short_id(ctx, ids[2][:8]).id)
+
+        actions = db_api.action_get_all(ctx, sort_keys=['name'])
+        self.assertEqual(['A01', 'A02', 'A03', 'A04', 'A05'],
+                         [a.name for a in actions])
+        actions = db_api.action_get_all(ctx, sort_keys=['name'],
+                                        sort_dir='desc', limit=2,
+                                        marker=ids[3])
+        self.assertEqual(['A03', 'A02'], [a.name for a in actions])
+        actions = db_api.action_get_all(ctx, filters={'status': 'FAILED'})
+        self.assertEqual(['A02'], [a.name for a in actions])
+
+        # The history is left out when filtering on a field it does not keep
+        actions = db_api.action_get_all(ctx, filters={'owner': None})
+        self.assertEqual(['A04', 'A05'], sorted(a.name for a in actions))
+
+        # The history is removed along with the soft-deleted records
+        result = db_api.purge_deleted(3600, 'seconds', context=ctx)
+        self.assertEqual(3, result['action_history'])
+        self.assertEqual([], db_api.action_history_get_all(ctx))
+
+    def test_action_delete_with_dependency(self):
+        id_of = self._check_action_add_dependency_dependent_list()
+        db_api.action_delete(self.ctx, id_of['action_001'])
+
+        for id in [id_of['action_002'],
+                   id_of['action_003'],
+                   id_of['action_004']]:
+            action = db_api.action_get(self.ctx, id)
+            self.assertEqual([], action.depends_on)
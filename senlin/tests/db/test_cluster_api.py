@@ -15,6 +15,7 @@ import mock
 
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import models
 from senlin.tests.common import base
 from senlin.tests.common import utils
 from senlin.tests.db import shared
@@ -503,11 +504,14 @@ class DBAPIClusterTest(base.SenlinTestCase):
         marker = mock.Mock()
 
         mock_query_object = mock.Mock()
-        mock_query_object.get.return_value = 'real_marker'
+        mock_query_object.filter.return_value.first.return_value = \
+            'real_marker'
         mock_query.return_value = mock_query_object
 
-        db_api._paginate_query(self.ctx, query, model, marker=marker)
-        mock_query_object.get.assert_called_once_with(marker)
+        db_api._paginate_query(self.ctx, query, model, marker=marker,
+                               sort_keys=['name'])
+        # Only the sort key columns of the marker row are queried
+        mock_query.assert_called_once_with(self.ctx, model.name, model.id)
         args, _ = mock_paginate_query.call_args
         self.assertIn('real_marker', args)
 
@@ -619,3 +623,42 @@ class DBAPIClusterTest(base.SenlinTestCase):
         # but the policy is not deleted
         result = db_api.policy_get(self.ctx, policy.id)
         self.assertIsNotNone(result)
+
+    def test_purge_deleted(self):
+        old = datetime.datetime.utcnow() - datetime.timedelta(days=10)
+        cluster1 = shared.create_cluster(self.ctx, self.profile,
+                                         deleted_time=old)
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        node1 = shared.create_node(self.ctx, cluster1, self.profile,
+                                   deleted_time=old)
+        node2 = shared.create_node(self.ctx, cluster2, self.profile,
+                                   deleted_time=datetime.datetime.utcnow())
+        db_api.event_create(self.ctx, {'timestamp': old,
+                                       'cluster_id': cluster1.id})
+        action2 = shared.create_action(self.ctx, action='action2')
+        action1 = shared.create_action(self.ctx, action='action1',
+                                       deleted_time=old,
+                                       depended_by=[action2.id])
+
+        result = db_api.purge_deleted(5, context=self.ctx)
+
+        self.assertEqual({'action': 1, 'event': 0, 'node': 1, 'cluster': 1,
+                          'action_history': 0}, result)
+        # Check with a new session, the old one still has the objects
+        ctx = utils.dummy_context()
+        self.assertIsNone(db_api.cluster_get(ctx, cluster1.id,
+                                             show_deleted=True))
+        self.assertIsNotNone(db_api.cluster_get(ctx, cluster2.id))
+        self.assertIsNone(db_api.node_get(ctx, node1.id,
+                                          show_deleted=True))
+        self.assertIsNotNone(db_api.node_get(ctx, node2.id,
+                                             show_deleted=True))
+        self.assertEqual(0, db_api.event_count_by_cluster(ctx,
+                                                          cluster1.id))
+        self.assertRaises(exception.NotFound, db_api.action_get,
+                          ctx, action1.id)
+        self.assertIsNotNone(db_api.action_get(ctx, action2.id))
+        query = db_api.model_query(ctx, models.ActionDependency)
+        self.assertEqual(0, query.count())
+
+        self.assertRaises(exception.Error, db_api.purge_deleted, 'bad')
@@ -254,3 +254,23 @@ class DBAPIClusterPolicyTest(base.SenlinTestCase):
         results = db_api.cluster_policy_get_all(self.ctx, self.cluster.id,
                                                 filters=filters)
         self.assertEqual(2, len(results))
+
+    def test_policy_get_by_type(self):
+        spec = {'detection': {'type': 'NODE_STATUS_POLLING'}}
+        health = self.create_policy(type='HealthPolicy', spec=spec)
+        scaling = self.create_policy()
+        disabled = self.create_policy(type='HealthPolicy')
+        db_api.cluster_policy_attach(self.ctx, self.cluster.id, health.id,
+                                     {'enabled': True})
+        db_api.cluster_policy_attach(self.ctx, self.cluster.id, scaling.id,
+                                     {'enabled': True})
+        db_api.cluster_policy_attach(self.ctx, self.cluster.id, disabled.id,
+                                     {'enabled': False})
+
+        results = db_api.cluster_policy_get_by_type(self.ctx, 'HealthPolicy')
+        self.assertEqual([(self.cluster.id, spec)],
+                         [tuple(r) for r in results])
+
+        db_api.cluster_delete(self.ctx, self.cluster.id)
+        results = db_api.cluster_policy_get_by_type(self.ctx, 'HealthPolicy')
+        self.assertEqual([], results)
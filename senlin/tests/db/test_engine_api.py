@@ -0,0 +1,121 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+from oslo_utils import timeutils
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.tests.common import base
+from senlin.tests.common import utils
+from senlin.tests.db import shared
+
+UUID1 = shared.UUID1
+UUID2 = shared.UUID2
+
+
+class DBAPIEngineTest(base.SenlinTestCase):
+    def setUp(self):
+        super(DBAPIEngineTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.now = timeutils.utcnow()
+        self.past = self.now - datetime.timedelta(seconds=60)
+
+    def test_engine_heartbeat(self):
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.past)
+        engine = db_api.engine_get(self.ctx, 'engine-1')
+        self.assertEqual('host1', engine.host)
+        self.assertEqual(self.past, engine.created_time)
+        self.assertEqual(self.past, engine.updated_time)
+
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.now)
+        engine = db_api.engine_get(self.ctx, 'engine-1')
+        engine.refresh()
+        self.assertEqual(self.past, engine.created_time)
+        self.assertEqual(self.now, engine.updated_time)
+
+    def test_engine_delete(self):
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.now)
+        db_api.engine_heartbeat(self.ctx, 'engine-2', 'host2', self.now)
+        res = db_api.engine_delete(self.ctx, 'engine-1', 1234)
+        self.assertEqual([], res)
+
+        engines = db_api.engine_get_all(self.ctx)
+        self.assertEqual(['engine-2'], [e.id for e in engines])
+
+    def test_engine_delete_releases_locks(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        node = shared.create_node(self.ctx, cluster, profile)
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.now)
+
+        stopped = shared.create_action(self.ctx, owner='engine-1',
+                                       status='RUNNING')
+        db_api.cluster_lock_acquire(cluster.id, stopped.id, -1)
+        db_api.node_lock_acquire(node.id, stopped.id)
+
+        res = db_api.engine_delete(self.ctx, 'engine-1', 1234)
+        self.assertEqual([cluster.id], res)
+        self.assertIsNone(db_api.engine_get(self.ctx, 'engine-1'))
+
+        action = db_api.action_get(self.ctx, stopped.id)
+        self.assertEqual('FAILED', action.status)
+        self.assertIsNone(action.owner)
+        observed = db_api.cluster_lock_acquire(cluster.id, UUID1, -1)
+        self.assertEqual([UUID1], observed)
+        observed = db_api.node_lock_acquire(node.id, UUID2)
+        self.assertEqual(UUID2, observed)
+
+    def test_engine_gc_alive(self):
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.now)
+
+        res = db_api.engine_gc(self.ctx, 'engine-1', self.past, 1234)
+        self.assertIsNone(res)
+        self.assertIsNotNone(db_api.engine_get(self.ctx, 'engine-1'))
+
+    def test_engine_gc_dead(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        node = shared.create_node(self.ctx, cluster, profile)
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host1', self.past)
+
+        dead = shared.create_action(self.ctx, owner='engine-1',
+                                    status='RUNNING')
+        alive = shared.create_action(self.ctx, owner='engine-2',
+                                     status='RUNNING')
+        parent = shared.create_action(self.ctx, owner='engine-2',
+                                      status='RUNNING')
+        db_api.action_add_dependency(self.ctx, dead.id, parent.id)
+        db_api.cluster_lock_acquire(cluster.id, dead.id, 1)
+        db_api.cluster_lock_acquire(cluster.id, alive.id, 1)
+        db_api.node_lock_acquire(node.id, dead.id)
+
+        res = db_api.engine_gc(self.ctx, 'engine-1', self.now, 1234)
+        self.assertEqual([cluster.id], res)
+        self.assertIsNone(db_api.engine_get(self.ctx, 'engine-1'))
+
+        action = db_api.action_get(self.ctx, dead.id)
+        self.assertEqual('FAILED', action.status)
+        self.assertIsNone(action.owner)
+        self.assertEqual(1234, action.end_time)
+        action = db_api.action_get(self.ctx, parent.id)
+        self.assertEqual('FAILED', action.status)
+        action = db_api.action_get(self.ctx, alive.id)
+        self.assertEqual('RUNNING', action.status)
+
+        observed = db_api.cluster_lock_acquire(cluster.id, UUID1, 1)
+        self.assertEqual(set([alive.id, UUID1]), set(observed))
+        observed = db_api.node_lock_acquire(node.id, UUID2)
+        self.assertEqual(UUID2, observed)
+
+        res = db_api.engine_gc(self.ctx, 'engine-1', self.now, 1234)
+        self.assertIsNone(res)
@@ -13,6 +13,9 @@
 import datetime
 import logging
 
+from oslo_config import cfg
+
+from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
 from senlin.tests.common import base
 from senlin.tests.common import utils
@@ -67,6 +70,24 @@ class DBAPIEventTest(base.SenlinTestCase):
         # Make sure all fields can be customized
         return db_api.event_create(ctx, values)
 
+    def test_event_create_many(self):
+        timestamp = datetime.datetime.utcnow()
+        count = db_api.EVENT_INSERT_ROWS + 1
+        values = [{'timestamp': timestamp, 'level': logging.INFO,
+                   'obj_id': 'obj-%d' % i, 'status_reason': 'x' * 300,
+                   'project': self.ctx.tenant_id} for i in range(count)]
+        values[0]['id'] = 'FAKE_ID'
+
+        ids = db_api.event_create_many(self.ctx, values)
+
+        self.assertEqual(count, len(ids))
+        self.assertEqual('FAKE_ID', ids[0])
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual(count, len(events))
+        event = db_api.event_get(self.ctx, ids[-1])
+        self.assertEqual('obj-%d' % (count - 1), event.obj_id)
+        self.assertEqual(255, len(event.status_reason))
+
     def test_event_create_get(self):
         event = self.create_event(self.ctx)
         ret_event = db_api.event_get(self.ctx, event.id)
@@ -408,3 +429,101 @@ class DBAPIEventTest(base.SenlinTestCase):
                                                  limit=1, marker=marker)
         self.assertEqual(1, len(events))
         self.assertEqual(expected, events[0].id)
+
+    def test_event_prune(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        now = datetime.datetime.utcnow()
+        for i in range(5):
+            self.create_event(self.ctx, entity=cluster1,
+                              timestamp=now + datetime.timedelta(seconds=i))
+        self.create_event(self.ctx, entity=cluster2, timestamp=now)
+        self.create_event(self.ctx, entity=self.profile, timestamp=now)
+        self.create_event(self.ctx, entity=self.profile, timestamp=now)
+
+        cfg.CONF.set_override('max_events_per_cluster', 2)
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        self.assertEqual(3, db_api.event_prune(self.ctx))
+
+        # The newest events are kept
+        events = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
+        self.assertEqual([now + datetime.timedelta(seconds=3),
+                          now + datetime.timedelta(seconds=4)],
+                         [e.timestamp for e in events])
+        self.assertEqual(1, db_api.event_count_by_cluster(self.ctx,
+                                                          cluster2.id))
+        self.assertEqual(0, db_api.event_prune(self.ctx, cluster1.id))
+
+        cfg.CONF.set_override('max_events_per_cluster', 0)
+        self.assertEqual(0, db_api.event_prune(self.ctx, cluster1.id))
+        self.assertEqual(2, db_api.event_count_by_cluster(self.ctx,
+                                                          cluster1.id))
+
+    def test_event_purge(self):
+        now = datetime.datetime.utcnow()
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        for days in (1, 3, 4, 5, 6, 7):
+            self.create_event(self.ctx,
+                              timestamp=now - datetime.timedelta(days=days))
+
+        self.assertEqual(5, db_api.event_purge(self.ctx, 2))
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual(1, len(events))
+
+        self.assertEqual(1, db_api.event_purge(self.ctx, 1, 'hours'))
+        self.assertRaises(exception.Error, db_api.event_purge,
+                          self.ctx, 'bad')
+        self.assertRaises(exception.Error, db_api.event_purge,
+                          self.ctx, -1)
+        self.assertRaises(exception.Error, db_api.event_purge,
+                          self.ctx, 1, 'weeks')
+
+    def test_event_archive(self):
+        now = datetime.datetime.utcnow()
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        event_ids = [self.create_event(self.ctx, status='e%d' % days,
+                                       timestamp=now - datetime.timedelta(
+                                           days=days)).id
+                     for days in (1, 3, 4, 5, 6)]
+        self.assertIsNone(db_api.event_archive_horizon(self.ctx))
+
+        self.assertEqual(4, db_api.event_archive(self.ctx, 2))
+        self.assertEqual(now - datetime.timedelta(days=3),
+                         db_api.event_archive_horizon(self.ctx))
+        self.assertEqual(1, len(db_api.event_get_all(self.ctx)))
+
+        # An archived event can still be found by its ID
+        event = db_api.event_get(self.ctx, event_ids[-1])
+        self.assertEqual('e6', event.status)
+
+        # The archive is read when the time range reaches back to it
+        start = now - datetime.timedelta(days=10)
+        events = db_api.event_get_all(self.ctx, start_time=start)
+        self.assertEqual(['e6', 'e5', 'e4', 'e3', 'e1'],
+                         [e.status for e in events])
+        ids = dict((e.status, e.id) for e in events)
+        events = db_api.event_get_all(self.ctx, start_time=start, limit=2,
+                                      marker=ids['e4'])
+        self.assertEqual(['e3', 'e1'], [e.status for e in events])
+        events = db_api.event_get_all(self.ctx, start_time=start,
+                                      sort_dir='desc', limit=2,
+                                      marker=ids['e1'])
+        self.assertEqual(['e3', 'e4'], [e.status for e in events])
+        events = db_api.event_get_all(self.ctx, start_time=start,
+                                      end_time=now - datetime.timedelta(
+                                          days=4))
+        self.assertEqual(['e6', 'e5'], [e.status for e in events])
+
+        start = now - datetime.timedelta(days=2)
+        events = db_api.event_get_all(self.ctx, start_time=start)
+        self.assertEqual(['e1'], [e.status for e in events])
+
+        # An archived event can be found by its short ID too
+        event = db_api.event_get_by_short_id(self.ctx, event_ids[-1][:8])
+        self.assertEqual('e6', event.status)
+
+        # Archived events are only purged when asked for
+        self.assertEqual(0, db_api.event_purge(self.ctx, 5))
+        self.assertEqual(2, db_api.event_purge(self.ctx, 5, archived=True))
+        self.assertEqual(now - datetime.timedelta(days=3),
+                         db_api.event_archive_horizon(self.ctx))
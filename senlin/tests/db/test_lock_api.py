@@ -173,6 +173,65 @@ class DBAPILockTest(base.SenlinTestCase):
         observed = db_api.cluster_lock_release(self.cluster.id, UUID1, -1)
         self.assertTrue(observed)
 
+    def test_cluster_lock_reacquire(self):
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, -1)
+        self.assertEqual([UUID1], observed)
+
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, -1)
+        self.assertEqual([UUID1], observed)
+
+        observed = db_api.cluster_lock_release(self.cluster.id, UUID1, -1)
+        self.assertTrue(observed)
+
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID2, 1)
+        self.assertEqual([UUID2], observed)
+
+    def test_cluster_lock_queued_cluster_scope_first(self):
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, 1)
+        self.assertEqual([UUID1], observed)
+
+        # A queued cluster-level action blocks new node-level actions
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID2, -1)
+        self.assertEqual([UUID1], observed)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID3, 1)
+        self.assertEqual([UUID1], observed)
+
+        observed = db_api.cluster_lock_handoff(self.cluster.id)
+        self.assertEqual([], observed)
+
+        observed = db_api.cluster_lock_release(self.cluster.id, UUID1, 1)
+        self.assertTrue(observed)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID3, 1)
+        self.assertEqual([], observed)
+
+        observed = db_api.cluster_lock_handoff(self.cluster.id)
+        self.assertEqual([UUID2], observed)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID2, -1)
+        self.assertEqual([UUID2], observed)
+
+        observed = db_api.cluster_lock_release(self.cluster.id, UUID2, -1)
+        self.assertTrue(observed)
+        observed = db_api.cluster_lock_handoff(self.cluster.id)
+        self.assertEqual([UUID3], observed)
+        observed = db_api.cluster_lock_handoff(self.cluster.id)
+        self.assertEqual([], observed)
+
+    def test_cluster_lock_handoff_node_scope(self):
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, -1)
+        self.assertEqual([UUID1], observed)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID2, 1)
+        self.assertEqual([UUID1], observed)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID3, 1)
+        self.assertEqual([UUID1], observed)
+
+        observed = db_api.cluster_lock_release(self.cluster.id, UUID1, -1)
+        self.assertTrue(observed)
+        observed = db_api.cluster_lock_handoff(self.cluster.id)
+        self.assertEqual([UUID2, UUID3], observed)
+
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, 1)
+        self.assertEqual(3, len(observed))
+
     def test_node_lock_acquire_release(self):
         observed = db_api.node_lock_acquire(self.node.id, UUID1)
         self.assertEqual(UUID1, observed)
@@ -55,6 +55,47 @@ class DBAPINodeTest(base.SenlinTestCase):
         cluster = db_api.cluster_get(self.ctx, self.cluster.id)
         self.assertEqual(1, cluster.size)
 
+    def test_node_create_many(self):
+        cluster = db_api.cluster_get(self.ctx, self.cluster.id)
+        next_index = cluster.next_index
+        values = []
+        for i in range(3):
+            values.append({
+                'name': 'test_node_%s' % i,
+                'cluster_id': self.cluster.id,
+                'profile_id': self.profile.id,
+                'project': self.ctx.tenant_id,
+                'index': i,
+                'status': 'INIT',
+                'status_reason': 'a' * 1024,
+            })
+
+        nodes = db_api.node_create_many(self.ctx, values)
+
+        self.assertEqual(3, len(nodes))
+        for i, res in enumerate(nodes):
+            node = db_api.node_get(self.ctx, res.id)
+            self.assertEqual('test_node_%s' % i, node.name)
+            self.assertEqual(i, node.index)
+            self.assertEqual(self.cluster.id, node.cluster_id)
+            self.assertEqual('a' * 255, node.status_reason)
+
+        cluster = db_api.cluster_get(self.ctx, self.cluster.id)
+        self.assertEqual(3, cluster.size)
+        self.assertEqual(next_index + 3, cluster.next_index)
+
+    def test_node_create_many_cluster_not_found(self):
+        values = [{
+            'name': 'test_node',
+            'cluster_id': 'fake-cluster-id',
+            'profile_id': self.profile.id,
+        }]
+
+        self.assertRaises(exception.NotFound, db_api.node_create_many,
+                          self.ctx, values)
+        nodes = db_api.node_get_all(self.ctx)
+        self.assertEqual(0, len(nodes))
+
     def test_node_status_reason_truncate(self):
         node = shared.create_node(self.ctx, self.cluster, self.profile,
                                   status_reason='a' * 1024)
@@ -177,6 +218,26 @@ class DBAPINodeTest(base.SenlinTestCase):
         names = [node.name for node in nodes]
         [self.assertIn(val['name'], names) for val in values]
 
+    def test_node_get_ids_by_clusters(self):
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        for v in ['node1', 'node2', 'node3']:
+            shared.create_node(self.ctx, self.cluster, self.profile, id=v)
+        shared.create_node(self.ctx, None, self.profile, id='node4')
+        db_api.node_delete(self.ctx, 'node2')
+
+        res = db_api.node_get_ids_by_clusters(
+            self.ctx, [self.cluster.id, cluster2.id, 'BOGUS'])
+        self.assertEqual({self.cluster.id: ['node1', 'node3'],
+                          cluster2.id: [],
+                          'BOGUS': []}, res)
+
+        ctx = utils.dummy_context(tenant_id='another_tenant')
+        res = db_api.node_get_ids_by_clusters(ctx, [self.cluster.id])
+        self.assertEqual({self.cluster.id: []}, res)
+        res = db_api.node_get_ids_by_clusters(ctx, [self.cluster.id],
+                                              tenant_safe=False)
+        self.assertEqual({self.cluster.id: ['node1', 'node3']}, res)
+
     def test_node_get_all_show_deleted(self):
         values = [{'id': 'node1'}, {'id': 'node2'}, {'id': 'node3'}]
         for v in values:
@@ -419,6 +480,29 @@ class DBAPINodeTest(base.SenlinTestCase):
         reason = 'Node new_name: Something is wrong'
         self.assertEqual(reason, cluster.status_reason)
 
+    def test_node_update_all(self):
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node3 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   status='UPDATING')
+        values = {'status': 'ERROR', 'status_reason': 'Health check failed'}
+
+        res = db_api.node_update_all(self.ctx,
+                                     [node1.id, node2.id, node3.id],
+                                     values, expected_status='ACTIVE')
+        self.assertEqual(2, res)
+
+        ctx = utils.dummy_context()
+        self.assertEqual('ERROR', db_api.node_get(ctx, node1.id).status)
+        self.assertEqual('ERROR', db_api.node_get(ctx, node2.id).status)
+        self.assertEqual('UPDATING', db_api.node_get(ctx, node3.id).status)
+        cluster = db_api.cluster_get(ctx, self.cluster.id)
+        self.assertEqual('WARNING', cluster.status)
+        self.assertEqual('2 nodes: Health check failed',
+                         cluster.status_reason)
+
+        self.assertEqual(0, db_api.node_update_all(self.ctx, [], values))
+
     def test_node_migrate_from_none(self):
         node_orphan = shared.create_node(self.ctx, None, self.profile)
         timestamp = datetime.datetime.utcnow()
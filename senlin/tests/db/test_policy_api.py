@@ -350,6 +350,20 @@ class DBAPIPolicyTest(base.SenlinTestCase):
         self.assertEqual('new_scaling_policy', new_policy.name)
         self.assertEqual(11, new_policy.cooldown)
 
+    def test_policy_get_version(self):
+        policy = db_api.policy_create(self.ctx, self.new_policy_data())
+        self.assertEqual(0, db_api.policy_get_version(self.ctx, policy.id))
+
+        # Updates within the same second still change the version
+        timestamp = datetime.datetime.utcnow()
+        for name in ('p-1', 'p-2'):
+            db_api.policy_update(self.ctx, policy.id,
+                                 {'name': name, 'updated_time': timestamp})
+        self.assertEqual(2, db_api.policy_get_version(self.ctx, policy.id))
+
+        db_api.policy_delete(self.ctx, policy.id)
+        self.assertIsNone(db_api.policy_get_version(self.ctx, policy.id))
+
     def test_policy_update_not_found(self):
         self.assertRaises(exception.PolicyNotFound,
                           db_api.policy_update,
@@ -45,6 +45,12 @@ class DBAPIProfileTest(base.SenlinTestCase):
         profile = db_api.profile_get(self.ctx, 'BogusProfileID')
         self.assertIsNone(profile)
 
+    def test_profile_get_names(self):
+        p1 = shared.create_profile(self.ctx, name='p-1')
+        p2 = shared.create_profile(self.ctx, name='p-2')
+        res = db_api.profile_get_names(self.ctx, [p1.id, p2.id, 'BOGUS'])
+        self.assertEqual({p1.id: 'p-1', p2.id: 'p-2'}, res)
+
     def test_profile_get_show_deleted(self):
         profile_id = shared.create_profile(self.ctx).id
 
@@ -314,6 +320,20 @@ class DBAPIProfileTest(base.SenlinTestCase):
         self.assertEqual(new_fields['name'], new_profile.name)
         self.assertEqual('test_profile_name_2', new_profile.name)
 
+    def test_profile_get_version(self):
+        profile = shared.create_profile(self.ctx)
+        self.assertEqual(0, db_api.profile_get_version(self.ctx, profile.id))
+
+        # Updates within the same second still change the version
+        timestamp = datetime.datetime.utcnow()
+        for name in ('p-1', 'p-2'):
+            db_api.profile_update(self.ctx, profile.id,
+                                  {'name': name, 'updated_time': timestamp})
+        self.assertEqual(2, db_api.profile_get_version(self.ctx, profile.id))
+
+        db_api.profile_delete(self.ctx, profile.id)
+        self.assertIsNone(db_api.profile_get_version(self.ctx, profile.id))
+
     def test_profile_update_not_found(self):
         self.assertRaises(exception.ProfileNotFound,
                           db_api.profile_update,
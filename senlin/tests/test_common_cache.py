@@ -0,0 +1,156 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import eventlet
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from senlin.common import cache
+from senlin.tests.common import base
+
+
+class VersionedCacheTest(base.SenlinTestCase):
+
+    def test_get_put(self):
+        c = cache.VersionedCache(2)
+        self.assertIsNone(c.get('k1', 1))
+
+        c.put('k1', 1, 'v1')
+        self.assertEqual('v1', c.get('k1', 1))
+        self.assertIsNone(c.get('k1', 2))
+
+        c.put('k1', 2, 'v2')
+        self.assertEqual('v2', c.get('k1', 2))
+        self.assertEqual({'entries': 1, 'hits': 2, 'misses': 2},
+                         c.get_stats())
+
+    def test_evict_least_recently_used(self):
+        c = cache.VersionedCache(2)
+        c.put('k1', 1, 'v1')
+        c.put('k2', 1, 'v2')
+        # k1 is used after k2 was added
+        self.assertEqual('v1', c.get('k1', 1))
+
+        c.put('k3', 1, 'v3')
+        self.assertIsNone(c.get('k2', 1))
+        self.assertEqual('v1', c.get('k1', 1))
+        self.assertEqual('v3', c.get('k3', 1))
+
+    def test_invalidate(self):
+        c = cache.VersionedCache(2)
+        c.put('k1', 1, 'v1')
+        c.invalidate('k1')
+        c.invalidate('k2')
+        self.assertIsNone(c.get('k1', 1))
+
+    def test_size_from_config(self):
+        c = cache.VersionedCache()
+        self.assertEqual(cfg.CONF.object_cache_size, c.size)
+
+        cfg.CONF.set_override('object_cache_size', 0)
+        c.put('k1', 1, 'v1')
+        self.assertIsNone(c.get('k1', 1))
+
+
+class ExpiringCacheTest(base.SenlinTestCase):
+
+    def _loader(self, value, expires_at=None):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return value, expires_at
+
+        return load, calls
+
+    def test_get_loads_once(self):
+        c = cache.ExpiringCache(2, ttl=60)
+        load, calls = self._loader('v1')
+
+        self.assertEqual('v1', c.get('k1', load))
+        self.assertEqual('v1', c.get('k1', load))
+        self.assertEqual(1, len(calls))
+        self.assertEqual({'entries': 1, 'hits': 1, 'misses': 1},
+                         c.get_stats())
+
+    def test_get_reloads_expiring(self):
+        c = cache.ExpiringCache(2, ttl=60)
+        soon = timeutils.utcnow() + datetime.timedelta(seconds=10)
+        load, calls = self._loader('v1', soon)
+
+        c.get('k1', load)
+        # The entry expires within the refresh margin
+        c.get('k1', load)
+        self.assertEqual(2, len(calls))
+
+    def test_get_ttl_disabled(self):
+        c = cache.ExpiringCache(2, ttl=0)
+        load, calls = self._loader('v1')
+
+        c.get('k1', load)
+        c.get('k1', load)
+        self.assertEqual(2, len(calls))
+        self.assertEqual(0, c.get_stats()['entries'])
+
+    def test_ttl_from_config(self):
+        c = cache.ExpiringCache(2)
+        self.assertEqual(cfg.CONF.credential_cache_ttl, c.ttl)
+
+    def test_evict_expiring_first(self):
+        c = cache.ExpiringCache(2, ttl=600)
+        later = timeutils.utcnow() + datetime.timedelta(seconds=300)
+        c.get('k1', self._loader('v1')[0])
+        c.get('k2', self._loader('v2', later)[0])
+        c.get('k3', self._loader('v3')[0])
+
+        load, calls = self._loader('v1')
+        c.get('k1', load)
+        self.assertEqual(0, len(calls))
+        load, calls = self._loader('v2')
+        c.get('k2', load)
+        self.assertEqual(1, len(calls))
+
+    def test_invalidate(self):
+        c = cache.ExpiringCache(2, ttl=60)
+        load, calls = self._loader('v1')
+        c.get('k1', load)
+        c.invalidate('k1')
+        c.invalidate('k2')
+        c.get('k1', load)
+        self.assertEqual(2, len(calls))
+
+    def test_concurrent_get_shares_load(self):
+        c = cache.ExpiringCache(2, ttl=60)
+        calls = []
+
+        def load():
+            calls.append(1)
+            eventlet.sleep(0)
+            return 'v1', None
+
+        threads = [eventlet.spawn(c.get, 'k1', load) for i in range(3)]
+        self.assertEqual(['v1'] * 3, [t.wait() for t in threads])
+        self.assertEqual(1, len(calls))
+
+    def test_concurrent_get_shares_error(self):
+        c = cache.ExpiringCache(2, ttl=60)
+
+        def load():
+            eventlet.sleep(0)
+            raise ValueError('boom')
+
+        threads = [eventlet.spawn(c.get, 'k1', load) for i in range(2)]
+        for t in threads:
+            self.assertRaises(ValueError, t.wait)
+        self.assertEqual(0, c.get_stats()['entries'])
@@ -0,0 +1,57 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from senlin.common import sdk
+from senlin.tests.common import base
+from senlin.tests.common import utils
+
+
+class ConnectionPoolTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ConnectionPoolTest, self).setUp()
+        self.patchobject(sdk, '_pool', new=None)
+        self.mock_conn = self.patchobject(sdk.connection, 'Connection',
+                                          side_effect=lambda **kw: object())
+
+    def test_create_connection_reused(self):
+        ctx = utils.dummy_context()
+        conn = sdk.create_connection(ctx)
+
+        self.assertIs(conn, sdk.create_connection(utils.dummy_context()))
+        self.assertEqual(1, self.mock_conn.call_count)
+        kwargs = self.mock_conn.call_args[1]
+        self.assertEqual(ctx.auth_token, kwargs['token'])
+        self.assertEqual(sdk.USER_AGENT, kwargs['user_agent'])
+
+    def test_create_connection_different_credentials(self):
+        ctx = utils.dummy_context()
+        conn = sdk.create_connection(ctx)
+
+        ctx.auth_token = 'NEW_TOKEN'
+        new_conn = sdk.create_connection(ctx)
+        self.assertIsNot(conn, new_conn)
+        # The new token replaces the connection shared
+        self.assertIs(new_conn, sdk.create_connection(ctx))
+
+        ctx.user_id = 'ANOTHER_USER'
+        self.assertIsNot(new_conn, sdk.create_connection(ctx))
+        self.assertEqual(3, self.mock_conn.call_count)
+
+    def test_create_connection_pool_disabled(self):
+        cfg.CONF.set_override('connection_pool_size', 0)
+        ctx = utils.dummy_context()
+        sdk.create_connection(ctx)
+        sdk.create_connection(ctx)
+        self.assertEqual(2, self.mock_conn.call_count)
@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 import requests
 from requests import exceptions
 import six
@@ -112,6 +113,16 @@ class TestParameterParsing(base.SenlinTestCase):
             self.assertRaises(exception.InvalidParameter,
                               utils.parse_int_param, name, value)
 
+    def test_parse_time(self):
+        name = 'param'
+        expected = datetime.datetime(2015, 3, 5, 8, 53, 15)
+        for value in ('2015-03-05T08:53:15Z', '2015-03-05T09:53:15+01:00'):
+            self.assertEqual(expected, utils.parse_time_param(name, value))
+        self.assertIsNone(utils.parse_time_param(name, None))
+        for value in ('yesterday', '2015-13-05T08:53:15Z', 1):
+            self.assertRaises(exception.InvalidParameter,
+                              utils.parse_time_param, name, value)
+
 
 class Response(object):
     def __init__(self, buf=''):
@@ -194,3 +205,29 @@ class UrlFetchTest(base.SenlinTestCase):
         exception = self.assertRaises(utils.URLFetchError,
                                       utils.url_fetch, url)
         self.assertIn("Data exceeds", six.text_type(exception))
+
+
+class RuntimeDataTest(base.SenlinTestCase):
+
+    def test_lazy_load(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        rt = utils.RuntimeData({'foo': loader})
+        self.assertNotIn('foo', rt)
+        self.assertEqual(1, rt['foo'])
+        self.assertEqual(1, rt.get('foo'))
+        self.assertEqual(1, len(calls))
+        self.assertIsNone(rt.get('bar'))
+        self.assertRaises(KeyError, lambda: rt['bar'])
+
+        rt.invalidate('foo')
+        self.assertEqual(2, rt['foo'])
+
+        rt['bar'] = 'value'
+        rt.invalidate()
+        self.assertEqual({}, dict(rt))
+        self.assertEqual(3, rt['foo'])
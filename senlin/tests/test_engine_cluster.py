@@ -0,0 +1,61 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from senlin.db import api as db_api
+from senlin.engine import dispatcher
+from senlin.engine import environment
+from senlin.engine import node as node_mod
+from senlin.engine import service
+from senlin.profiles import base as profiles_base
+from senlin.tests.common import base
+from senlin.tests.common import utils
+from senlin.tests.db import shared
+from senlin.tests import fakes
+
+
+class ClusterListTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ClusterListTest, self).setUp()
+        self.ctx = utils.dummy_context(tenant_id='cluster_test_tenant')
+        self.eng = service.EngineService('host-a', 'topic-a')
+        self.eng.init_tgm()
+        self.eng.dispatcher = mock.Mock()
+
+        env = environment.global_env()
+        env.register_profile('TestProfile', fakes.TestProfile)
+
+        self.profile = self.eng.profile_create(
+            self.ctx, 'p-test', 'TestProfile',
+            spec={'INT': 10, 'STR': 'string'}, perm='1111')
+
+    @mock.patch.object(dispatcher, 'notify')
+    def test_cluster_list_lazy_runtime_data(self, notify):
+        c1 = self.eng.cluster_create(self.ctx, 'c-1', 0, self.profile['id'])
+        node = shared.create_node(self.ctx,
+                                  db_api.cluster_get(self.ctx, c1['id']),
+                                  db_api.profile_get(self.ctx,
+                                                     self.profile['id']))
+        self.eng.cluster_create(self.ctx, 'c-2', 0, self.profile['id'])
+
+        mock_profile = self.patchobject(profiles_base.Profile, 'load')
+        mock_nodes = self.patchobject(node_mod.Node, 'load_all')
+        result = self.eng.cluster_list(self.ctx)
+
+        self.assertEqual([node.id], result[0]['nodes'])
+        self.assertEqual([], result[1]['nodes'])
+        for c in result:
+            self.assertEqual('p-test', c['profile_name'])
+        self.assertEqual(0, mock_profile.call_count)
+        self.assertEqual(0, mock_nodes.call_count)
@@ -0,0 +1,64 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+
+from senlin.engine import dispatcher
+from senlin.tests.common import base
+from senlin.tests.common import utils
+
+
+class DispatcherNotifyTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(DispatcherNotifyTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.patchobject(dispatcher, '_new_actions', new=[])
+        self.patchobject(dispatcher, '_notifier', new=None)
+        self.mock_cast = self.patchobject(dispatcher, '_cast')
+        self.mock_spawn = self.patchobject(eventlet, 'spawn')
+        self.patchobject(eventlet, 'sleep')
+
+    def test_notify_new_actions_coalesced(self):
+        dispatcher.notify(self.ctx, dispatcher.Dispatcher.NEW_ACTION, None,
+                          action_id='A1')
+        dispatcher.notify(self.ctx, dispatcher.Dispatcher.NEW_ACTIONS, None,
+                          action_ids=['A2', 'A3'])
+
+        self.mock_spawn.assert_called_once_with(
+            dispatcher._flush_new_actions)
+        self.assertEqual(['A1', 'A2', 'A3'], dispatcher._new_actions)
+        self.assertEqual(0, self.mock_cast.call_count)
+
+    def test_flush_new_actions_with_admin_context(self):
+        dispatcher.notify(self.ctx, dispatcher.Dispatcher.NEW_ACTION, None,
+                          action_id='A1')
+
+        dispatcher._flush_new_actions()
+        self.mock_cast.assert_called_once_with(
+            mock.ANY, dispatcher.Dispatcher.NEW_ACTIONS, None,
+            action_ids=['A1'])
+        ctx = self.mock_cast.call_args[0][0]
+        self.assertTrue(ctx.is_admin)
+        self.assertNotEqual(self.ctx.user, ctx.user)
+        self.assertEqual([], dispatcher._new_actions)
+        self.assertIsNone(dispatcher._notifier)
+
+    def test_notify_engine(self):
+        dispatcher.notify(self.ctx, dispatcher.Dispatcher.WAKE_ACTION,
+                          'engine-1', action_id='A1')
+
+        self.mock_cast.assert_called_once_with(
+            self.ctx, dispatcher.Dispatcher.WAKE_ACTION, 'engine-1',
+            action_id='A1')
+        self.assertEqual(0, self.mock_spawn.call_count)
@@ -0,0 +1,89 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+from oslo_config import cfg
+
+from senlin.db import api as db_api
+from senlin.engine import event
+from senlin.tests.common import base
+from senlin.tests.common import utils
+
+
+class Node(object):
+    '''A stub entity the events are about.'''
+
+    def __init__(self, name):
+        self.id = 'ID-%s' % name
+        self.name = name
+        self.cluster_id = None
+        self.status = 'ACTIVE'
+        self.status_reason = 'Fine'
+
+
+class EventWriterTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(EventWriterTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        # The buffer is per process, keep other tests' events out of it
+        self.patchobject(event, '_pending', new=[])
+        self.patchobject(event, '_flusher', new=None)
+        self.addCleanup(self._stop_flusher)
+
+    def _stop_flusher(self):
+        if event._flusher is not None:
+            event._flusher.kill()
+
+    def _count(self):
+        return len(db_api.event_get_all(self.ctx, tenant_safe=False))
+
+    def test_buffered_until_flush(self):
+        event.info(self.ctx, Node('n1'), 'CREATE')
+        event.warning(self.ctx, Node('n2'), 'UPDATE')
+        self.assertEqual(0, self._count())
+        self.assertEqual(2, len(event._pending))
+
+        event.flush()
+        self.assertEqual([], event._pending)
+        self.assertEqual(2, self._count())
+
+    def test_flush_after_interval(self):
+        cfg.CONF.set_override('event_flush_interval', 0)
+        event.info(self.ctx, Node('n1'), 'CREATE')
+        self.assertEqual(0, self._count())
+
+        eventlet.sleep(0.1)
+        self.assertEqual(1, self._count())
+
+    def test_flush_full_batch(self):
+        cfg.CONF.set_override('event_batch_size', 2)
+        cfg.CONF.set_override('event_flush_interval', 60)
+        create_many = self.patchobject(db_api, 'event_create_many')
+
+        event.info(self.ctx, Node('n1'), 'CREATE')
+        event.info(self.ctx, Node('n2'), 'CREATE')
+        eventlet.sleep(0)
+        self.assertEqual(1, create_many.call_count)
+        self.assertEqual(2, len(create_many.call_args[0][1]))
+
+    def test_back_pressure(self):
+        cfg.CONF.set_override('event_queue_size', 2)
+        cfg.CONF.set_override('event_batch_size', 10)
+        cfg.CONF.set_override('event_flush_interval', 60)
+
+        for name in ['n1', 'n2', 'n3']:
+            event.info(self.ctx, Node(name), 'CREATE')
+
+        # The third event had to wait for the first two to be written
+        self.assertEqual(2, self._count())
+        self.assertEqual(1, len(event._pending))
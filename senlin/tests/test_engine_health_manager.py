@@ -0,0 +1,125 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import mock
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from senlin.db import api as db_api
+from senlin.engine import health_manager
+from senlin.tests.common import base
+from senlin.tests.common import utils
+
+
+class HashRingTest(base.SenlinTestCase):
+
+    def test_get_owner(self):
+        ring = health_manager.HashRing(['E1', 'E2', 'E3'])
+        keys = ['cluster-%s' % i for i in range(300)]
+        owners = [ring.get_owner(k) for k in keys]
+
+        self.assertEqual(set(['E1', 'E2', 'E3']), set(owners))
+        # Every engine gets a fair share of the clusters
+        for engine in ('E1', 'E2', 'E3'):
+            self.assertTrue(owners.count(engine) > 50)
+        # The owners don't depend on the order engines are listed in
+        ring = health_manager.HashRing(['E3', 'E1', 'E2'])
+        self.assertEqual(owners, [ring.get_owner(k) for k in keys])
+
+    def test_get_owner_empty(self):
+        ring = health_manager.HashRing([])
+        self.assertIsNone(ring.get_owner('cluster-1'))
+
+    def test_rebalance(self):
+        keys = ['cluster-%s' % i for i in range(300)]
+        ring = health_manager.HashRing(['E1', 'E2'])
+        before = dict((k, ring.get_owner(k)) for k in keys)
+
+        ring = health_manager.HashRing(['E1', 'E2', 'E3'])
+        after = dict((k, ring.get_owner(k)) for k in keys)
+
+        # Only the clusters taken over by the new engine change owner
+        moved = [k for k in keys if before[k] != after[k]]
+        self.assertTrue(moved)
+        self.assertEqual(set(['E3']), set(after[k] for k in moved))
+
+
+class HealthManagerTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(HealthManagerTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        cfg.CONF.set_override('periodic_interval_max', 60)
+        service = mock.Mock(engine_id='E1')
+        self.hm = health_manager.Health_Manager(service, 'topic', '1.0',
+                                                mock.Mock())
+
+    def test_update_ring(self):
+        now = timeutils.utcnow()
+        db_api.engine_heartbeat(self.ctx, 'E2', 'host2', now)
+        db_api.engine_heartbeat(self.ctx, 'E3', 'host3',
+                                now - datetime.timedelta(days=1))
+
+        self.hm._update_ring(self.ctx)
+        # The engine itself is always on the ring, dead engines are not
+        self.assertEqual(set(['E1', 'E2']), self.hm.ring.members)
+
+    def _policy(self, interval=60, detection='NODE_STATUS_POLLING'):
+        return {'detection': {'type': detection, 'interval': interval}}
+
+    def test_get_due_clusters(self):
+        self.hm.ring = health_manager.HashRing(['E1'])
+        bindings = [
+            ('C1', self._policy()),
+            ('C2', self._policy(interval=150)),
+            ('C3', self._policy(detection='VM_LIFECYCLE_EVENTS')),
+        ]
+        self.patchobject(db_api, 'cluster_policy_get_by_type',
+                         return_value=bindings)
+
+        self.hm.sweeps = 1
+        self.assertEqual(['C1', 'C2'],
+                         sorted(self.hm._get_due_clusters(self.ctx)))
+
+        # C2 is checked every 3 sweeps
+        self.hm.checked = {'C1': 1, 'C2': 1, 'C9': 1}
+        self.hm.sweeps = 2
+        self.assertEqual(['C1'], self.hm._get_due_clusters(self.ctx))
+        self.hm.sweeps = 4
+        self.assertEqual(['C1', 'C2'],
+                         sorted(self.hm._get_due_clusters(self.ctx)))
+        # Clusters no longer checked are forgotten
+        self.assertEqual(set(['C1', 'C2']), set(self.hm.checked))
+
+    def test_get_due_clusters_other_shard(self):
+        self.hm.ring = health_manager.HashRing(['E2'])
+        self.patchobject(db_api, 'cluster_policy_get_by_type',
+                         return_value=[('C1', self._policy())])
+
+        self.assertEqual([], self.hm._get_due_clusters(self.ctx))
+
+    def test_periodic_tasks(self):
+        self.patchobject(self.hm, '_update_ring')
+        self.patchobject(self.hm, '_get_due_clusters',
+                         return_value=['C1', 'C2'])
+        mock_check = self.patchobject(self.hm, '_check_cluster')
+        mock_sleep = self.patchobject(health_manager.eventlet, 'sleep')
+
+        self.assertEqual(60, self.hm.periodic_tasks())
+        self.assertEqual(1, self.hm.sweeps)
+        checked = sorted(c[0][1] for c in mock_check.call_args_list)
+        self.assertEqual(['C1', 'C2'], checked)
+        # The checks are spread over the interval
+        for c in mock_sleep.call_args_list:
+            self.assertTrue(0 < c[0][0] < 60)
@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+import eventlet
+from oslo_config import cfg
+
+from senlin.engine import health_probe
+from senlin.tests.common import base
+
+
+class Profile(object):
+    '''A stub of a profile checking nodes one by one.'''
+
+    def __init__(self, profile_id, results, delay=0):
+        self.id = profile_id
+        self.results = results
+        self.delay = delay
+        self.checked = []
+
+    def do_check(self, obj):
+        self.checked.append(obj.id)
+        eventlet.sleep(self.delay)
+        result = self.results[obj.id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def do_check_all(self, objs):
+        return NotImplemented
+
+
+class BatchProfile(Profile):
+    '''A stub of a profile checking nodes in batches.'''
+
+    def do_check_all(self, objs):
+        self.checked.append([obj.id for obj in objs])
+        return dict((obj.id, self.results[obj.id]) for obj in objs)
+
+
+class Node(object):
+
+    def __init__(self, node_id, profile):
+        self.id = node_id
+        self.profile_id = profile.id
+        self.rt = {'profile': profile}
+
+
+class HealthProbeTest(base.SenlinTestCase):
+
+    def test_probe(self):
+        profile = Profile('P1', {'N1': True, 'N2': False,
+                                 'N3': NotImplemented,
+                                 'N4': Exception('boom')})
+        nodes = [Node(n, profile) for n in ('N1', 'N2', 'N3', 'N4')]
+
+        res = health_probe.probe(nodes)
+        self.assertEqual({'N1': True, 'N2': False, 'N3': None, 'N4': None},
+                         res)
+        self.assertEqual(['N1', 'N2', 'N3', 'N4'], sorted(profile.checked))
+
+    def test_probe_batch(self):
+        batch = BatchProfile('P1', {'N1': True, 'N2': False})
+        single = Profile('P2', {'N3': True})
+        nodes = [Node('N1', batch), Node('N2', batch), Node('N3', single)]
+
+        res = health_probe.probe(nodes)
+        self.assertEqual({'N1': True, 'N2': False, 'N3': True}, res)
+        # The nodes of the batch profile are checked at once
+        self.assertEqual([['N1', 'N2']], batch.checked)
+        self.assertEqual(['N3'], single.checked)
+
+    def test_probe_concurrent(self):
+        cfg.CONF.set_override('health_check_concurrency', 10)
+        profile = Profile('P1', dict(('N%s' % i, True) for i in range(10)),
+                          delay=0.1)
+        nodes = [Node('N%s' % i, profile) for i in range(10)]
+
+        start = time.time()
+        res = health_probe.probe(nodes)
+        self.assertEqual(10, len([r for r in res.values() if r]))
+        self.assertTrue(time.time() - start < 0.5)
+
+    def test_probe_timeout(self):
+        cfg.CONF.set_override('health_check_timeout', 0.01)
+        profile = Profile('P1', {'N1': True}, delay=1)
+
+        res = health_probe.probe([Node('N1', profile)])
+        self.assertEqual({'N1': None}, res)
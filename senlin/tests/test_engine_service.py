@@ -0,0 +1,135 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import logging
+import time
+
+import mock
+from oslo_utils import timeutils
+
+from senlin.db import api as db_api
+from senlin.engine import senlin_lock
+from senlin.engine import service
+from senlin.tests.common import base
+from senlin.tests.common import utils
+from senlin.tests.db import shared
+
+
+class EngineServiceTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(EngineServiceTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.svc = service.EngineService('host-a', 'topic-a')
+        self.svc.engine_id = 'engine-1'
+        self.svc.TG = mock.Mock()
+
+    def test_heartbeat(self):
+        mock_heartbeat = self.patchobject(db_api, 'engine_heartbeat')
+        mock_reap = self.patchobject(self.svc, '_reap_engines')
+
+        self.svc.heartbeat()
+        mock_heartbeat.assert_called_once_with(mock.ANY, 'engine-1',
+                                               'host-a', mock.ANY)
+        mock_reap.assert_called_once_with(mock.ANY)
+
+    def test_reap_engines(self):
+        mock_handoff = self.patchobject(senlin_lock, 'cluster_lock_handoff')
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        node = shared.create_node(self.ctx, cluster, profile)
+
+        # Both this engine and engine-2 missed their heartbeats, engine-3
+        # is alive.
+        now = timeutils.utcnow()
+        past = now - datetime.timedelta(hours=1)
+        db_api.engine_heartbeat(self.ctx, 'engine-1', 'host-a', past)
+        db_api.engine_heartbeat(self.ctx, 'engine-2', 'host-b', past)
+        db_api.engine_heartbeat(self.ctx, 'engine-3', 'host-c', now)
+
+        own = shared.create_action(self.ctx, owner='engine-1',
+                                   status='RUNNING')
+        dead = shared.create_action(self.ctx, owner='engine-2',
+                                    status='RUNNING')
+        alive = shared.create_action(self.ctx, owner='engine-3',
+                                     status='RUNNING')
+        db_api.cluster_lock_acquire(cluster.id, dead.id, 1)
+        db_api.node_lock_acquire(node.id, dead.id)
+
+        self.svc._reap_engines(self.ctx)
+
+        mock_handoff.assert_called_once_with(cluster.id)
+        ctx = utils.dummy_context()
+        engines = db_api.engine_get_all(ctx)
+        self.assertEqual(['engine-1', 'engine-3'],
+                         sorted([e.id for e in engines]))
+
+        action = db_api.action_get(ctx, dead.id)
+        self.assertEqual('FAILED', action.status)
+        self.assertIsNone(action.owner)
+        action = db_api.action_get(ctx, own.id)
+        self.assertEqual('RUNNING', action.status)
+        self.assertEqual('engine-1', action.owner)
+        action = db_api.action_get(ctx, alive.id)
+        self.assertEqual('RUNNING', action.status)
+
+        observed = db_api.cluster_lock_acquire(cluster.id, own.id, -1)
+        self.assertEqual([own.id], observed)
+        observed = db_api.node_lock_acquire(node.id, own.id)
+        self.assertEqual(own.id, observed)
+
+    def test_purge(self):
+        self.patchobject(db_api, 'event_prune', return_value=1)
+        mock_purge = self.patchobject(db_api, 'event_purge', return_value=2)
+        mock_compact = self.patchobject(db_api, 'action_compact',
+                                        return_value=3)
+        self.patchobject(db_api, 'purge_deleted', return_value={})
+
+        self.svc.purge()
+        mock_purge.assert_called_once_with(mock.ANY, 30)
+        mock_compact.assert_called_once_with(mock.ANY, 24, 'hours')
+        # The timers are only added when the engine starts
+        self.assertEqual(0, self.svc.TG.add_timer.call_count)
+
+    def test_get_stats(self):
+        stats = {'running': 1, 'queued': 2}
+        self.svc.TG.get_stats.return_value = stats
+
+        self.assertEqual(stats, self.svc.get_stats(self.ctx))
+
+    def test_event_get_archived(self):
+        timestamp = timeutils.utcnow() - datetime.timedelta(days=10)
+        event_id = db_api.event_create(self.ctx, {
+            'timestamp': timestamp, 'level': logging.INFO,
+            'obj_id': 'node-1', 'obj_type': 'NODE', 'status': 'ACTIVE',
+            'user': self.ctx.user_id, 'project': self.ctx.tenant_id}).id
+        self.assertEqual(1, db_api.event_archive(self.ctx, 1))
+
+        result = self.svc.event_get(self.ctx, event_id)
+        self.assertEqual(event_id, result['id'])
+        self.assertEqual('ACTIVE', result['status'])
+        result = self.svc.event_get(self.ctx, event_id[:8])
+        self.assertEqual(event_id, result['id'])
+
+    def test_action_get_compacted(self):
+        action_id = shared.create_action(
+            self.ctx, name='A01', action='CLUSTER_CREATE',
+            status='SUCCEEDED', end_time=time.time() - 7200).id
+        self.assertEqual(1, db_api.action_compact(self.ctx, 1, 'hours'))
+
+        ctx = utils.dummy_context()
+        for identity in (action_id, 'A01', action_id[:8]):
+            result = self.svc.action_get(ctx, identity)
+            self.assertEqual(action_id, result['id'])
+            self.assertEqual('SUCCEEDED', result['status'])
+            self.assertEqual({}, result['inputs'])
@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from senlin.engine import stack_watcher
+from senlin.tests.common import base
+
+
+class Stack(object):
+    '''A stub of the stacks listed by a Heat client.'''
+
+    def __init__(self, stack_id, status):
+        self.id = stack_id
+        self.stack_status = status
+
+
+class StackWatcherTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(StackWatcherTest, self).setUp()
+        cfg.CONF.set_override('stack_poll_interval', 0.01)
+        cfg.CONF.set_override('stack_poll_max_interval', 0.04)
+        self.watcher = stack_watcher.StackWatcher()
+        self.client = mock.Mock()
+
+    def _wait(self, stack_id, action):
+        return eventlet.spawn(self.watcher.wait, self.client, 'KEY',
+                              stack_id, action)
+
+    def test_wait(self):
+        self.client.stack_list.side_effect = [
+            [Stack('S1', 'CREATE_IN_PROGRESS'),
+             Stack('S2', 'CREATE_IN_PROGRESS')],
+            [Stack('S1', 'CREATE_COMPLETE'),
+             Stack('S2', 'CREATE_IN_PROGRESS')],
+            [Stack('S2', 'CREATE_FAILED')],
+        ]
+        th1 = self._wait('S1', 'CREATE')
+        th2 = self._wait('S2', 'CREATE')
+
+        self.assertEqual('CREATE_COMPLETE', th1.wait().stack_status)
+        self.assertEqual('CREATE_FAILED', th2.wait().stack_status)
+
+        # All the stacks of a client are listed by a single request
+        calls = self.client.stack_list.call_args_list
+        self.assertEqual(3, len(calls))
+        self.assertEqual(['S1', 'S2'], sorted(calls[0][1]['id']))
+        self.assertEqual(['S2'], calls[2][1]['id'])
+        eventlet.sleep(0.1)
+        self.assertEqual({}, self.watcher._groups)
+        self.assertIsNone(self.watcher._thread)
+
+    def test_wait_not_found(self):
+        self.client.stack_list.side_effect = [Exception('Boom'), []]
+        th = self._wait('S1', 'DELETE')
+
+        self.assertIsNone(th.wait())
+        self.assertEqual(2, self.client.stack_list.call_count)
+
+    def test_wait_list_failed(self):
+        self.client.stack_list.side_effect = Exception('Boom')
+        th = self._wait('S1', 'CREATE')
+
+        ex = self.assertRaises(Exception, th.wait)
+        self.assertEqual('Boom', str(ex))
+        self.assertEqual(stack_watcher.STACK_LIST_MAX_FAILURES,
+                         self.client.stack_list.call_count)
+        self.assertEqual({}, self.watcher._groups)
+
+    def test_wait_killed(self):
+        self.client.stack_list.return_value = [
+            Stack('S1', 'UPDATE_IN_PROGRESS')]
+        th = self._wait('S1', 'UPDATE')
+        eventlet.sleep(0)
+        self.assertIn('KEY', self.watcher._groups)
+
+        th.kill()
+        self.assertEqual({}, self.watcher._groups)
+
+    def test_poll_backoff(self):
+        self.client.stack_list.return_value = [
+            Stack('S1', 'CREATE_IN_PROGRESS')]
+        th = self._wait('S1', 'CREATE')
+        eventlet.sleep(0.2)
+
+        self.assertEqual(0.04, self.watcher._interval)
+        th.kill()
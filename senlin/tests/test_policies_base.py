@@ -0,0 +1,51 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.common import exception
+from senlin.engine import environment
+from senlin.engine import service
+from senlin.policies import base as policy_base
+from senlin.tests.common import base
+from senlin.tests.common import utils
+from senlin.tests import fakes
+
+
+class PolicyLoadTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(PolicyLoadTest, self).setUp()
+        self.ctx = utils.dummy_context(tenant_id='policy_test_tenant')
+        self.eng = service.EngineService('host-a', 'topic-a')
+        self.eng.init_tgm()
+        environment.global_env().register_policy('TestPolicy',
+                                                 fakes.TestPolicy)
+
+    def test_policy_load_cached(self):
+        p = self.eng.policy_create(self.ctx, 'p-1', 'TestPolicy', {})
+        hits = policy_base._cache.hits
+
+        p1 = policy_base.Policy.load(self.ctx, p['id'])
+        ctx = utils.dummy_context(tenant_id='another_tenant')
+        p2 = policy_base.Policy.load(ctx, p['id'])
+        self.assertIsNot(p1, p2)
+        self.assertEqual(p['id'], p2.id)
+        self.assertEqual(ctx, p2.context)
+        self.assertEqual(hits + 1, policy_base._cache.hits)
+
+        # An update makes the cached object stale
+        self.eng.policy_update(self.ctx, p['id'], name='p-2')
+        p3 = policy_base.Policy.load(self.ctx, p['id'])
+        self.assertEqual('p-2', p3.name)
+
+        self.eng.policy_delete(self.ctx, p['id'])
+        self.assertRaises(exception.PolicyNotFound,
+                          policy_base.Policy.load, self.ctx, p['id'])
@@ -0,0 +1,54 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.common import exception
+from senlin.engine import environment
+from senlin.engine import service
+from senlin.profiles import base as profile_base
+from senlin.tests.common import base
+from senlin.tests.common import utils
+from senlin.tests import fakes
+
+
+class ProfileLoadTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ProfileLoadTest, self).setUp()
+        self.ctx = utils.dummy_context(tenant_id='profile_test_tenant')
+        self.eng = service.EngineService('host-a', 'topic-a')
+        self.eng.init_tgm()
+        environment.global_env().register_profile('TestProfile',
+                                                  fakes.TestProfile)
+
+    def test_profile_load_cached(self):
+        p = self.eng.profile_create(self.ctx, 'p-1', 'TestProfile', {})
+        hits = profile_base._cache.hits
+
+        p1 = profile_base.Profile.load(self.ctx, p['id'])
+        p2 = profile_base.Profile.load(self.ctx, p['id'])
+        self.assertIsNot(p1, p2)
+        self.assertEqual(p['id'], p2.id)
+        self.assertEqual(hits + 1, profile_base._cache.hits)
+
+        # Changes to a loaded object do not leak into the cache
+        p2.name = 'p-x'
+        p3 = profile_base.Profile.load(self.ctx, p['id'])
+        self.assertEqual('p-1', p3.name)
+
+        # An update makes the cached object stale
+        self.eng.profile_update(self.ctx, p['id'], name='p-2')
+        p4 = profile_base.Profile.load(self.ctx, p['id'])
+        self.assertEqual('p-2', p4.name)
+
+        self.eng.profile_delete(self.ctx, p['id'])
+        self.assertRaises(exception.ProfileNotFound,
+                          profile_base.Profile.load, self.ctx, p['id'])
@@ -391,8 +391,13 @@ class EngineRpcAPITestCase(base.SenlinTestCase):
             'sort_dir': mock.ANY,
             'tenant_safe': mock.ANY,
             'show_deleted': mock.ANY,
+            'start_time': mock.ANY,
+            'end_time': mock.ANY,
         }
         self._test_engine_api('event_list', 'call', **default_args)
 
     def test_get_revision(self):
         self._test_engine_api('get_revision', 'call')
+
+    def test_get_stats(self):
+        self._test_engine_api('get_stats', 'call')
@@ -11,6 +11,7 @@
 # under the License.
 
 import datetime
+import json
 
 import webob
 
@@ -48,3 +49,27 @@ class JSONResponseSerializerTest(base.SenlinTestCase):
         self.assertEqual(1, len(content_types))
         self.assertEqual('application/json', response.content_type)
         self.assertEqual('{"key": "value"}', response.body)
+
+    def test_default_streamed(self):
+        def items():
+            for i in range(serializers.STREAM_BATCH_SIZE + 1):
+                yield {'id': i, 'date': datetime.datetime(1, 3, 8, 2)}
+
+        response = webob.Response()
+        serializers.JSONResponseSerializer().default(response,
+                                                     {'events': items()})
+        self.assertEqual('application/json', response.content_type)
+
+        chunks = list(response.app_iter)
+        self.assertTrue(len(chunks) > 3)
+        result = json.loads(''.join(chunks))
+        events = result['events']
+        self.assertEqual(serializers.STREAM_BATCH_SIZE + 1, len(events))
+        self.assertEqual(0, events[0]['id'])
+        self.assertEqual('0001-03-08T02:00:00', events[-1]['date'])
+
+    def test_to_json_stream_empty(self):
+        result = serializers.JSONResponseSerializer().to_json_stream(
+            {'events': (e for e in []), 'key': 'value'})
+        self.assertEqual({'events': [], 'key': 'value'},
+                         json.loads(''.join(result)))